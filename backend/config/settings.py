@@ -46,6 +46,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.RequestPrincipalMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -126,3 +127,64 @@ AUTH_USER_MODEL = 'core.User'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Cachés en disco de los informes PDF (mapas e imágenes remotas). No se sirve públicamente.
+REPORT_CACHE_DIR = BASE_DIR / 'cache'
+# Límite total de la caché de imágenes remotas (se descartan las menos usadas) y
+# tamaño máximo de cada imagen descargada.
+REPORT_IMAGE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+REPORT_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+
+# Los PDF se generan en un pool de procesos aparte para no bloquear los workers de la API.
+# Cada worker de gunicorn tiene su propio pool; con 0 se generan en el mismo proceso.
+# Si hay más de WORKERS + MAX_PENDING informes en curso, las descargas responden 503.
+REPORT_RENDER_WORKERS = 2
+REPORT_RENDER_MAX_PENDING = 4
+REPORT_RENDER_TIMEOUT_SECONDS = 60
+# URL pública de la aplicación web para el QR de los informes de visita. Con ella el
+# worker de informes genera por adelantado la variante que sirve la descarga autenticada;
+# vacía, el enlace se arma con el host de cada petición y esa variante se genera al descargar.
+REPORT_PUBLIC_BASE_URL = ""
+# Poppins se instala en core/fonts durante el despliegue con ``manage.py fetch_report_fonts``
+# y el arranque nunca usa la red. Con True, si falta, se intenta descargar a
+# REPORT_CACHE_DIR/fonts al arrancar; si no, los informes usan DejaVu/Vera.
+REPORT_FONTS_REMOTE_ENABLED = False
+
+# Los listados de visitas, auditorías, incidencias y usuarios se paginan por cursor
+# cuando el cliente envía ``cursor`` o ``page_size``. Mientras esta opción esté activa,
+# las peticiones sin esos parámetros siguen recibiendo la lista completa (apps antiguas).
+API_LEGACY_UNPAGINATED_LISTS = True
+API_LIST_DEFAULT_PAGE_SIZE = 50
+API_LIST_MAX_PAGE_SIZE = 200
+
+# Con streaming activo los listados grandes se envían en bloques a medida que se
+# serializan; los clientes también pueden pedirlo con ``?stream=1``.
+API_STREAM_LIST_RESPONSES = False
+API_STREAM_CHUNK_SIZE = 500
+
+# Caché en disco compartida por todos los workers y por los comandos de gestión (tablero
+# y sus contadores): lo que un proceso guarda o borra lo ven los demás.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'django',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    }
+}
+
+# Segundos que vive en caché el tablero de cada alcance. Los cambios de actividad lo
+# invalidan al instante; el TTL solo cubre programaciones que vencen sin otro cambio.
+# Con 0 el tablero se recalcula en cada petición.
+DASHBOARD_CACHE_TIMEOUT = 60
+
+# Stream de avisos en vivo (/api/notifications/stream/, solo bajo config.asgi). Los
+# eventos se publican desde los workers de la API y se comparten por la base de datos;
+# cada proceso ASGI la consulta cada EVENTS_POLL_SECONDS mientras tenga clientes.
+# core.events.InProcessEventBroker solo sirve con un único proceso y únicamente se
+# acepta con DEBUG = True.
+EVENTS_BROKER_BACKEND = "core.events.DatabaseEventBroker"
+EVENTS_POLL_SECONDS = 1
+EVENTS_HEARTBEAT_SECONDS = 15
+EVENTS_REPLAY_BUFFER_SIZE = 500
+EVENTS_SUBSCRIBER_QUEUE_SIZE = 100
+EVENTS_MAX_SUBSCRIBERS = 500
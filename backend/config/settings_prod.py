@@ -20,3 +20,7 @@ STORAGES = {
 
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 CSRF_TRUSTED_ORIGINS = ["https://trust.supplymax.net"]
+
+API_STREAM_LIST_RESPONSES = True
+
+REPORT_PUBLIC_BASE_URL = "https://trust.supplymax.net"
@@ -0,0 +1,149 @@
+from functools import cached_property
+
+from django.db import transaction
+from django.db.models import Q
+
+from . import catalog
+from .models import Area, Branch, User, UserAreaScope
+
+
+CURRENT_USER_EMAIL_HEADER = "X-Current-User-Email"
+SCOPED_ROLES = {User.Role.ACCOUNT_ADMIN, User.Role.BRANCH_ADMIN}
+
+
+def get_current_user_email(request) -> str:
+    return str(request.headers.get(CURRENT_USER_EMAIL_HEADER) or "").strip().lower()
+
+
+def compute_user_scope_rows(user: User) -> set[tuple[int, int | None, int | None]]:
+    """Calcula el cierre cliente → sucursal → área a partir de las asignaciones del usuario."""
+    if user.role == User.Role.ACCOUNT_ADMIN:
+        client_ids = set(user.clients.values_list("id", flat=True))
+        branch_rows = set(Branch.objects.filter(client__users=user).values_list("id", "client_id"))
+        area_rows = set(
+            Area.objects.filter(branch__client__users=user).values_list("id", "branch_id", "branch__client_id")
+        )
+    elif user.role == User.Role.BRANCH_ADMIN:
+        branch_rows = set(user.branches.values_list("id", "client_id"))
+        client_ids = {client_id for _, client_id in branch_rows}
+        area_rows = set(Area.objects.filter(branch__users=user).values_list("id", "branch_id", "branch__client_id"))
+    else:
+        return set()
+
+    rows = {(client_id, None, None) for client_id in client_ids}
+    rows.update((client_id, branch_id, None) for branch_id, client_id in branch_rows)
+    rows.update((client_id, branch_id, area_id) for area_id, branch_id, client_id in area_rows)
+    return rows
+
+
+def get_stored_scope_rows(user: User) -> set[tuple[int, int | None, int | None]]:
+    return set(UserAreaScope.objects.filter(user=user).values_list("client_id", "branch_id", "area_id"))
+
+
+def rebuild_user_area_scope(user: User) -> int:
+    rows = compute_user_scope_rows(user)
+    with transaction.atomic():
+        UserAreaScope.objects.filter(user=user).delete()
+        UserAreaScope.objects.bulk_create(
+            UserAreaScope(user=user, client_id=client_id, branch_id=branch_id, area_id=area_id)
+            for client_id, branch_id, area_id in rows
+        )
+        catalog.bump_versions(catalog.scope_key(user.id))
+    return len(rows)
+
+
+def get_scoped_users(*, client_ids=(), branch_ids=()):
+    return User.objects.filter(
+        Q(role=User.Role.ACCOUNT_ADMIN, clients__in=list(client_ids))
+        | Q(role=User.Role.BRANCH_ADMIN, branches__in=list(branch_ids))
+    ).distinct()
+
+
+def add_branch_to_scopes(branch: Branch) -> None:
+    users = list(get_scoped_users(client_ids=[branch.client_id]))
+    UserAreaScope.objects.bulk_create(
+        UserAreaScope(user=user, client_id=branch.client_id, branch_id=branch.id)
+        for user in users
+    )
+    catalog.bump_versions(*(catalog.scope_key(user.id) for user in users))
+
+
+def add_area_to_scopes(area: Area) -> None:
+    client_id = Branch.objects.filter(pk=area.branch_id).values_list("client_id", flat=True).first()
+    users = list(get_scoped_users(client_ids=[client_id], branch_ids=[area.branch_id]))
+    UserAreaScope.objects.bulk_create(
+        UserAreaScope(user=user, client_id=client_id, branch_id=area.branch_id, area_id=area.id)
+        for user in users
+    )
+    catalog.bump_versions(*(catalog.scope_key(user.id) for user in users))
+
+
+def find_area_scope_drift(users=None) -> list[User]:
+    """Devuelve los usuarios cuyo alcance almacenado no coincide con sus asignaciones."""
+    if users is None:
+        users = User.objects.filter(Q(role__in=SCOPED_ROLES) | Q(area_scopes__isnull=False)).distinct()
+    return [user for user in users if get_stored_scope_rows(user) != compute_user_scope_rows(user)]
+
+
+def build_access_scope(current_user: User | None) -> dict[str, list[int]] | None:
+    if not current_user or current_user.role == User.Role.GENERAL_ADMIN:
+        return None
+
+    if current_user.role == User.Role.INSPECTOR:
+        return None
+
+    clients: set[int] = set()
+    branches: set[int] = set()
+    areas: set[int] = set()
+    for client_id, branch_id, area_id in get_stored_scope_rows(current_user):
+        clients.add(client_id)
+        if branch_id is not None:
+            branches.add(branch_id)
+        if area_id is not None:
+            areas.add(area_id)
+
+    return {
+        "user_id": current_user.id,
+        "client_ids": sorted(clients),
+        "branch_ids": sorted(branches),
+        "area_ids": sorted(areas),
+    }
+
+
+def scope_lookup_values(scope: dict, key: str):
+    """Valores para un filtro ``__in``: subconsulta sobre el alcance materializado o la lista de ids."""
+    user_id = scope.get("user_id")
+    if user_id is None:
+        return scope[key]
+
+    rows = UserAreaScope.objects.filter(user_id=user_id)
+    if key == "area_ids":
+        return rows.filter(area__isnull=False).values("area_id")
+    if key == "branch_ids":
+        return rows.filter(branch__isnull=False, area__isnull=True).values("branch_id")
+    return rows.filter(branch__isnull=True, area__isnull=True).values("client_id")
+
+
+class RequestPrincipal:
+    """Usuario actual y su alcance de acceso, resueltos como máximo una vez por petición."""
+
+    def __init__(self, request, email: str | None = None):
+        self.email = email or get_current_user_email(request)
+
+    @cached_property
+    def user(self) -> User | None:
+        if not self.email:
+            return None
+        return User.objects.filter(email__iexact=self.email, is_active=True).first()
+
+    @cached_property
+    def scope(self) -> dict[str, list[int]] | None:
+        return build_access_scope(self.user)
+
+
+def get_request_principal(request) -> RequestPrincipal:
+    principal = getattr(request, "principal", None)
+    if principal is None:
+        principal = RequestPrincipal(request)
+        request.principal = principal
+    return principal
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .events import ensure_shared_broker
+        from .report_fonts import register_report_fonts
+
+        ensure_shared_broker()
+        register_report_fonts()
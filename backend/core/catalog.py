@@ -0,0 +1,80 @@
+from datetime import datetime
+from uuid import uuid4
+
+from .models import CacheVersion
+
+
+NOZZLES = "catalog:nozzles"
+DISPENSER_MODELS = "catalog:dispenser_models"
+PRODUCTS = "catalog:products"
+AUDIT_FORMS = "catalog:audit_forms"
+# Cambia con cualquier visita, auditoría o incidencia; cada cliente tiene además su propia clave.
+ACTIVITY = "activity:all"
+
+# key -> (token, payload). Cada proceso conserva su copia; el token en base de datos
+# es el que decide si sigue vigente, así que la invalidación alcanza a todos los workers.
+_payloads: dict[str, tuple[str, object]] = {}
+
+
+def get_version_token(key: str) -> str:
+    token = CacheVersion.objects.filter(key=key).values_list("token", flat=True).first()
+    if token is None:
+        token = CacheVersion.objects.get_or_create(key=key, defaults={"token": uuid4().hex})[0].token
+    return token
+
+
+def table_key(model) -> str:
+    return f"table:{model._meta.label_lower}"
+
+
+def scope_key(user_id: int) -> str:
+    return f"scope:user:{user_id}"
+
+
+def client_activity_key(client_id: int) -> str:
+    return f"activity:client:{client_id}"
+
+
+def get_versions(keys) -> dict[str, tuple[str, datetime]]:
+    """Token y fecha de cambio de cada clave, creando las que aún no existen."""
+    keys = sorted(set(keys))
+    versions = {
+        key: (token, updated_at)
+        for key, token, updated_at in CacheVersion.objects.filter(key__in=keys).values_list(
+            "key", "token", "updated_at"
+        )
+    }
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        CacheVersion.objects.bulk_create(
+            [CacheVersion(key=key, token=uuid4().hex) for key in missing], ignore_conflicts=True
+        )
+        versions.update(
+            (key, (token, updated_at))
+            for key, token, updated_at in CacheVersion.objects.filter(key__in=missing).values_list(
+                "key", "token", "updated_at"
+            )
+        )
+    return versions
+
+
+def bump_versions(*keys: str) -> None:
+    for key in keys:
+        CacheVersion.objects.update_or_create(key=key, defaults={"token": uuid4().hex})
+
+
+def get_cached_catalog(key: str, loader):
+    """Devuelve el catálogo ``key`` construido con ``loader`` mientras su versión no cambie.
+
+    El resultado se comparte entre peticiones: quien lo reciba no debe modificarlo.
+    """
+    # El token se lee antes de construir el catálogo: si cambia a mitad de camino,
+    # la copia queda asociada al token anterior y se reconstruye en la siguiente lectura.
+    token = get_version_token(key)
+    cached = _payloads.get(key)
+    if cached is not None and cached[0] == token:
+        return cached[1]
+
+    payload = loader()
+    _payloads[key] = (token, payload)
+    return payload
@@ -0,0 +1,274 @@
+from datetime import date, datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .access import scope_lookup_values
+from .models import Audit, DailyAreaCompliance, Incident, Visit
+
+
+COUNTER_FIELDS = ("completed_visits", "completed_audits", "scheduled_visits", "scheduled_audits", "incidents")
+
+
+def local_date(value: datetime) -> date:
+    return timezone.localtime(value).date()
+
+
+def local_day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    return start, end
+
+
+def visit_bucket(visit: Visit) -> tuple[int, date] | None:
+    if not visit.area_id or visit.visited_at is None:
+        return None
+    if visit.status == Visit.Status.COMPLETED:
+        return visit.area_id, local_date(visit.completed_at or visit.visited_at)
+    return visit.area_id, local_date(visit.visited_at)
+
+
+def audit_bucket(audit: Audit) -> tuple[int, date] | None:
+    if not audit.area_id or audit.audited_at is None:
+        return None
+    if audit.status == Audit.Status.COMPLETED:
+        return audit.area_id, local_date(audit.completed_at or audit.audited_at)
+    return audit.area_id, local_date(audit.audited_at)
+
+
+def incident_bucket(incident: Incident) -> tuple[int, date] | None:
+    if not incident.area_id or incident.created_at is None:
+        return None
+    return incident.area_id, local_date(incident.created_at)
+
+
+def _bucket_expression(scheduled_field: str, completed_status: str):
+    return Case(
+        When(status=completed_status, then=Coalesce("completed_at", scheduled_field)),
+        default=F(scheduled_field),
+    )
+
+
+def _grouped_counts(start: datetime, end: datetime, area_ids=None) -> dict[tuple[int, date], dict[str, int]]:
+    """Conteos por (área, día local) calculados desde las tablas de origen."""
+    local_tz = timezone.get_current_timezone()
+    counts: dict[tuple[int, date], dict[str, int]] = {}
+    sources = (
+        (Visit.objects.all(), "visited_at", Visit.Status, "completed_visits", "scheduled_visits"),
+        (Audit.objects.all(), "audited_at", Audit.Status, "completed_audits", "scheduled_audits"),
+    )
+    for queryset, scheduled_field, status_choices, completed_key, scheduled_key in sources:
+        if area_ids is not None:
+            queryset = queryset.filter(area_id__in=area_ids)
+        rows = (
+            queryset.annotate(
+                bucket_at=_bucket_expression(scheduled_field, status_choices.COMPLETED),
+            )
+            .filter(bucket_at__gte=start, bucket_at__lt=end)
+            .annotate(bucket=TruncDate("bucket_at", tzinfo=local_tz))
+            .order_by()
+            .values("area_id", "bucket")
+            .annotate(
+                completed=Count("id", filter=Q(status=status_choices.COMPLETED)),
+                scheduled=Count("id", filter=Q(status=status_choices.SCHEDULED)),
+            )
+        )
+        for row in rows:
+            bucket_counts = counts.setdefault((row["area_id"], row["bucket"]), dict.fromkeys(COUNTER_FIELDS, 0))
+            bucket_counts[completed_key] += row["completed"]
+            bucket_counts[scheduled_key] += row["scheduled"]
+
+    incidents = Incident.objects.filter(created_at__gte=start, created_at__lt=end)
+    if area_ids is not None:
+        incidents = incidents.filter(area_id__in=area_ids)
+    rows = (
+        incidents.annotate(bucket=TruncDate("created_at", tzinfo=local_tz))
+        .order_by()
+        .values("area_id", "bucket")
+        .annotate(total=Count("id"))
+    )
+    for row in rows:
+        bucket_counts = counts.setdefault((row["area_id"], row["bucket"]), dict.fromkeys(COUNTER_FIELDS, 0))
+        bucket_counts["incidents"] += row["total"]
+    return counts
+
+
+def refresh_area_day(area_id: int, day: date) -> None:
+    """Recalcula una fila del rollup; se borra si todos sus conteos quedan en cero."""
+    start, end = local_day_bounds(day)
+    counts = _grouped_counts(start, end, area_ids=[area_id]).get((area_id, day))
+    if not counts or not any(counts.values()):
+        DailyAreaCompliance.objects.filter(area_id=area_id, date=day).delete()
+        return
+    DailyAreaCompliance.objects.update_or_create(area_id=area_id, date=day, defaults=counts)
+
+
+def refresh_buckets(buckets) -> None:
+    for area_id, day in sorted({bucket for bucket in buckets if bucket is not None}):
+        refresh_area_day(area_id, day)
+
+
+def rebuild_rollup(start_day: date, end_day: date) -> tuple[int, int]:
+    """Reemplaza las filas de ``[start_day, end_day]`` con conteos frescos.
+
+    Devuelve cuántas filas cambiaron y cuántas se escribieron en total.
+    """
+    start, _ = local_day_bounds(start_day)
+    _, end = local_day_bounds(end_day)
+    counts = _grouped_counts(start, end)
+    stored = {
+        (row.area_id, row.date): {field: getattr(row, field) for field in COUNTER_FIELDS}
+        for row in DailyAreaCompliance.objects.filter(date__gte=start_day, date__lte=end_day)
+    }
+    expected = {key: value for key, value in counts.items() if any(value.values())}
+    changed = sum(1 for key in set(stored) | set(expected) if stored.get(key) != expected.get(key))
+
+    with transaction.atomic():
+        DailyAreaCompliance.objects.filter(date__gte=start_day, date__lte=end_day).delete()
+        DailyAreaCompliance.objects.bulk_create(
+            DailyAreaCompliance(area_id=area_id, date=day, **values)
+            for (area_id, day), values in sorted(expected.items())
+        )
+    return changed, len(expected)
+
+
+def _score(completed: int, non_compliant: int) -> float:
+    total = completed + non_compliant
+    return round((completed / total) * 100, 2) if total > 0 else 100.0
+
+
+GRANULARITIES = ("day", "week", "month")
+GROUP_FIELDS = {
+    "client": ("area__branch__client_id", "area__branch__client__name"),
+    "branch": ("area__branch_id", "area__branch__name"),
+    "area": ("area_id", "area__name"),
+}
+
+
+def period_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _period_expression(granularity: str):
+    if granularity == "week":
+        return TruncWeek("date")
+    if granularity == "month":
+        return TruncMonth("date")
+    return F("date")
+
+
+def _overdue_today(scope, now: datetime, value_fields: list[str]) -> dict[tuple, int]:
+    """Programaciones de hoy cuya hora ya pasó; el rollup solo las conoce como programadas."""
+    start, _ = local_day_bounds(local_date(now))
+    totals: dict[tuple, int] = {}
+    sources = (
+        (Visit.objects.filter(status=Visit.Status.SCHEDULED), "visited_at"),
+        (Audit.objects.filter(status=Audit.Status.SCHEDULED), "audited_at"),
+    )
+    for queryset, scheduled_field in sources:
+        queryset = queryset.filter(
+            **{f"{scheduled_field}__gte": start, f"{scheduled_field}__lt": now},
+        )
+        if scope is not None:
+            queryset = queryset.filter(area_id__in=scope_lookup_values(scope, "area_ids"))
+        for row in queryset.order_by().values(*value_fields).annotate(total=Count("id")):
+            key = tuple(row[field] for field in value_fields)
+            totals[key] = totals.get(key, 0) + row["total"]
+    return totals
+
+
+def _trend_point(completed: int, overdue: int, incidents: int) -> dict:
+    non_compliant = overdue + incidents
+    return {
+        "completed": completed,
+        "overdue": overdue,
+        "incidents": incidents,
+        "non_compliant": non_compliant,
+        "score": _score(completed, non_compliant),
+    }
+
+
+def compliance_trend(
+    scope,
+    start_day: date,
+    end_day: date,
+    *,
+    granularity: str = "day",
+    group_by: str | None = None,
+    now: datetime | None = None,
+) -> list[dict]:
+    """Cumplimiento por periodo (y opcionalmente por cliente, sucursal o área).
+
+    Todo se agrega en SQL sobre el rollup diario. Lo programado en días anteriores a hoy
+    cuenta como vencido; lo de hoy solo si su hora ya pasó.
+    """
+    now = now or timezone.now()
+    today = local_date(now)
+    group_fields = list(GROUP_FIELDS[group_by]) if group_by else []
+
+    rows = DailyAreaCompliance.objects.filter(date__gte=start_day, date__lte=end_day)
+    if scope is not None:
+        rows = rows.filter(area_id__in=scope_lookup_values(scope, "area_ids"))
+    rows = (
+        rows.annotate(period=_period_expression(granularity))
+        .order_by()
+        .values("period", *group_fields)
+        .annotate(
+            completed=Sum(F("completed_visits") + F("completed_audits")),
+            past_scheduled=Sum(
+                Case(
+                    When(date__lt=today, then=F("scheduled_visits") + F("scheduled_audits")),
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            ),
+            incident_total=Sum("incidents"),
+        )
+    )
+    buckets = {
+        (row["period"], *(row[field] for field in group_fields)): [
+            row["completed"],
+            row["past_scheduled"],
+            row["incident_total"],
+        ]
+        for row in rows
+    }
+
+    if start_day <= today <= end_day:
+        today_period = period_start(today, granularity)
+        for key, total in _overdue_today(scope, now, group_fields).items():
+            buckets.setdefault((today_period, *key), [0, 0, 0])[1] += total
+
+    series = []
+    for key in sorted(buckets, key=lambda key: (key[0], *(str(part) for part in key[1:]))):
+        completed, overdue, incidents = buckets[key]
+        if not (completed or overdue or incidents):
+            # Solo programaciones que aún no vencen: nada que medir todavía.
+            continue
+        point = {"period": key[0]}
+        if group_by:
+            point["group"] = {"id": key[1], "name": key[2]}
+        point.update(_trend_point(completed, overdue, incidents))
+        series.append(point)
+    return series
+
+
+def summarize_trend(series: list[dict]) -> dict:
+    completed = sum(point["completed"] for point in series)
+    overdue = sum(point["overdue"] for point in series)
+    incidents = sum(point["incidents"] for point in series)
+    return _trend_point(completed, overdue, incidents)
+
+
+def daily_compliance(scope, start_day: date, end_day: date, *, now: datetime | None = None) -> list[dict]:
+    """Serie diaria de cumplimiento dentro del alcance, sumada desde el rollup."""
+    return [
+        {"date": point.pop("period"), **point}
+        for point in compliance_trend(scope, start_day, end_day, granularity="day", now=now)
+    ]
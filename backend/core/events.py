@@ -0,0 +1,282 @@
+import asyncio
+import itertools
+import logging
+import threading
+from collections import deque
+from functools import lru_cache
+from uuid import uuid4
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+# Eventos de área que se envían por el stream en vivo.
+STREAM_EVENTS = {"visit_completed", "audit_completed", "incident_created"}
+
+
+class BrokerFull(Exception):
+    pass
+
+
+class Subscription:
+    """Cola de un cliente conectado. ``None`` en la cola indica que debe reconectar."""
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, max_pending: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.max_pending = max_pending
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    def deliver(self, event: dict | None) -> None:
+        # Corre en el loop del cliente, nunca en el hilo que publica.
+        if self.closed:
+            return
+        if event is None or self.queue.qsize() >= self.max_pending:
+            # Un cliente lento no debe acumular memoria: se le corta y reanuda con Last-Event-ID.
+            self.closed = True
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict | None:
+        return await self.queue.get()
+
+
+class InProcessEventBroker:
+    """Broker en memoria para un único proceso.
+
+    ``publish`` puede llamarse desde cualquier hilo; cada evento se entrega en el loop
+    del suscriptor con ``call_soon_threadsafe``. Los últimos eventos se guardan en un
+    búfer circular para reanudar conexiones con ``Last-Event-ID``. Solo ve lo que se
+    publica en su mismo proceso, así que no sirve cuando la API corre en workers WSGI
+    aparte del servidor ASGI: para eso está ``DatabaseEventBroker``.
+    """
+
+    shared = False
+
+    def __init__(self, *, replay_size: int = 500, max_pending: int = 100, max_subscribers: int = 500):
+        # Los ids llevan el arranque del proceso: tras un reinicio, un Last-Event-ID viejo
+        # se reconoce como ajeno en vez de compararse con un contador que volvió a cero.
+        self.stream_id = uuid4().hex[:8]
+        self.max_pending = max_pending
+        self.max_subscribers = max_subscribers
+        self._sequence = itertools.count(1)
+        self._history: deque[dict] = deque(maxlen=replay_size)
+        self._subscriptions: set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event: str, data: dict, user_ids) -> dict:
+        with self._lock:
+            sequence = next(self._sequence)
+            message = {
+                "id": f"{self.stream_id}-{sequence}",
+                "sequence": sequence,
+                "event": event,
+                "data": data,
+                "user_ids": frozenset(user_ids),
+            }
+            self._history.append(message)
+            subscriptions = [item for item in self._subscriptions if item.user_id in message["user_ids"]]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # El loop del cliente ya se cerró; su stream lo dará de baja.
+                pass
+        return message
+
+    def subscribe(self, user_id: int, last_event_id: str | None = None) -> tuple[Subscription, list[dict] | None]:
+        """Registra un cliente y devuelve los eventos que se perdió desde ``last_event_id``.
+
+        La lista es None cuando no es posible reanudar (id de otro arranque o ya fuera del
+        búfer); el cliente debe volver a pedir el estado completo.
+        """
+        subscription = Subscription(user_id, asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            if len(self._subscriptions) >= self.max_subscribers:
+                raise BrokerFull
+            self._subscriptions.add(subscription)
+            backlog = self._replay(user_id, last_event_id)
+        return subscription, backlog
+
+    async def asubscribe(self, user_id: int, last_event_id: str | None = None):
+        return self.subscribe(user_id, last_event_id)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def _replay(self, user_id: int, last_event_id: str | None) -> list[dict] | None:
+        if not last_event_id:
+            return []
+        stream_id, _, sequence = last_event_id.partition("-")
+        if stream_id != self.stream_id or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if self._history and self._history[0]["sequence"] > sequence + 1:
+            return None
+        return [
+            message
+            for message in self._history
+            if message["sequence"] > sequence and user_id in message["user_ids"]
+        ]
+
+
+class _LoopFeed:
+    """Suscriptores de un event loop y hasta qué evento de la tabla se les repartió."""
+
+    def __init__(self, cursor: int):
+        self.cursor = cursor
+        self.subscriptions: set[Subscription] = set()
+
+
+class DatabaseEventBroker:
+    """Broker compartido entre procesos a través de la tabla ``StreamEvent``.
+
+    ``publish`` guarda el evento, así que funciona desde los hooks ``on_commit`` de
+    cualquier worker. Cada event loop con clientes conectados consulta la tabla cada
+    ``poll_interval`` segundos y reparte lo nuevo. La tabla conserva los últimos
+    ``replay_size`` eventos para reanudar con ``Last-Event-ID``; los ids son los de la
+    tabla y siguen valiendo tras un reinicio.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        *,
+        replay_size: int = 500,
+        max_pending: int = 100,
+        max_subscribers: int = 500,
+        poll_interval: float = 1.0,
+    ):
+        self.replay_size = replay_size
+        self.max_pending = max_pending
+        self.max_subscribers = max_subscribers
+        self.poll_interval = poll_interval
+        self._feeds: dict[asyncio.AbstractEventLoop, _LoopFeed] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, event: str, data: dict, user_ids) -> dict:
+        from .models import StreamEvent
+
+        record = StreamEvent.objects.create(event=event, data=data, user_ids=sorted(user_ids))
+        StreamEvent.objects.filter(id__lte=record.id - self.replay_size).delete()
+        return self._message(record)
+
+    async def asubscribe(self, user_id: int, last_event_id: str | None = None):
+        """Registra un cliente y devuelve los eventos que se perdió desde ``last_event_id``.
+
+        El backlog llega hasta el último evento ya repartido en este loop; lo posterior lo
+        entrega el sondeo, así que no hay huecos ni duplicados.
+        """
+        loop = asyncio.get_running_loop()
+        if loop not in self._feeds:
+            cursor = await sync_to_async(self._latest_id)()
+            if loop not in self._feeds:
+                self._feeds[loop] = _LoopFeed(cursor)
+                loop.create_task(self._poll(loop, self._feeds[loop]))
+        feed = self._feeds[loop]
+        subscription = Subscription(user_id, loop, self.max_pending)
+        with self._lock:
+            if sum(len(item.subscriptions) for item in self._feeds.values()) >= self.max_subscribers:
+                raise BrokerFull
+            feed.subscriptions.add(subscription)
+        backlog = await sync_to_async(self._replay)(user_id, last_event_id, feed.cursor)
+        return subscription, backlog
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            feed = self._feeds.get(subscription.loop)
+            if feed is not None:
+                feed.subscriptions.discard(subscription)
+
+    async def _poll(self, loop: asyncio.AbstractEventLoop, feed: _LoopFeed) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            with self._lock:
+                if not feed.subscriptions:
+                    # Sin clientes no se consulta la tabla; el próximo arranca otro sondeo.
+                    self._feeds.pop(loop, None)
+                    return
+            try:
+                messages = await sync_to_async(self._fetch_after)(feed.cursor)
+            except Exception:
+                logger.exception("Could not poll stream events.")
+                continue
+            for message in messages:
+                feed.cursor = message["sequence"]
+                with self._lock:
+                    subscriptions = [item for item in feed.subscriptions if item.user_id in message["user_ids"]]
+                for subscription in subscriptions:
+                    subscription.deliver(message)
+
+    @staticmethod
+    def _message(record) -> dict:
+        return {
+            "id": str(record.id),
+            "sequence": record.id,
+            "event": record.event,
+            "data": record.data,
+            "user_ids": frozenset(record.user_ids),
+        }
+
+    def _latest_id(self) -> int:
+        from .models import StreamEvent
+
+        return StreamEvent.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+    def _fetch_after(self, cursor: int) -> list[dict]:
+        from .models import StreamEvent
+
+        return [self._message(record) for record in StreamEvent.objects.filter(id__gt=cursor).order_by("id")]
+
+    def _replay(self, user_id: int, last_event_id: str | None, until: int) -> list[dict] | None:
+        from .models import StreamEvent
+
+        if not last_event_id:
+            return []
+        if not last_event_id.isdigit() or int(last_event_id) > until:
+            return None
+        sequence = int(last_event_id)
+        oldest = StreamEvent.objects.order_by("id").values_list("id", flat=True).first()
+        if oldest is not None and oldest > sequence + 1:
+            return None
+        records = StreamEvent.objects.filter(id__gt=sequence, id__lte=until).order_by("id")
+        return [message for message in map(self._message, records) if user_id in message["user_ids"]]
+
+
+def _backend_class():
+    return import_string(getattr(settings, "EVENTS_BROKER_BACKEND", "core.events.DatabaseEventBroker"))
+
+
+def ensure_shared_broker() -> None:
+    """Falla al arrancar si, fuera de DEBUG, el broker no comparte eventos entre procesos.
+
+    Los eventos se publican desde los workers de la API; con un broker por proceso los
+    clientes del servidor ASGI se quedarían sin avisos sin ningún error visible.
+    """
+    backend = _backend_class()
+    if not settings.DEBUG and not getattr(backend, "shared", True):
+        raise ImproperlyConfigured(
+            f"EVENTS_BROKER_BACKEND={backend.__module__}.{backend.__name__} solo reparte eventos "
+            "dentro de su proceso; usa core.events.DatabaseEventBroker u otro backend compartido."
+        )
+
+
+@lru_cache(maxsize=1)
+def get_broker():
+    backend = _backend_class()
+    options = {
+        "replay_size": int(getattr(settings, "EVENTS_REPLAY_BUFFER_SIZE", 500)),
+        "max_pending": int(getattr(settings, "EVENTS_SUBSCRIBER_QUEUE_SIZE", 100)),
+        "max_subscribers": int(getattr(settings, "EVENTS_MAX_SUBSCRIBERS", 500)),
+    }
+    if issubclass(backend, DatabaseEventBroker):
+        options["poll_interval"] = float(getattr(settings, "EVENTS_POLL_SECONDS", 1))
+    return backend(**options)
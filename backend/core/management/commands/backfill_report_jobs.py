@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import Audit, ReportArtifact, ReportRenderJob, Visit
+from core.report_jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = "Encola el renderizado de informes de visitas y auditorías finalizadas anteriores a la cola."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Días hacia atrás según la fecha de finalización. Por defecto 30.",
+        )
+        parser.add_argument("--all", action="store_true", help="Incluye todo el historial.")
+        parser.add_argument(
+            "--kind",
+            choices=[choice for choice, _ in ReportArtifact.Kind.choices],
+            help="Limita el backfill a visitas o auditorías.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Vuelve a encolar también los que ya tienen trabajo.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["all"] and options["days"] < 1:
+            raise CommandError("--days debe ser mayor o igual a 1.")
+
+        sources = {
+            ReportArtifact.Kind.VISIT: Visit.objects.filter(status=Visit.Status.COMPLETED),
+            ReportArtifact.Kind.AUDIT: Audit.objects.filter(status=Audit.Status.COMPLETED),
+        }
+        for kind, queryset in sources.items():
+            if options["kind"] and options["kind"] != kind:
+                continue
+            if not options["all"]:
+                queryset = queryset.filter(completed_at__gte=timezone.now() - timedelta(days=options["days"]))
+            object_ids = set(queryset.values_list("id", flat=True))
+            if not options["force"]:
+                object_ids -= set(
+                    ReportRenderJob.objects.filter(kind=kind, object_id__in=object_ids).values_list("object_id", flat=True)
+                )
+            queued = enqueue(kind, object_ids)
+            self.stdout.write(f"{ReportArtifact.Kind(kind).label}: {queued} encolados.")
+        self.stdout.write(self.style.SUCCESS("Ejecuta process_report_jobs para generarlos."))
@@ -0,0 +1,279 @@
+import json
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import timedelta
+from io import BytesIO
+from pathlib import Path
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+
+from core import views
+from core.models import (
+    Area,
+    Audit,
+    AuditForm,
+    AuditMedia,
+    Branch,
+    Client,
+    Dispenser,
+    DispenserModel,
+    DispenserProductAssignment,
+    Nozzle,
+    Product,
+    User,
+    Visit,
+    VisitMedia,
+)
+from core.report_templates import build_audit_report_html, build_visit_report_html
+
+
+METRICS = ("wall_ms", "peak_kib", "bytes")
+PUBLIC_REPORT_URL = "https://trust.example/api/visits/report/public/benchmark.pdf"
+
+
+def _filler(length: int, seed: int) -> str:
+    words = ("dispensador", "limpieza", "dosificación", "boquilla", "revisión", "químico", "área", "operador")
+    text = " ".join(words[(seed + index) % len(words)] for index in range(length // 8 + 1))
+    return text[:length].strip() or "Sin comentarios"
+
+
+def _photo(index: int, width: int = 2000, height: int = 1500) -> ContentFile:
+    # Degradado con ruido y no un color liso, para que el JPEG pese como una foto de móvil.
+    scene = Image.merge(
+        "RGB",
+        [
+            Image.linear_gradient("L").resize((width, height)),
+            Image.linear_gradient("L").rotate(90).resize((width, height)),
+            Image.new("L", (width, height), (index * 37) % 256),
+        ],
+    )
+    image = Image.blend(scene, Image.merge("RGB", [Image.effect_noise((width, height), 12)] * 3), 0.25)
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return ContentFile(buffer.getvalue(), name=f"benchmark-{index}.jpg")
+
+
+def _create_fixtures(*, dispensers: int, photos: int, questions: int, text_length: int) -> tuple[Visit, Audit]:
+    suffix = uuid.uuid4().hex[:8]
+    client = Client.objects.create(name="Cliente benchmark", code=f"BENCH-{suffix}")
+    branch = Branch.objects.create(client=client, name="Sucursal benchmark")
+    area = Area.objects.create(branch=branch, name="Área benchmark")
+    inspector = User.objects.create(username=f"benchmark-{suffix}", first_name="Inspector", last_name="Benchmark")
+    model = DispenserModel.objects.create(name="Modelo benchmark")
+    nozzle = Nozzle.objects.create(name="Boquilla benchmark")
+    product = Product.objects.create(name="Producto benchmark")
+    now = timezone.now()
+
+    visit = Visit.objects.create(
+        area=area,
+        inspector=inspector,
+        status=Visit.Status.COMPLETED,
+        started_at=now - timedelta(hours=1),
+        completed_at=now,
+        notes=_filler(text_length, 1),
+        start_latitude=8.9824,
+        start_longitude=-79.5199,
+        end_latitude=8.9830,
+        end_longitude=-79.5190,
+    )
+    media = [VisitMedia.objects.create(visit=visit, file=_photo(index)) for index in range(photos)]
+    dispenser_reports = []
+    for index in range(dispensers):
+        dispenser = Dispenser.objects.create(model=model, identifier=f"D-{index:03}", area=area)
+        DispenserProductAssignment.objects.create(dispenser=dispenser, product=product, nozzle=nozzle)
+        dispenser_reports.append(
+            {
+                "dispenser_id": dispenser.id,
+                "comment": _filler(text_length, index),
+                "photos": [media[(index + offset) % len(media)].file.url for offset in range(min(len(media), 2))],
+            }
+        )
+    visit.visit_report = {
+        "comments": _filler(text_length, 2),
+        "responsible_name": "Responsable benchmark",
+        "dispenser_reports": dispenser_reports,
+    }
+    visit.save(update_fields=["visit_report"])
+
+    schema = {"questions": [{"label": f"Pregunta {index}", "response_type": "text"} for index in range(questions)]}
+    form = AuditForm.objects.create(name="Formulario benchmark", schema=schema)
+    audit = Audit.objects.create(
+        area=area,
+        form=form,
+        form_name=form.name,
+        form_schema=schema,
+        inspector=inspector,
+        status=Audit.Status.COMPLETED,
+        started_at=now - timedelta(hours=1),
+        completed_at=now,
+        audit_report={
+            "form": {"name": form.name, "schema": schema},
+            "answers": [
+                {"label": question["label"], "value": _filler(text_length, index), "response_type": "text"}
+                for index, question in enumerate(schema["questions"])
+            ],
+            "responsible_name": "Responsable benchmark",
+            "ai_analysis": {
+                "score": 87,
+                "executive_summary": _filler(text_length * 2, 3),
+                "risks": [_filler(text_length // 2, index) for index in range(5)],
+                "strengths": [_filler(text_length // 2, index + 5) for index in range(5)],
+            },
+        },
+    )
+    for index in range(photos):
+        AuditMedia.objects.create(audit=audit, file=_photo(index))
+    return visit, audit
+
+
+def _builders(visit: Visit, audit: Audit) -> dict:
+    """Lo mismo que hacen las vistas, pero renderizando en este proceso para poder medirlo."""
+
+    def visit_pdf():
+        visit.refresh_from_db()
+        return views._render_visit_pdf(views._build_visit_report_snapshot(visit), public_report_url=PUBLIC_REPORT_URL)
+
+    def audit_pdf():
+        audit.refresh_from_db()
+        return views._render_audit_pdf(views._build_audit_report_snapshot(audit))
+
+    def visit_html():
+        payload = views._serialize_visit(Visit.objects.get(pk=visit.pk))
+        payload["public_report_url"] = PUBLIC_REPORT_URL
+        return build_visit_report_html(payload).encode("utf-8")
+
+    def audit_html():
+        return build_audit_report_html(views._serialize_audit(Audit.objects.get(pk=audit.pk))).encode("utf-8")
+
+    return {"visit_pdf": visit_pdf, "audit_pdf": audit_pdf, "visit_html": visit_html, "audit_html": audit_html}
+
+
+def _measure(build, repeat: int) -> dict:
+    # Una pasada sin medir para cargar fuentes, logo y cachés; el tiempo se mide sin
+    # tracemalloc, que ralentiza bastante, y la memoria en una pasada aparte.
+    output = build()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = build()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    try:
+        build()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_ms": round(statistics.median(timings), 2),
+        "wall_ms_min": round(min(timings), 2),
+        "peak_kib": round(peak / 1024, 1),
+        "bytes": len(output),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide tiempo, memoria pico y tamaño de los informes PDF y HTML de visitas y auditorías "
+        "con datos sintéticos. No usa la red ni deja datos: todo se crea en una transacción "
+        "que se revierte y en un MEDIA_ROOT temporal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dispensers", type=int, default=20, help="Dispensadores de la visita. Por defecto 20.")
+        parser.add_argument("--photos", type=int, default=8, help="Fotos de la visita y de la auditoría. Por defecto 8.")
+        parser.add_argument("--questions", type=int, default=30, help="Preguntas respondidas en la auditoría. Por defecto 30.")
+        parser.add_argument(
+            "--text-length",
+            type=int,
+            default=400,
+            help="Caracteres de cada comentario y respuesta. Por defecto 400.",
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="Repeticiones medidas por informe. Por defecto 5.")
+        parser.add_argument("--output", help="Guarda los resultados en este JSON para usarlo como línea base.")
+        parser.add_argument("--compare", help="JSON de una ejecución anterior con el que comparar.")
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            help="Falla si alguna métrica empeora más de este porcentaje respecto a --compare.",
+        )
+
+    def handle(self, *args, **options):
+        for name in ("dispensers", "photos", "questions", "text_length"):
+            if options[name] < 0:
+                raise CommandError(f"--{name.replace('_', '-')} no puede ser negativo.")
+        if options["repeat"] < 1:
+            raise CommandError("--repeat debe ser mayor o igual a 1.")
+        if options["max_regression"] is not None and not options["compare"]:
+            raise CommandError("--max-regression requiere --compare.")
+
+        baseline = None
+        if options["compare"]:
+            try:
+                baseline = json.loads(Path(options["compare"]).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"No se pudo leer {options['compare']}: {exc}") from exc
+
+        scenario = {name: options[name] for name in ("dispensers", "photos", "questions", "text_length")}
+        with tempfile.TemporaryDirectory(prefix="trust-benchmark-") as directory:
+            with override_settings(MEDIA_ROOT=directory, REPORT_CACHE_DIR=Path(directory) / "cache"):
+                with transaction.atomic():
+                    visit, audit = _create_fixtures(**scenario)
+                    results = {
+                        name: _measure(build, options["repeat"]) for name, build in _builders(visit, audit).items()
+                    }
+                    transaction.set_rollback(True)
+
+        report = {
+            "created_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "scenario": scenario,
+            "repeat": options["repeat"],
+            "results": results,
+        }
+        self._write_table(results, baseline)
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2) + "\n")
+            self.stdout.write(f"Resultados guardados en {options['output']}.")
+
+        if baseline is not None:
+            if baseline.get("scenario") != scenario:
+                self.stdout.write(self.style.WARNING("La línea base usa otro escenario; las diferencias no son comparables."))
+            regressions = self._regressions(results, baseline.get("results") or {}, options["max_regression"])
+            if regressions:
+                raise CommandError("Regresiones por encima del límite: " + ", ".join(regressions))
+
+    def _write_table(self, results: dict, baseline: dict | None):
+        previous = (baseline or {}).get("results") or {}
+        self.stdout.write(f"{'informe':<12}{'ms (mediana)':>16}{'KiB pico':>16}{'bytes':>16}")
+        for name, metrics in results.items():
+            cells = []
+            for metric in METRICS:
+                cell = str(metrics[metric])
+                before = (previous.get(name) or {}).get(metric)
+                if before:
+                    cell += f" ({(metrics[metric] - before) / before:+.0%})"
+                cells.append(f"{cell:>16}")
+            self.stdout.write(f"{name:<12}{''.join(cells)}")
+
+    def _regressions(self, results: dict, previous: dict, max_regression: float | None) -> list[str]:
+        if max_regression is None:
+            return []
+        regressions = []
+        for name, metrics in results.items():
+            for metric in METRICS:
+                before = (previous.get(name) or {}).get(metric)
+                if before and (metrics[metric] - before) / before * 100 > max_regression:
+                    regressions.append(f"{name}.{metric} {before} -> {metrics[metric]}")
+        return regressions
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.access import compute_user_scope_rows, find_area_scope_drift, get_stored_scope_rows, rebuild_user_area_scope
+
+
+class Command(BaseCommand):
+    help = "Verifica que la tabla UserAreaScope coincida con las asignaciones de cada usuario."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Recalcula el alcance de los usuarios inconsistentes.")
+
+    def handle(self, *args, **options):
+        drifted_users = find_area_scope_drift()
+        if not drifted_users:
+            self.stdout.write(self.style.SUCCESS("El alcance materializado es consistente."))
+            return
+
+        for user in drifted_users:
+            expected = compute_user_scope_rows(user)
+            stored = get_stored_scope_rows(user)
+            self.stdout.write(
+                f"Usuario {user.id} ({user.email}): {len(expected - stored)} filas faltantes, "
+                f"{len(stored - expected)} filas sobrantes."
+            )
+            if options["fix"]:
+                rebuild_user_area_scope(user)
+
+        if options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"Alcance recalculado para {len(drifted_users)} usuarios."))
+            return
+        raise CommandError(f"{len(drifted_users)} usuarios con alcance inconsistente.")
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.views import get_dashboard_cache_stats, reset_dashboard_cache_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Muestra aciertos, fallos y tiempo medio de recálculo de la caché del tablero. "
+        "Los contadores viven en la caché compartida, así que suman lo de todos los workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Reinicia los contadores después de mostrarlos.")
+
+    def handle(self, *args, **options):
+        stats = get_dashboard_cache_stats()
+        self.stdout.write(
+            f"Aciertos: {stats['hits']}  Fallos: {stats['misses']}  "
+            f"Tasa de aciertos: {stats['hit_ratio']:.2%}  "
+            f"Recálculo medio: {stats['avg_recompute_ms']} ms"
+        )
+        if options["reset"]:
+            reset_dashboard_cache_stats()
+            self.stdout.write(self.style.SUCCESS("Contadores reiniciados."))
@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.report_fonts import FONT_DIR, POPPINS_FILES, POPPINS_LICENSE, download_poppins
+
+
+class Command(BaseCommand):
+    help = (
+        "Descarga Poppins Regular, Bold e Italic y su licencia OFL en core/fonts para que "
+        "los informes PDF no dependan de la red ni de las fuentes del sistema. Pensado para "
+        "el paso de build o para versionar las fuentes junto al código."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dest", default=str(FONT_DIR), help=f"Carpeta de destino. Por defecto {FONT_DIR}.")
+        parser.add_argument("--timeout", type=float, default=30, help="Segundos de espera por archivo. Por defecto 30.")
+
+    def handle(self, *args, **options):
+        directory = Path(options["dest"])
+        if not download_poppins(directory, timeout=options["timeout"]):
+            raise CommandError(f"No se pudo descargar Poppins en {directory}; revisa la conexión y el log.")
+        for name in (*POPPINS_FILES, POPPINS_LICENSE):
+            self.stdout.write(f"{directory / name}")
+        self.stdout.write(self.style.SUCCESS("Poppins listo para los informes."))
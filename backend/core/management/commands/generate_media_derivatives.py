@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.media_derivatives import generate_derivatives
+from core.models import AuditMedia, IncidentMedia, VisitMedia
+
+
+class Command(BaseCommand):
+    help = "Genera miniatura y versión para informe de las fotos de evidencia subidas antes de existir los derivados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Regenera también las fotos que ya tienen derivados.")
+
+    def handle(self, *args, **options):
+        for model in (VisitMedia, AuditMedia, IncidentMedia):
+            queryset = model.objects.filter(media_type=model.MediaType.PHOTO).exclude(file="").order_by("id")
+            if not options["force"]:
+                queryset = queryset.filter(report_image="")
+            generated = skipped = 0
+            for medium in queryset.iterator(chunk_size=200):
+                if generate_derivatives(medium):
+                    generated += 1
+                else:
+                    skipped += 1
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {generated} generadas, {skipped} sin derivados.")
+        self.stdout.write(self.style.SUCCESS("Derivados actualizados."))
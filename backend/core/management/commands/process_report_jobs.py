@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.report_jobs import process_pending
+
+
+class Command(BaseCommand):
+    help = "Genera los PDF pendientes de visitas y auditorías finalizadas a partir de la cola ReportRenderJob."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Vacía la cola una vez y termina.")
+        parser.add_argument("--limit", type=int, help="Máximo de trabajos a procesar en cada pasada.")
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=5.0,
+            help="Segundos de espera cuando la cola está vacía. Por defecto 5.",
+        )
+
+    def handle(self, *args, **options):
+        if options["limit"] is not None and options["limit"] < 1:
+            raise CommandError("--limit debe ser mayor o igual a 1.")
+        if options["sleep"] <= 0:
+            raise CommandError("--sleep debe ser mayor que 0.")
+
+        while True:
+            done, failed = process_pending(options["limit"])
+            if done or failed:
+                self.stdout.write(f"Informes generados: {done}  Fallidos: {failed}")
+            if options["once"]:
+                self.stdout.write(self.style.SUCCESS("Cola procesada."))
+                return
+            if not done and not failed:
+                time.sleep(options["sleep"])
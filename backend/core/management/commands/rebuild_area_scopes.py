@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from core.access import SCOPED_ROLES, rebuild_user_area_scope
+from core.models import User
+
+
+class Command(BaseCommand):
+    help = "Recalcula la tabla de alcance materializado (UserAreaScope) de los administradores."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", dest="user_ids", action="append", type=int, help="Limita el recálculo a este usuario.")
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(Q(role__in=SCOPED_ROLES) | Q(area_scopes__isnull=False)).distinct()
+        if options["user_ids"]:
+            users = User.objects.filter(id__in=options["user_ids"])
+
+        total_users = 0
+        total_rows = 0
+        for user in users.order_by("id"):
+            total_rows += rebuild_user_area_scope(user)
+            total_users += 1
+        self.stdout.write(self.style.SUCCESS(f"Alcance recalculado para {total_users} usuarios ({total_rows} filas)."))
@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from core.compliance import local_date, rebuild_rollup
+from core.models import Audit, DailyAreaCompliance, Incident, Visit
+
+
+class Command(BaseCommand):
+    help = "Recalcula el rollup DailyAreaCompliance desde visitas, auditorías e incidencias."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=35,
+            help="Días hacia atrás (incluido hoy) a recalcular. Por defecto 35.",
+        )
+        parser.add_argument("--all", action="store_true", help="Recalcula todo el historial.")
+
+    def handle(self, *args, **options):
+        if not options["all"] and options["days"] < 1:
+            raise CommandError("--days debe ser mayor o igual a 1.")
+
+        today = local_date(timezone.now())
+        bounds = self._history_bounds()
+        if bounds is None:
+            self.stdout.write(self.style.SUCCESS("No hay actividad para consolidar."))
+            return
+        if options["all"]:
+            start_day, end_day = bounds
+        else:
+            start_day = today - timedelta(days=options["days"] - 1)
+            # Las programaciones futuras también tienen fila propia.
+            end_day = max(today, bounds[1])
+
+        changed, total = rebuild_rollup(start_day, end_day)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rollup recalculado del {start_day.isoformat()} al {end_day.isoformat()}: "
+                f"{total} filas, {changed} corregidas."
+            )
+        )
+
+    def _history_bounds(self):
+        values = []
+        for queryset, fields in (
+            (Visit.objects.all(), ("visited_at", "completed_at")),
+            (Audit.objects.all(), ("audited_at", "completed_at")),
+            (Incident.objects.all(), ("created_at",)),
+        ):
+            aggregates = {}
+            for field in fields:
+                aggregates[f"min_{field}"] = Min(field)
+                aggregates[f"max_{field}"] = Max(field)
+            values.extend(local_date(value) for value in queryset.aggregate(**aggregates).values() if value)
+        values.extend(value for value in DailyAreaCompliance.objects.aggregate(Min("date"), Max("date")).values() if value)
+        if not values:
+            return None
+        return min(values), max(values)
@@ -0,0 +1,112 @@
+import logging
+from io import BytesIO
+from pathlib import Path, PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+logger = logging.getLogger(__name__)
+
+# variante -> (lado máximo en px, calidad JPEG). "report" es la que usan los PDF y el
+# informe HTML; "thumb" la de los listados de la app.
+DERIVATIVE_SPECS = {
+    "thumb": (320, 70),
+    "report": (1600, 82),
+}
+DERIVATIVE_FIELDS = {"thumb": "thumbnail", "report": "report_image"}
+
+
+def derivative_name(name: str, variant: str) -> str:
+    """``visits/media/foto.heic`` -> ``visits/media/derivatives/foto.heic.report.jpg``.
+
+    Lleva el nombre completo del original, extensión incluida: el almacenamiento ya lo
+    hace único, así que ``foto.jpg`` y ``foto.png`` no comparten derivados.
+    """
+    path = PurePosixPath(name)
+    return str(path.parent / "derivatives" / f"{path.name}.{variant}.jpg")
+
+
+def report_path(path: Path) -> Path:
+    """Versión para informe de un archivo de media ya resuelto en disco, si existe."""
+    candidate = path.parent / "derivatives" / f"{path.name}.report.jpg"
+    return candidate if candidate.is_file() else path
+
+
+def render_derivatives(source) -> dict[str, bytes]:
+    with Image.open(source) as image:
+        # Las fotos de móvil suelen venir giradas por EXIF; se aplica antes de reducir.
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "L"):
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A") if "A" in image.getbands() else None)
+            image = background
+        elif image.mode == "L":
+            image = image.convert("RGB")
+
+        rendered = {}
+        for variant, (max_side, quality) in DERIVATIVE_SPECS.items():
+            derivative = image.copy()
+            derivative.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            derivative.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+            rendered[variant] = buffer.getvalue()
+        return rendered
+
+
+def generate_derivatives(medium) -> bool:
+    """Crea miniatura y versión de informe de una foto y las guarda en el registro.
+
+    Devuelve False si no es una foto o Pillow no puede abrirla (p. ej. HEIC sin plugin o
+    una imagen con más píxeles de los que Pillow acepta descomprimir); en ese caso se
+    sigue usando el original.
+    """
+    if medium.media_type != medium.MediaType.PHOTO or not medium.file:
+        return False
+    try:
+        with medium.file.open("rb") as handle:
+            rendered = render_derivatives(handle)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError) as exc:
+        logger.info("No se generaron derivados de %s: %s", medium.file.name, exc)
+        return False
+
+    storage = medium.file.storage
+    names = {}
+    for variant, payload in rendered.items():
+        name = derivative_name(medium.file.name, variant)
+        if not _is_referenced(medium, name):
+            storage.delete(name)
+        names[DERIVATIVE_FIELDS[variant]] = storage.save(name, ContentFile(payload))
+
+    previous = [getattr(medium, field).name for field in names if getattr(medium, field)]
+    # update() en vez de save() para no volver a disparar post_save.
+    type(medium).objects.filter(pk=medium.pk).update(**names)
+    for field, name in names.items():
+        setattr(medium, field, name)
+    # Derivados con el esquema de nombres anterior que ya no usa nadie.
+    _delete_unreferenced(medium, [name for name in previous if name not in names.values()])
+    return True
+
+
+def _is_referenced(medium, name: str) -> bool:
+    """Si otro registro apunta a ``name``; ese archivo no se puede borrar ni sobrescribir."""
+    return (
+        type(medium)
+        .objects.exclude(pk=medium.pk)
+        .filter(Q(file=name) | Q(thumbnail=name) | Q(report_image=name))
+        .exists()
+    )
+
+
+def _delete_unreferenced(medium, names) -> None:
+    storage = medium.file.storage
+    for name in names:
+        if not _is_referenced(medium, name):
+            storage.delete(name)
+
+
+def delete_derivatives(medium) -> None:
+    """Borra los derivados de un registro eliminado, salvo que otro siga usándolos."""
+    names = [getattr(medium, field).name for field in DERIVATIVE_FIELDS.values() if getattr(medium, field)]
+    _delete_unreferenced(medium, names)
@@ -0,0 +1,12 @@
+from .access import RequestPrincipal
+
+
+class RequestPrincipalMiddleware:
+    """Expone ``request.principal`` para que vistas y helpers compartan usuario y alcance."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.principal = RequestPrincipal(request)
+        return self.get_response(request)
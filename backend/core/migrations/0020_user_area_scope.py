@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_user_area_scopes(apps, schema_editor):
+    User = apps.get_model("core", "User")
+    Branch = apps.get_model("core", "Branch")
+    Area = apps.get_model("core", "Area")
+    UserAreaScope = apps.get_model("core", "UserAreaScope")
+
+    scope_rows = []
+    for user in User.objects.filter(role__in=["account_admin", "branch_admin"]):
+        if user.role == "account_admin":
+            client_ids = set(user.clients.values_list("id", flat=True))
+            branch_rows = set(Branch.objects.filter(client__users=user).values_list("id", "client_id"))
+            area_rows = set(
+                Area.objects.filter(branch__client__users=user).values_list("id", "branch_id", "branch__client_id")
+            )
+        else:
+            branch_rows = set(user.branches.values_list("id", "client_id"))
+            client_ids = {client_id for _, client_id in branch_rows}
+            area_rows = set(Area.objects.filter(branch__users=user).values_list("id", "branch_id", "branch__client_id"))
+
+        scope_rows.extend(UserAreaScope(user_id=user.id, client_id=client_id) for client_id in client_ids)
+        scope_rows.extend(
+            UserAreaScope(user_id=user.id, client_id=client_id, branch_id=branch_id)
+            for branch_id, client_id in branch_rows
+        )
+        scope_rows.extend(
+            UserAreaScope(user_id=user.id, client_id=client_id, branch_id=branch_id, area_id=area_id)
+            for area_id, branch_id, client_id in area_rows
+        )
+    UserAreaScope.objects.bulk_create(scope_rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_gmailapisettings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserAreaScope',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('area', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.area')),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.branch')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.client')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='area_scopes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Alcance de usuario',
+                'verbose_name_plural': 'Alcances de usuario',
+                'indexes': [models.Index(fields=['user', 'area'], name='core_scope_user_area_idx'), models.Index(fields=['user', 'branch'], name='core_scope_user_branch_idx'), models.Index(fields=['user', 'client'], name='core_scope_user_client_idx')],
+            },
+        ),
+        migrations.RunPython(populate_user_area_scopes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_daily_area_compliance(apps, schema_editor):
+    Visit = apps.get_model("core", "Visit")
+    Audit = apps.get_model("core", "Audit")
+    Incident = apps.get_model("core", "Incident")
+    DailyAreaCompliance = apps.get_model("core", "DailyAreaCompliance")
+
+    counts = {}
+
+    def add(area_id, value, field):
+        key = (area_id, timezone.localtime(value).date())
+        row = counts.setdefault(key, {})
+        row[field] = row.get(field, 0) + 1
+
+    for model, scheduled_field, kind in ((Visit, "visited_at", "visits"), (Audit, "audited_at", "audits")):
+        for area_id, status, scheduled_at, completed_at in model.objects.values_list(
+            "area_id", "status", scheduled_field, "completed_at"
+        ).iterator():
+            if status == "completed":
+                add(area_id, completed_at or scheduled_at, f"completed_{kind}")
+            elif status == "scheduled":
+                add(area_id, scheduled_at, f"scheduled_{kind}")
+    for area_id, created_at in Incident.objects.values_list("area_id", "created_at").iterator():
+        add(area_id, created_at, "incidents")
+
+    DailyAreaCompliance.objects.bulk_create(
+        (DailyAreaCompliance(area_id=area_id, date=day, **row) for (area_id, day), row in counts.items()),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_sync_updated_at_deleted_record'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAreaCompliance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('completed_visits', models.PositiveIntegerField(default=0)),
+                ('completed_audits', models.PositiveIntegerField(default=0)),
+                ('scheduled_visits', models.PositiveIntegerField(default=0)),
+                ('scheduled_audits', models.PositiveIntegerField(default=0)),
+                ('incidents', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('area', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_compliance', to='core.area')),
+            ],
+            options={
+                'verbose_name': 'Cumplimiento diario por área',
+                'verbose_name_plural': 'Cumplimiento diario por área',
+                'indexes': [models.Index(fields=['date'], name='core_daily_compliance_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('area', 'date'), name='core_daily_compliance_area_date_uniq')],
+            },
+        ),
+        migrations.RunPython(populate_daily_area_compliance, migrations.RunPython.noop),
+    ]
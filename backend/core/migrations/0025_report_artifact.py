@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:56
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('visit', 'Visita'), ('audit', 'Auditoría')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('variant', models.CharField(default='plain', max_length=255)),
+                ('template_version', models.CharField(max_length=20)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('file', models.FileField(upload_to='reports/')),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Informe generado',
+                'verbose_name_plural': 'Informes generados',
+                'indexes': [models.Index(fields=['kind', 'object_id'], name='core_report_artifact_obj_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id', 'variant', 'template_version', 'content_hash'), name='core_report_artifact_key_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_report_artifact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportRenderJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('visit', 'Visita'), ('audit', 'Auditoría')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En proceso'), ('done', 'Listo'), ('failed', 'Fallido')], default='pending', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Renderizado de informe',
+                'verbose_name_plural': 'Renderizados de informes',
+                'indexes': [models.Index(fields=['status', 'created_at'], name='core_report_job_queue_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='core_report_job_object_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_report_render_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditmedia',
+            name='report_image',
+            field=models.FileField(blank=True, upload_to='audits/media/derivatives/'),
+        ),
+        migrations.AddField(
+            model_name='auditmedia',
+            name='thumbnail',
+            field=models.FileField(blank=True, upload_to='audits/media/derivatives/'),
+        ),
+        migrations.AddField(
+            model_name='incidentmedia',
+            name='report_image',
+            field=models.FileField(blank=True, upload_to='incidents/media/derivatives/'),
+        ),
+        migrations.AddField(
+            model_name='incidentmedia',
+            name='thumbnail',
+            field=models.FileField(blank=True, upload_to='incidents/media/derivatives/'),
+        ),
+        migrations.AddField(
+            model_name='visitmedia',
+            name='report_image',
+            field=models.FileField(blank=True, upload_to='visits/media/derivatives/'),
+        ),
+        migrations.AddField(
+            model_name='visitmedia',
+            name='thumbnail',
+            field=models.FileField(blank=True, upload_to='visits/media/derivatives/'),
+        ),
+    ]
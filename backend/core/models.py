@@ -9,6 +9,7 @@ class Client(models.Model):
     name = models.CharField(max_length=255)
     code = models.CharField(max_length=50, unique=True)
     notes = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ["name"]
@@ -22,6 +23,7 @@ class Branch(models.Model):
     name = models.CharField(max_length=255)
     address = models.CharField(max_length=255, blank=True)
     city = models.CharField(max_length=120, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ["name"]
@@ -42,6 +44,7 @@ class Area(models.Model):
         blank=True,
         null=True,
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ["name"]
@@ -77,6 +80,7 @@ class Dispenser(models.Model):
         through="DispenserProductAssignment",
     )
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ["identifier"]
@@ -186,6 +190,7 @@ class Visit(models.Model):
     end_latitude = models.FloatField(blank=True, null=True)
     end_longitude = models.FloatField(blank=True, null=True)
     visit_report = models.JSONField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ["-visited_at"]
@@ -203,6 +208,9 @@ class VisitMedia(models.Model):
     visit = models.ForeignKey(Visit, on_delete=models.CASCADE, related_name="media")
     media_type = models.CharField(max_length=20, choices=MediaType.choices, default=MediaType.PHOTO)
     file = models.FileField(upload_to="visits/media/")
+    # Derivados JPEG de las fotos (ver core.media_derivatives); vacíos en videos y otros.
+    thumbnail = models.FileField(upload_to="visits/media/derivatives/", blank=True)
+    report_image = models.FileField(upload_to="visits/media/derivatives/", blank=True)
     description = models.CharField(max_length=255, blank=True)
 
     def __str__(self) -> str:
@@ -251,6 +259,7 @@ class Audit(models.Model):
     end_latitude = models.FloatField(blank=True, null=True)
     end_longitude = models.FloatField(blank=True, null=True)
     audit_report = models.JSONField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ["-audited_at"]
@@ -268,6 +277,8 @@ class AuditMedia(models.Model):
     audit = models.ForeignKey(Audit, on_delete=models.CASCADE, related_name="media")
     media_type = models.CharField(max_length=20, choices=MediaType.choices, default=MediaType.PHOTO)
     file = models.FileField(upload_to="audits/media/")
+    thumbnail = models.FileField(upload_to="audits/media/derivatives/", blank=True)
+    report_image = models.FileField(upload_to="audits/media/derivatives/", blank=True)
     description = models.CharField(max_length=255, blank=True)
 
     def __str__(self) -> str:
@@ -356,6 +367,7 @@ class Incident(models.Model):
     )
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ["-created_at"]
@@ -372,6 +384,8 @@ class IncidentMedia(models.Model):
     incident = models.ForeignKey(Incident, on_delete=models.CASCADE, related_name="media")
     media_type = models.CharField(max_length=20, choices=MediaType.choices, default=MediaType.PHOTO)
     file = models.FileField(upload_to="incidents/media/")
+    thumbnail = models.FileField(upload_to="incidents/media/derivatives/", blank=True)
+    report_image = models.FileField(upload_to="incidents/media/derivatives/", blank=True)
     description = models.CharField(max_length=255, blank=True)
 
     def __str__(self) -> str:
@@ -395,6 +409,230 @@ class User(AbstractUser):
         return f"{self.get_full_name() or self.username} ({self.get_role_display()})"
 
 
+class UserAreaScope(models.Model):
+    """Alcance materializado de un usuario administrador.
+
+    Cada cliente, sucursal y área visibles tiene su propia fila: ``(cliente)``,
+    ``(cliente, sucursal)`` o ``(cliente, sucursal, área)``. Al borrar un
+    cliente, una sucursal o un área, las llaves foráneas eliminan sus filas en
+    cascada, por lo que solo las altas y los movimientos requieren recálculo.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="area_scopes")
+    client = models.ForeignKey(Client, on_delete=models.CASCADE, related_name="+")
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE, related_name="+", blank=True, null=True)
+    area = models.ForeignKey(Area, on_delete=models.CASCADE, related_name="+", blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Alcance de usuario"
+        verbose_name_plural = "Alcances de usuario"
+        indexes = [
+            models.Index(fields=["user", "area"], name="core_scope_user_area_idx"),
+            models.Index(fields=["user", "branch"], name="core_scope_user_branch_idx"),
+            models.Index(fields=["user", "client"], name="core_scope_user_client_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} - {self.client_id}/{self.branch_id or '*'}/{self.area_id or '*'}"
+
+
+class CacheVersion(models.Model):
+    """Token de versión compartido por todos los procesos para invalidar datos en caché.
+
+    Cada proceso guarda su copia junto al token con el que la construyó y la
+    descarta en cuanto el token almacenado aquí cambia.
+    """
+
+    key = models.CharField(max_length=120, unique=True)
+    token = models.CharField(max_length=32)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Versión de caché"
+        verbose_name_plural = "Versiones de caché"
+
+    def __str__(self) -> str:
+        return f"{self.key}: {self.token}"
+
+
+class DeletedRecord(models.Model):
+    """Marca de borrado que la sincronización incremental entrega a las apps.
+
+    Guarda los ids de cliente, sucursal y área del registro borrado para poder
+    filtrar por alcance aunque esos padres ya no existan.
+    """
+
+    resource = models.CharField(max_length=40)
+    object_id = models.BigIntegerField()
+    client_id = models.BigIntegerField(blank=True, null=True)
+    branch_id = models.BigIntegerField(blank=True, null=True)
+    area_id = models.BigIntegerField(blank=True, null=True)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Registro eliminado"
+        verbose_name_plural = "Registros eliminados"
+
+    def __str__(self) -> str:
+        return f"{self.resource} #{self.object_id}"
+
+
+class DailyAreaCompliance(models.Model):
+    """Conteos diarios de cumplimiento por área, en la zona horaria local.
+
+    Lo completado se cuenta en su día de cierre y lo programado en su día
+    previsto; las programaciones de días anteriores a hoy son las vencidas.
+    """
+
+    area = models.ForeignKey(Area, on_delete=models.CASCADE, related_name="daily_compliance")
+    date = models.DateField()
+    completed_visits = models.PositiveIntegerField(default=0)
+    completed_audits = models.PositiveIntegerField(default=0)
+    scheduled_visits = models.PositiveIntegerField(default=0)
+    scheduled_audits = models.PositiveIntegerField(default=0)
+    incidents = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Cumplimiento diario por área"
+        verbose_name_plural = "Cumplimiento diario por área"
+        constraints = [
+            models.UniqueConstraint(fields=["area", "date"], name="core_daily_compliance_area_date_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["date"], name="core_daily_compliance_date_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.area_id} - {self.date:%Y-%m-%d}"
+
+
+class Notification(models.Model):
+    """Aviso de la bandeja de un usuario; se crea una fila por destinatario al ocurrir el evento."""
+
+    class Kind(models.TextChoices):
+        VISIT = "visit", _("Visita")
+        AUDIT = "audit", _("Auditoría")
+        INCIDENT = "incident", _("Incidencia")
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notifications")
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    event = models.CharField(max_length=40)
+    object_id = models.BigIntegerField()
+    area = models.ForeignKey(Area, on_delete=models.SET_NULL, related_name="+", blank=True, null=True)
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    created_at = models.DateTimeField(default=timezone.now)
+    read_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Notificación"
+        verbose_name_plural = "Notificaciones"
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-id"], name="core_notification_feed_idx"),
+            models.Index(
+                fields=["user"],
+                condition=models.Q(read_at__isnull=True),
+                name="core_notification_unread_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} - {self.title}"
+
+
+class StreamEvent(models.Model):
+    """Evento del stream en vivo, compartido por todos los procesos.
+
+    Lo escribe el worker que publica (WSGI o ASGI) y lo leen los procesos ASGI con
+    clientes conectados. Solo se conservan los últimos para reanudar con ``Last-Event-ID``.
+    """
+
+    event = models.CharField(max_length=40)
+    data = models.JSONField(default=dict)
+    user_ids = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Evento en vivo"
+        verbose_name_plural = "Eventos en vivo"
+
+    def __str__(self) -> str:
+        return f"{self.event} #{self.id}"
+
+
+class ReportArtifact(models.Model):
+    """PDF ya generado de una visita o auditoría finalizada.
+
+    Se identifica por objeto, variante, versión de plantilla y hash del contenido:
+    mientras ninguno cambie, el archivo se sirve tal cual sin volver a renderizar.
+    """
+
+    class Kind(models.TextChoices):
+        VISIT = "visit", _("Visita")
+        AUDIT = "audit", _("Auditoría")
+
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    object_id = models.BigIntegerField()
+    variant = models.CharField(max_length=255, default="plain")
+    template_version = models.CharField(max_length=20)
+    content_hash = models.CharField(max_length=64)
+    file = models.FileField(upload_to="reports/")
+    size = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Informe generado"
+        verbose_name_plural = "Informes generados"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id", "variant", "template_version", "content_hash"],
+                name="core_report_artifact_key_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["kind", "object_id"], name="core_report_artifact_obj_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} #{self.object_id} ({self.variant})"
+
+
+class ReportRenderJob(models.Model):
+    """Renderizado pendiente del informe de una visita o auditoría.
+
+    Hay una fila por objeto: volver a encolarlo la reinicia como pendiente.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pendiente")
+        RUNNING = "running", _("En proceso")
+        DONE = "done", _("Listo")
+        FAILED = "failed", _("Fallido")
+
+    kind = models.CharField(max_length=20, choices=ReportArtifact.Kind.choices)
+    object_id = models.BigIntegerField()
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Renderizado de informe"
+        verbose_name_plural = "Renderizados de informes"
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="core_report_job_object_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="core_report_job_queue_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} #{self.object_id} ({self.status})"
+
+
 class FirebaseConfig(models.Model):
     nombre = models.CharField(max_length=100, default="Configuración Principal")
     archivo_json = models.FileField(
@@ -0,0 +1,88 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import ReportArtifact
+
+
+# Subir cuando cambie el diseño de ``_build_visit_pdf`` o ``_build_audit_pdf``: los
+# informes guardados con otra versión dejan de servirse y se regeneran al pedirlos.
+REPORT_TEMPLATE_VERSION = "2"
+
+
+def content_hash(snapshot: dict) -> str:
+    payload = json.dumps(snapshot, cls=DjangoJSONEncoder, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _is_usable(artifact: ReportArtifact | None, max_age: timedelta | None) -> bool:
+    if artifact is None or not artifact.file:
+        return False
+    if max_age is not None and artifact.created_at < timezone.now() - max_age:
+        return False
+    return artifact.file.storage.exists(artifact.file.name)
+
+
+def find_artifact(kind: str, object_id: int, snapshot: dict, *, variant: str = "plain", max_age=None):
+    """Informe vigente para ``snapshot`` o None si hay que renderizarlo."""
+    artifact = ReportArtifact.objects.filter(
+        kind=kind,
+        object_id=object_id,
+        variant=variant,
+        template_version=REPORT_TEMPLATE_VERSION,
+        content_hash=content_hash(snapshot),
+    ).first()
+    return artifact if _is_usable(artifact, max_age) else None
+
+
+def store_artifact(kind: str, object_id: int, snapshot: dict, pdf_bytes: bytes, *, variant: str = "plain"):
+    """Guarda ``pdf_bytes`` como informe vigente y descarta los de contenido o versión anteriores."""
+    digest = content_hash(snapshot)
+    key = {
+        "kind": kind,
+        "object_id": object_id,
+        "variant": variant,
+        "template_version": REPORT_TEMPLATE_VERSION,
+        "content_hash": digest,
+    }
+    artifact = ReportArtifact.objects.filter(**key).first() or ReportArtifact(**key)
+    previous_name = artifact.file.name if artifact.file else None
+    artifact.size = len(pdf_bytes)
+    artifact.created_at = timezone.now()
+    artifact.file.save(f"{kind}-{object_id}-{digest[:16]}.pdf", ContentFile(pdf_bytes), save=False)
+    try:
+        with transaction.atomic():
+            artifact.save()
+    except IntegrityError:
+        # Otro proceso guardó el mismo informe a la vez; se conserva el suyo.
+        artifact.file.storage.delete(artifact.file.name)
+        return ReportArtifact.objects.get(**key)
+
+    if previous_name and previous_name != artifact.file.name:
+        artifact.file.storage.delete(previous_name)
+    discard_artifacts(
+        ReportArtifact.objects.filter(kind=kind, object_id=object_id, variant=variant).exclude(pk=artifact.pk)
+    )
+    return artifact
+
+
+def get_or_render(kind: str, object_id: int, snapshot: dict, render, *, variant: str = "plain", max_age=None):
+    """Devuelve el informe guardado o lo genera con ``render()`` y lo guarda."""
+    artifact = find_artifact(kind, object_id, snapshot, variant=variant, max_age=max_age)
+    if artifact is not None:
+        return artifact
+    return store_artifact(kind, object_id, snapshot, render(), variant=variant)
+
+
+def discard_artifacts(queryset) -> int:
+    artifacts = list(queryset)
+    for artifact in artifacts:
+        if artifact.file:
+            artifact.file.storage.delete(artifact.file.name)
+    ReportArtifact.objects.filter(pk__in=[artifact.pk for artifact in artifacts]).delete()
+    return len(artifacts)
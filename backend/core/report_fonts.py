@@ -0,0 +1,134 @@
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+from urllib.request import Request, urlopen
+
+import reportlab
+from django.conf import settings
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+
+logger = logging.getLogger(__name__)
+
+# Poppins-Regular/Bold/Italic.ttf copiados aquí (``manage.py fetch_report_fonts``) tienen
+# prioridad sobre los del sistema y sobre la copia descargada en REPORT_CACHE_DIR.
+FONT_DIR = Path(__file__).resolve().parent / "fonts"
+_REPORTLAB_FONT_DIR = Path(reportlab.__file__).resolve().parent / "fonts"
+
+# Poppins se distribuye con licencia SIL Open Font License; OFL.txt viaja junto a las TTF.
+POPPINS_BASE_URL = "https://github.com/google/fonts/raw/main/ofl/poppins/"
+POPPINS_FILES = ("Poppins-Regular.ttf", "Poppins-Bold.ttf", "Poppins-Italic.ttf")
+POPPINS_LICENSE = "OFL.txt"
+POPPINS_DIRS = [FONT_DIR, Path("/usr/share/fonts/truetype/poppins"), Path("/usr/share/fonts/poppins")]
+
+
+class ReportFonts(NamedTuple):
+    regular: str
+    bold: str
+    italic: str
+
+
+FALLBACK_FONTS = ReportFonts("Helvetica", "Helvetica-Bold", "Helvetica-Oblique")
+
+# Alternativas a Poppins en orden de preferencia. La última viaja con reportlab, así que
+# siempre hay una TTF con acentos sin depender del sistema ni de la red.
+FALLBACK_CANDIDATES = [
+    (
+        "TrustSans",
+        (
+            Path("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"),
+            Path("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"),
+            Path("/usr/share/fonts/truetype/dejavu/DejaVuSans-Oblique.ttf"),
+        ),
+    ),
+    (
+        "TrustSans",
+        (
+            Path("/usr/share/fonts/dejavu/DejaVuSans.ttf"),
+            Path("/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf"),
+            Path("/usr/share/fonts/dejavu/DejaVuSans-Oblique.ttf"),
+        ),
+    ),
+    (
+        "TrustSans",
+        (_REPORTLAB_FONT_DIR / "Vera.ttf", _REPORTLAB_FONT_DIR / "VeraBd.ttf", _REPORTLAB_FONT_DIR / "VeraIt.ttf"),
+    ),
+]
+
+
+def _cache_dir() -> Path:
+    return Path(getattr(settings, "REPORT_CACHE_DIR", Path(settings.MEDIA_ROOT) / "cache")) / "fonts"
+
+
+def _poppins_candidates() -> list[tuple[str, tuple[Path, ...]]]:
+    return [("Poppins", tuple(directory / name for name in POPPINS_FILES)) for directory in (*POPPINS_DIRS, _cache_dir())]
+
+
+def download_poppins(directory: Path, *, timeout: float = 10) -> bool:
+    """Descarga las TTF de Poppins y su licencia en ``directory`` si faltan.
+
+    Cada archivo se escribe de forma atómica, así que varios procesos pueden intentarlo a
+    la vez. Devuelve si la familia quedó completa.
+    """
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in (*POPPINS_FILES, POPPINS_LICENSE):
+            target = directory / name
+            if target.exists():
+                continue
+            request = Request(POPPINS_BASE_URL + name, headers={"User-Agent": "trust-report-generator/1.0"})
+            with urlopen(request, timeout=timeout) as response:
+                payload = response.read()
+            temporary = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+            temporary.write_bytes(payload)
+            os.replace(temporary, target)
+    except (OSError, ValueError) as exc:
+        logger.warning("Could not download Poppins into %s: %s", directory, exc)
+        return False
+    return True
+
+
+def _register_family(family: str, paths: tuple[Path, ...]) -> ReportFonts | None:
+    if not all(path.exists() for path in paths):
+        return None
+    fonts = ReportFonts(family, f"{family}-Bold", f"{family}-Italic")
+    try:
+        for name, path in zip(fonts, paths):
+            pdfmetrics.registerFont(TTFont(name, str(path)))
+    except Exception:
+        logger.warning("Could not load report font family %s from %s.", family, paths[0].parent, exc_info=True)
+        return None
+    pdfmetrics.registerFontFamily(family, normal=fonts.regular, bold=fonts.bold, italic=fonts.italic, boldItalic=fonts.bold)
+    return fonts
+
+
+@lru_cache(maxsize=1)
+def register_report_fonts() -> ReportFonts:
+    """Registra en reportlab la tipografía de los informes y devuelve sus nombres.
+
+    Se llama desde ``CoreConfig.ready``; los informes de visita y de auditoría usan el
+    mismo resultado. Poppins se busca en ``core/fonts``, en el sistema y en la caché de
+    informes. Solo con REPORT_FONTS_REMOTE_ENABLED = True se descarga a esa caché si no
+    está en ninguno; nunca al generar un informe. Si falta, se usa otra familia y queda
+    un aviso en el log.
+    """
+    poppins = _poppins_candidates()
+    if not any(all(path.exists() for path in paths) for _, paths in poppins) and getattr(
+        settings, "REPORT_FONTS_REMOTE_ENABLED", False
+    ):
+        download_poppins(_cache_dir())
+
+    for family, paths in poppins + FALLBACK_CANDIDATES:
+        fonts = _register_family(family, paths)
+        if fonts is None:
+            continue
+        if family != "Poppins":
+            logger.warning(
+                "Poppins is not available; reports use %s. Run `manage.py fetch_report_fonts` to bundle it.", family
+            )
+        return fonts
+    logger.warning("No TrueType report font available; reports use Helvetica without full accent support.")
+    return FALLBACK_FONTS
@@ -0,0 +1,144 @@
+import base64
+import hashlib
+import logging
+import os
+import threading
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+from typing import NamedTuple
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib.utils import ImageReader
+
+try:
+    from svglib.svglib import svg2rlg
+except Exception:  # pragma: no cover - optional dependency
+    svg2rlg = None
+
+
+logger = logging.getLogger(__name__)
+
+LOGO_PATHS = [
+    Path(__file__).resolve().parents[2] / "frontend/public/trust_logo_s.png",
+    Path(__file__).resolve().parents[2] / "frontend/public/trust_logo_s.svg",
+    Path(__file__).resolve().parents[2] / "frontend/public/trust_logo.svg",
+]
+LOGO_URLS = [
+    "https://trust.supplymax.net/trust_logo_s.png",
+    "https://trust.supplymax.net/trust_logo_s.svg",
+]
+
+_eviction_lock = threading.Lock()
+
+
+def _cache_dir() -> Path:
+    return Path(getattr(settings, "REPORT_CACHE_DIR", Path(settings.MEDIA_ROOT) / "cache")) / "images"
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temporary.write_bytes(payload)
+    os.replace(temporary, path)
+
+
+def _evict(directory: Path, max_bytes: int) -> None:
+    """Borra los contenidos usados hace más tiempo hasta quedar por debajo del 90% del límite."""
+    with _eviction_lock:
+        entries = []
+        for path in directory.glob("*.img"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        if total <= max_bytes:
+            return
+        target = max_bytes * 0.9
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            path.unlink(missing_ok=True)
+            total -= size
+            if total <= target:
+                break
+
+
+def fetch_remote_image(url: str, *, timeout: float) -> bytes | None:
+    """Contenido de una imagen remota, descargada como mucho una vez para todos los procesos.
+
+    Los archivos se guardan por hash del contenido (``<sha256>.img``) y cada URL apunta a
+    su hash, así que dos URLs con la misma imagen ocupan un solo archivo. Cada lectura
+    renueva la fecha del archivo y, al superar ``REPORT_IMAGE_CACHE_MAX_BYTES``, se
+    descartan los menos usados. Una URL cuyo contenido fue descartado se vuelve a pedir.
+    """
+    directory = _cache_dir()
+    url_path = directory / "urls" / hashlib.sha256(url.encode()).hexdigest()
+    try:
+        content_path = directory / f"{url_path.read_text().strip()}.img"
+        payload = content_path.read_bytes()
+        os.utime(content_path)
+        return payload
+    except (FileNotFoundError, ValueError):
+        pass
+
+    max_image_bytes = int(getattr(settings, "REPORT_IMAGE_MAX_BYTES", 10 * 1024 * 1024))
+    try:
+        request = Request(url, headers={"User-Agent": "trust-report-generator/1.0"})
+        with urlopen(request, timeout=timeout) as response:
+            payload = response.read(max_image_bytes + 1)
+    except Exception:
+        return None
+    if not payload or len(payload) > max_image_bytes:
+        return None
+
+    digest = hashlib.sha256(payload).hexdigest()
+    _write_atomic(directory / f"{digest}.img", payload)
+    _write_atomic(url_path, digest.encode())
+    _evict(directory, int(getattr(settings, "REPORT_IMAGE_CACHE_MAX_BYTES", 200 * 1024 * 1024)))
+    return payload
+
+
+class ReportLogo(NamedTuple):
+    content: bytes
+    mime: str
+    drawable: ImageReader | Drawing | None
+
+
+def _decode_logo(raw: bytes) -> tuple[str, ImageReader | Drawing | None]:
+    if b"<svg" in raw[:500].lower():
+        drawing = svg2rlg(BytesIO(raw)) if svg2rlg else None
+        return "image/svg+xml", drawing
+    return "image/png", ImageReader(BytesIO(raw))
+
+
+@lru_cache(maxsize=1)
+def get_report_logo() -> ReportLogo | None:
+    """Logo de los informes, resuelto una vez por proceso.
+
+    Lo comparten los PDF (``drawable`` ya decodificado) y las plantillas HTML (``content``
+    como data URI). Primero se buscan los archivos del frontend; las URLs públicas pasan
+    por la caché de imágenes remotas.
+    """
+    sources = [path.read_bytes for path in LOGO_PATHS if path.exists()]
+    sources += [lambda url=url: fetch_remote_image(url, timeout=8) for url in LOGO_URLS]
+    for read in sources:
+        try:
+            raw = read()
+            if not raw:
+                continue
+            mime, drawable = _decode_logo(raw)
+        except Exception:
+            continue
+        return ReportLogo(raw, mime, drawable)
+    logger.warning("Report logo unavailable; reports are drawn without it.")
+    return None
+
+
+def logo_data_uri() -> str | None:
+    logo = get_report_logo()
+    if logo is None:
+        return None
+    return f"data:{logo.mime};base64,{base64.b64encode(logo.content).decode('ascii')}"
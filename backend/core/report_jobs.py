@@ -0,0 +1,119 @@
+import logging
+from datetime import timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Audit, ReportArtifact, ReportRenderJob, Visit
+
+
+logger = logging.getLogger(__name__)
+
+# Un trabajo que sigue "en proceso" pasado este tiempo quedó huérfano (worker caído) y se retoma.
+RUNNING_LEASE = timedelta(minutes=10)
+MAX_ATTEMPTS = 3
+
+REPORT_MODELS = {
+    ReportArtifact.Kind.VISIT: Visit,
+    ReportArtifact.Kind.AUDIT: Audit,
+}
+
+
+def enqueue(kind: str, object_ids) -> int:
+    """Deja como pendiente el informe de cada objeto, reiniciando los trabajos que ya existan."""
+    object_ids = sorted(set(object_ids))
+    if not object_ids:
+        return 0
+    now = timezone.now()
+    # Si un worker está renderizando una versión anterior, al terminar ya no encontrará
+    # su trabajo "en proceso" y el informe se vuelve a generar con los datos nuevos.
+    ReportRenderJob.objects.filter(kind=kind, object_id__in=object_ids).update(
+        status=ReportRenderJob.Status.PENDING,
+        attempts=0,
+        last_error="",
+        created_at=now,
+        started_at=None,
+        finished_at=None,
+    )
+    ReportRenderJob.objects.bulk_create(
+        [ReportRenderJob(kind=kind, object_id=object_id, created_at=now) for object_id in object_ids],
+        ignore_conflicts=True,
+    )
+    return len(object_ids)
+
+
+def _claimable(now) -> Q:
+    return Q(status=ReportRenderJob.Status.PENDING) | Q(
+        status=ReportRenderJob.Status.RUNNING, started_at__lt=now - RUNNING_LEASE
+    )
+
+
+def claim_next() -> ReportRenderJob | None:
+    """Toma el trabajo más antiguo. El UPDATE condicionado evita que dos workers tomen el mismo."""
+    now = timezone.now()
+    candidates = list(
+        ReportRenderJob.objects.filter(_claimable(now)).order_by("created_at", "id").values_list("pk", flat=True)[:20]
+    )
+    for pk in candidates:
+        claimed = (
+            ReportRenderJob.objects.filter(_claimable(now), pk=pk)
+            .update(status=ReportRenderJob.Status.RUNNING, started_at=now, attempts=F("attempts") + 1)
+        )
+        if claimed:
+            return ReportRenderJob.objects.get(pk=pk)
+    return None
+
+
+def run_job(job: ReportRenderJob) -> bool:
+    # views importa este módulo para encolar; la importación inversa se resuelve aquí.
+    from . import views
+
+    active = ReportRenderJob.objects.filter(
+        pk=job.pk, status=ReportRenderJob.Status.RUNNING, started_at=job.started_at
+    )
+    instance = (
+        REPORT_MODELS[job.kind].objects.select_related("area__branch__client", "inspector")
+        .filter(pk=job.object_id)
+        .first()
+    )
+    if instance is None:
+        active.delete()
+        return False
+
+    try:
+        if job.kind == ReportArtifact.Kind.VISIT:
+            # La descarga autenticada sirve la variante con QR y el enlace público la simple.
+            views._get_visit_report_artifact(instance)
+            public_report_url = views._build_public_report_url(None, instance)
+            if public_report_url:
+                views._get_visit_report_artifact(instance, public_report_url=public_report_url)
+        else:
+            views._get_audit_report_artifact(instance)
+    except Exception as exc:
+        logger.exception("Error rendering %s report #%s", job.kind, job.object_id)
+        retry = job.attempts < MAX_ATTEMPTS
+        active.update(
+            status=ReportRenderJob.Status.PENDING if retry else ReportRenderJob.Status.FAILED,
+            last_error=str(exc)[:2000],
+            # Al reintentar pasa al final de la cola para no bloquear a los demás.
+            created_at=timezone.now() if retry else job.created_at,
+            finished_at=None if retry else timezone.now(),
+        )
+        return False
+
+    active.update(status=ReportRenderJob.Status.DONE, last_error="", finished_at=timezone.now())
+    return True
+
+
+def process_pending(limit: int | None = None) -> tuple[int, int]:
+    """Procesa trabajos hasta vaciar la cola o llegar a ``limit``. Devuelve ``(listos, fallidos)``."""
+    done = failed = 0
+    while limit is None or done + failed < limit:
+        job = claim_next()
+        if job is None:
+            break
+        if run_job(job):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
@@ -0,0 +1,174 @@
+import contextvars
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from multiprocessing import get_context
+from multiprocessing.pool import Pool
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Ajustes que el proceso de renderizado necesita ver igual que quien encarga el informe.
+FORWARDED_SETTINGS = ("MEDIA_ROOT", "MEDIA_URL", "REPORT_CACHE_DIR")
+
+_fail_fast = contextvars.ContextVar("report_renderer_fail_fast", default=False)
+
+
+class RendererBusy(Exception):
+    """No hay hueco en la cola de renderizado o el informe no terminó a tiempo."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+@contextmanager
+def fail_fast():
+    """Dentro de una petición HTTP: si la cola está llena se falla al instante en vez de esperar."""
+    token = _fail_fast.set(True)
+    try:
+        yield
+    finally:
+        _fail_fast.reset(token)
+
+
+def _initialize_worker() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
+
+
+def render_snapshot(kind: str, snapshot: dict, public_report_url: str | None = None, overrides=None) -> bytes:
+    """Punto de entrada en el proceso de renderizado; solo recibe datos serializables."""
+    from . import views
+
+    # El proceso es exclusivo del pool: basta con fijar los ajustes antes de cada informe.
+    for name, value in (overrides or {}).items():
+        setattr(settings, name, value)
+    if kind == "visit":
+        return views._render_visit_pdf(snapshot, public_report_url=public_report_url)
+    return views._render_audit_pdf(snapshot)
+
+
+class _RenderTask:
+    """Un informe encargado al pool; se da por terminado una sola vez."""
+
+    def __init__(self, release_slot):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self._release_slot = release_slot
+        self._finished = threading.Lock()
+
+    def finish(self, result=None, error=None) -> None:
+        if not self._finished.acquire(blocking=False):
+            return
+        self.result = result
+        self.error = error
+        self._release_slot()
+        self.done.set()
+
+
+class ReportRenderer:
+    """Pool de procesos para los PDF, fuera de los workers que atienden la API.
+
+    ``workers + max_pending`` acota los informes en vuelo. Las peticiones HTTP (dentro
+    de ``fail_fast``) reciben ``RendererBusy`` en cuanto no hay hueco; los trabajos en
+    segundo plano esperan turno hasta ``timeout``. Un informe que supera ``timeout`` no
+    se deja correr: se termina el pool (``Pool.terminate``) y se crea otro en la
+    siguiente petición, así que los informes que compartían pool también terminan con
+    ``RendererBusy``. Con ``workers=0`` se renderiza en el propio hilo, sin pool.
+    """
+
+    # Función que ejecuta el proceso; debe poder importarse por nombre desde el hijo.
+    target = staticmethod(render_snapshot)
+
+    def __init__(self, *, workers: int = 2, max_pending: int = 4, timeout: float = 60.0):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + max_pending)
+        self._pool: Pool | None = None
+        # Informes en vuelo de cada pool, para darlos por perdidos si se termina.
+        self._tasks: dict[Pool, set[_RenderTask]] = {}
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> Pool:
+        with self._lock:
+            if self._pool is None:
+                # spawn: los procesos no heredan hilos ni conexiones abiertas del worker web.
+                self._pool = get_context("spawn").Pool(self.workers, initializer=_initialize_worker)
+                self._tasks[self._pool] = set()
+            return self._pool
+
+    def _terminate_pool(self, pool: Pool) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+            tasks = self._tasks.pop(pool, set())
+        # terminate() mata los procesos aunque estén colgados en un informe; close()
+        # esperaría a que terminaran y su hueco seguiría ocupado.
+        pool.terminate()
+        pool.join()
+        for task in tasks:
+            task.finish(error=RendererBusy(max(int(self.timeout // 4), 1)))
+
+    def _finish_task(self, pool: Pool, task: _RenderTask, result=None, error=None) -> None:
+        with self._lock:
+            self._tasks.get(pool, set()).discard(task)
+        task.finish(result=result, error=error)
+
+    def close(self) -> None:
+        with self._lock:
+            pool = self._pool
+        if pool is not None:
+            self._terminate_pool(pool)
+
+    def render(self, kind: str, snapshot: dict, public_report_url: str | None = None) -> bytes:
+        retry_after = max(int(self.timeout // 4), 1)
+        acquired = self._slots.acquire(blocking=not _fail_fast.get(), timeout=None if _fail_fast.get() else self.timeout)
+        if not acquired:
+            raise RendererBusy(retry_after)
+
+        if self.workers <= 0:
+            try:
+                return render_snapshot(kind, snapshot, public_report_url)
+            finally:
+                self._slots.release()
+
+        overrides = {name: getattr(settings, name) for name in FORWARDED_SETTINGS if hasattr(settings, name)}
+        # El hueco se libera cuando el proceso termina de verdad, no cuando se deja de esperar.
+        task = _RenderTask(self._slots.release)
+        pool = self._get_pool()
+        with self._lock:
+            self._tasks.setdefault(pool, set()).add(task)
+        try:
+            pool.apply_async(
+                self.target,
+                (kind, snapshot, public_report_url, overrides),
+                callback=lambda result: self._finish_task(pool, task, result=result),
+                error_callback=lambda error: self._finish_task(pool, task, error=error),
+            )
+        except ValueError:
+            # Otro hilo terminó este pool entre _get_pool() y el encargo.
+            self._finish_task(pool, task, error=RendererBusy(retry_after))
+
+        if not task.done.wait(self.timeout):
+            logger.warning("Report render timed out after %ss (%s #%s)", self.timeout, kind, snapshot.get("id"))
+            self._terminate_pool(pool)
+        if task.error is not None:
+            raise task.error
+        return task.result
+
+
+@lru_cache(maxsize=1)
+def get_renderer() -> ReportRenderer:
+    return ReportRenderer(
+        workers=int(getattr(settings, "REPORT_RENDER_WORKERS", 2)),
+        max_pending=int(getattr(settings, "REPORT_RENDER_MAX_PENDING", 4)),
+        timeout=float(getattr(settings, "REPORT_RENDER_TIMEOUT_SECONDS", 60)),
+    )
@@ -3,31 +3,17 @@ from __future__ import annotations
 import base64
 from datetime import datetime
 from html import escape
-from functools import lru_cache
-from pathlib import Path
 from typing import Any
 
 from reportlab.graphics import renderSVG
 from reportlab.graphics.barcode import qr
 from reportlab.graphics.shapes import Drawing
 
+from .report_images import LOGO_URLS, logo_data_uri
+
 
-@lru_cache(maxsize=1)
 def _logo_data_uri() -> str:
-    logo_paths = [
-        Path(__file__).resolve().parents[2] / "frontend/public/trust_logo_s.png",
-        Path(__file__).resolve().parents[2] / "frontend/public/trust_logo_s.svg",
-        Path(__file__).resolve().parents[2] / "frontend/public/trust_logo.svg",
-    ]
-    for path in logo_paths:
-        try:
-            content = path.read_bytes()
-        except OSError:
-            continue
-        encoded = base64.b64encode(content).decode("ascii")
-        mime = "image/png" if path.suffix.lower() == ".png" else "image/svg+xml"
-        return f"data:{mime};base64,{encoded}"
-    return "https://trust.supplymax.net/trust_logo_s.png"
+    return logo_data_uri() or LOGO_URLS[0]
 
 
 def _qr_data_uri(url: str) -> str:
@@ -319,7 +305,7 @@ def build_visit_report_html(visit: dict[str, Any]) -> str:
     media_photos = [item for item in media if isinstance(item, dict) and str(item.get("type") or "").lower() == "photo"]
     general_photo_slots: list[str] = []
     for item in media_photos[:4]:
-        file_ref = str(item.get("file") or "").strip()
+        file_ref = str(item.get("report_image") or item.get("file") or "").strip()
         if file_ref:
             general_photo_slots.append(f'<div class="photo" style="aspect-ratio:16 / 9;"><img alt="Evidencia general" src="{escape(file_ref)}"/></div>')
     while len(general_photo_slots) < 4:
@@ -465,7 +451,7 @@ def build_audit_report_html(audit: dict[str, Any]) -> str:
     media_photos = [item for item in media if isinstance(item, dict) and str(item.get("type") or "").lower() == "photo"]
     photo_slots: list[str] = []
     for index, item in enumerate(media_photos[:6], start=1):
-        src = str(item.get("file") or "").strip()
+        src = str(item.get("report_image") or item.get("file") or "").strip()
         if src:
             photo_slots.append(
                 f'''<article class="evidence-card"><div class="evidence-photo"><img alt="Evidencia de auditoría {index}" src="{escape(src)}"/></div><div class="evidence-caption">Evidencia #{index:02d}</div></article>'''
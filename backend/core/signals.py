@@ -0,0 +1,374 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import catalog, compliance, media_derivatives, report_artifacts
+from .access import add_area_to_scopes, add_branch_to_scopes, get_scoped_users, rebuild_user_area_scope
+from .models import (
+    Area,
+    Audit,
+    AuditForm,
+    AuditMedia,
+    Branch,
+    Client,
+    DeletedRecord,
+    Dispenser,
+    DispenserModel,
+    DispenserProductAssignment,
+    Incident,
+    IncidentMedia,
+    Nozzle,
+    Product,
+    ReportArtifact,
+    ReportRenderJob,
+    User,
+    Visit,
+    VisitMedia,
+)
+
+
+def _rebuild_scopes(users) -> None:
+    for user in users:
+        rebuild_user_area_scope(user)
+
+
+@receiver(m2m_changed, sender=User.clients.through)
+@receiver(m2m_changed, sender=User.branches.through)
+@receiver(m2m_changed, sender=User.areas.through)
+def refresh_scope_on_assignment_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        # Tras un clear inverso ya no es posible saber qué usuarios estaban asignados.
+        instance._scope_cleared_user_ids = list(instance.users.values_list("id", flat=True))
+        return
+    if action not in {"post_add", "post_remove", "post_clear"}:
+        return
+
+    if not reverse:
+        rebuild_user_area_scope(instance)
+        return
+
+    if action == "post_clear":
+        user_ids = getattr(instance, "_scope_cleared_user_ids", [])
+    else:
+        user_ids = pk_set or []
+    _rebuild_scopes(User.objects.filter(id__in=list(user_ids)))
+
+
+@receiver(post_save, sender=User)
+def refresh_scope_on_user_save(sender, instance, created, update_fields, raw=False, **kwargs):
+    if raw:
+        return
+    if created or update_fields is None or "role" in update_fields:
+        rebuild_user_area_scope(instance)
+
+
+@receiver(pre_save, sender=Branch)
+def remember_previous_branch_client(sender, instance, raw=False, **kwargs):
+    instance._scope_previous_client_id = None
+    if raw or instance.pk is None:
+        return
+    instance._scope_previous_client_id = (
+        Branch.objects.filter(pk=instance.pk).values_list("client_id", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Branch)
+def refresh_scope_on_branch_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        add_branch_to_scopes(instance)
+        return
+
+    previous_client_id = getattr(instance, "_scope_previous_client_id", None)
+    if previous_client_id is not None and previous_client_id != instance.client_id:
+        _rebuild_scopes(
+            get_scoped_users(
+                client_ids=[previous_client_id, instance.client_id],
+                branch_ids=[instance.id],
+            )
+        )
+
+
+@receiver(pre_save, sender=Area)
+def remember_previous_area_branch(sender, instance, raw=False, **kwargs):
+    instance._scope_previous_branch_id = None
+    if raw or instance.pk is None:
+        return
+    instance._scope_previous_branch_id = (
+        Area.objects.filter(pk=instance.pk).values_list("branch_id", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Area)
+def refresh_scope_on_area_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        add_area_to_scopes(instance)
+        return
+
+    previous_branch_id = getattr(instance, "_scope_previous_branch_id", None)
+    if previous_branch_id is not None and previous_branch_id != instance.branch_id:
+        branch_ids = [previous_branch_id, instance.branch_id]
+        client_ids = Branch.objects.filter(id__in=branch_ids).values_list("client_id", flat=True)
+        _rebuild_scopes(get_scoped_users(client_ids=client_ids, branch_ids=branch_ids))
+
+
+CATALOG_KEYS_BY_MODEL = {
+    Nozzle: (catalog.NOZZLES,),
+    DispenserModel: (catalog.DISPENSER_MODELS,),
+    Product: (catalog.PRODUCTS,),
+    AuditForm: (catalog.AUDIT_FORMS,),
+    # El catálogo de plantillas incluye cuántas áreas usan cada una.
+    Area: (catalog.AUDIT_FORMS,),
+}
+
+# Tablas cuya versión alimenta los ETag de los listados de catálogo y jerarquía.
+VERSIONED_TABLES = {
+    Client,
+    Branch,
+    Area,
+    AuditForm,
+    DispenserModel,
+    Nozzle,
+    Product,
+    Dispenser,
+    DispenserProductAssignment,
+}
+
+
+def _cache_version_keys(model) -> tuple[str, ...]:
+    keys = CATALOG_KEYS_BY_MODEL.get(model, ())
+    if model in VERSIONED_TABLES:
+        keys += (catalog.table_key(model),)
+    return keys
+
+
+def bump_cache_versions(sender, raw=False, **kwargs):
+    keys = _cache_version_keys(sender)
+    if keys and not raw:
+        catalog.bump_versions(*keys)
+
+
+# Se conecta por modelo: un receptor de post_delete sin sender desactivaría el borrado
+# rápido de Django (sin cargar filas) en todas las tablas.
+for _model in set(CATALOG_KEYS_BY_MODEL) | VERSIONED_TABLES:
+    post_save.connect(bump_cache_versions, sender=_model, dispatch_uid=f"cache_versions_save_{_model.__name__}")
+    post_delete.connect(bump_cache_versions, sender=_model, dispatch_uid=f"cache_versions_delete_{_model.__name__}")
+
+
+@receiver(m2m_changed, sender=Dispenser.products.through)
+def bump_dispenser_products_version(sender, action, **kwargs):
+    # ``products.set()`` escribe la tabla intermedia sin emitir post_save.
+    if action in {"post_add", "post_remove", "post_clear"}:
+        catalog.bump_versions(catalog.table_key(sender))
+
+
+SYNC_RESOURCES = {
+    Client: "clients",
+    Branch: "branches",
+    Area: "areas",
+    Dispenser: "dispensers",
+    Visit: "visits",
+    Audit: "audits",
+    Incident: "incidents",
+}
+
+
+def _area_hierarchy_ids(area_id):
+    if area_id is None:
+        return None, None
+    row = Area.objects.filter(pk=area_id).values_list("branch__client_id", "branch_id").first()
+    return row or (None, None)
+
+
+def _deleted_record_scope(instance) -> tuple[int | None, int | None, int | None]:
+    if isinstance(instance, Client):
+        return instance.id, None, None
+    if isinstance(instance, Branch):
+        return instance.client_id, instance.id, None
+    if isinstance(instance, Area):
+        client_id = Branch.objects.filter(pk=instance.branch_id).values_list("client_id", flat=True).first()
+        return client_id, instance.branch_id, instance.id
+    if isinstance(instance, Incident):
+        return instance.client_id, instance.branch_id, instance.area_id
+    client_id, branch_id = _area_hierarchy_ids(instance.area_id)
+    return client_id, branch_id, instance.area_id
+
+
+def record_deletion_for_sync(sender, instance, **kwargs):
+    resource = SYNC_RESOURCES[sender]
+    client_id, branch_id, area_id = _deleted_record_scope(instance)
+    DeletedRecord.objects.create(
+        resource=resource,
+        object_id=instance.pk,
+        client_id=client_id,
+        branch_id=branch_id,
+        area_id=area_id,
+    )
+
+
+for _model in SYNC_RESOURCES:
+    post_delete.connect(record_deletion_for_sync, sender=_model, dispatch_uid=f"sync_deletion_{_model.__name__}")
+
+
+# Campos de la jerarquía que los payloads de sync copian en sus hijos (nombres y padre).
+SYNC_EMBEDDED_FIELDS = {
+    Client: ("name",),
+    Branch: ("name", "client_id"),
+    Area: ("name", "branch_id"),
+}
+SYNC_DEPENDENTS = {
+    Client: (
+        (Branch, "client_id"),
+        (Area, "branch__client_id"),
+        (Dispenser, "area__branch__client_id"),
+        (Visit, "area__branch__client_id"),
+        (Audit, "area__branch__client_id"),
+        (Incident, "client_id"),
+    ),
+    Branch: (
+        (Area, "branch_id"),
+        (Dispenser, "area__branch_id"),
+        (Visit, "area__branch_id"),
+        (Audit, "area__branch_id"),
+        (Incident, "branch_id"),
+    ),
+    Area: (
+        (Dispenser, "area_id"),
+        (Visit, "area_id"),
+        (Audit, "area_id"),
+        (Incident, "area_id"),
+    ),
+}
+# Filas que pueden cambiar de área y, con ello, salir del alcance de quien las tenía.
+SYNC_MOVABLE = (Dispenser, Visit, Audit, Incident)
+
+
+def remember_previous_sync_fields(sender, instance, raw=False, **kwargs):
+    instance._sync_previous_fields = None
+    if raw or instance.pk is None:
+        return
+    fields = SYNC_EMBEDDED_FIELDS.get(sender, ("area_id",))
+    instance._sync_previous_fields = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+
+
+def touch_sync_dependents(sender, instance, created, raw=False, **kwargs):
+    """Al renombrar o mover un cliente, sucursal o área, sus hijos vuelven a salir en sync."""
+    previous = getattr(instance, "_sync_previous_fields", None)
+    if raw or created or previous is None:
+        return
+    if previous == tuple(getattr(instance, field) for field in SYNC_EMBEDDED_FIELDS[sender]):
+        return
+    # update() no emite señales ni toca otras columnas: solo adelanta la marca de cambio.
+    now = timezone.now()
+    for model, lookup in SYNC_DEPENDENTS[sender]:
+        model.objects.filter(**{lookup: instance.pk}).update(updated_at=now)
+
+
+def record_move_for_sync(sender, instance, created, raw=False, **kwargs):
+    """Una fila que cambia de área deja una marca de borrado en la jerarquía anterior.
+
+    Así la recibe quien veía el área de origen y ya no ve la nueva; quien ve ambas
+    recibe la fila entre los cambios y ``sync`` descarta la marca.
+    """
+    previous = getattr(instance, "_sync_previous_fields", None)
+    if raw or created or previous is None or previous[0] == instance.area_id or previous[0] is None:
+        return
+    client_id, branch_id = _area_hierarchy_ids(previous[0])
+    DeletedRecord.objects.create(
+        resource=SYNC_RESOURCES[sender],
+        object_id=instance.pk,
+        client_id=client_id,
+        branch_id=branch_id,
+        area_id=previous[0],
+    )
+
+
+for _model in (*SYNC_EMBEDDED_FIELDS, *SYNC_MOVABLE):
+    pre_save.connect(remember_previous_sync_fields, sender=_model, dispatch_uid=f"sync_previous_{_model.__name__}")
+for _model in SYNC_EMBEDDED_FIELDS:
+    post_save.connect(touch_sync_dependents, sender=_model, dispatch_uid=f"sync_dependents_{_model.__name__}")
+for _model in SYNC_MOVABLE:
+    post_save.connect(record_move_for_sync, sender=_model, dispatch_uid=f"sync_move_{_model.__name__}")
+
+
+COMPLIANCE_BUCKETS = {
+    Visit: (compliance.visit_bucket, ("area_id", "status", "visited_at", "completed_at")),
+    Audit: (compliance.audit_bucket, ("area_id", "status", "audited_at", "completed_at")),
+    Incident: (compliance.incident_bucket, ("area_id", "created_at")),
+}
+
+
+def remember_previous_compliance_bucket(sender, instance, raw=False, **kwargs):
+    instance._compliance_previous_bucket = None
+    if raw or instance.pk is None:
+        return
+    bucket_for, fields = COMPLIANCE_BUCKETS[sender]
+    previous = sender.objects.filter(pk=instance.pk).only(*fields).first()
+    if previous is not None:
+        instance._compliance_previous_bucket = bucket_for(previous)
+
+
+def refresh_compliance_rollup(sender, instance, raw=False, origin=None, **kwargs):
+    if raw:
+        return
+    # Si se borra la jerarquía completa, el rollup del área cae en cascada con ella;
+    # recalcularlo a mitad del borrado volvería a insertar filas de un área que desaparece.
+    # El cambio de versión de la tabla de áreas ya invalida los tableros afectados.
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model in {Client, Branch, Area}:
+        return
+    bucket_for, _ = COMPLIANCE_BUCKETS[sender]
+    buckets = [getattr(instance, "_compliance_previous_bucket", None), bucket_for(instance)]
+    compliance.refresh_buckets(buckets)
+    area_ids = {bucket[0] for bucket in buckets if bucket is not None}
+    client_ids = set(Area.objects.filter(id__in=area_ids).values_list("branch__client_id", flat=True))
+    catalog.bump_versions(catalog.ACTIVITY, *(catalog.client_activity_key(client_id) for client_id in sorted(client_ids)))
+
+
+for _model in COMPLIANCE_BUCKETS:
+    pre_save.connect(
+        remember_previous_compliance_bucket, sender=_model, dispatch_uid=f"compliance_pre_save_{_model.__name__}"
+    )
+    post_save.connect(refresh_compliance_rollup, sender=_model, dispatch_uid=f"compliance_save_{_model.__name__}")
+    post_delete.connect(refresh_compliance_rollup, sender=_model, dispatch_uid=f"compliance_delete_{_model.__name__}")
+
+
+REPORT_ARTIFACT_KINDS = {
+    Visit: ReportArtifact.Kind.VISIT,
+    Audit: ReportArtifact.Kind.AUDIT,
+}
+
+
+def discard_report_artifacts(sender, instance, **kwargs):
+    # Si el borrado se revierte, el informe sin archivo se vuelve a generar al pedirlo.
+    report_artifacts.discard_artifacts(
+        ReportArtifact.objects.filter(kind=REPORT_ARTIFACT_KINDS[sender], object_id=instance.pk)
+    )
+    ReportRenderJob.objects.filter(kind=REPORT_ARTIFACT_KINDS[sender], object_id=instance.pk).delete()
+
+
+for _model in REPORT_ARTIFACT_KINDS:
+    post_delete.connect(discard_report_artifacts, sender=_model, dispatch_uid=f"report_artifacts_{_model.__name__}")
+
+
+def generate_photo_derivatives(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    media_derivatives.generate_derivatives(instance)
+
+
+def delete_photo_derivatives(sender, instance, **kwargs):
+    # Tras el commit: si la transacción se revierte, el registro y sus derivados siguen.
+    transaction.on_commit(lambda: media_derivatives.delete_derivatives(instance))
+
+
+for _model in (VisitMedia, AuditMedia, IncidentMedia):
+    post_save.connect(generate_photo_derivatives, sender=_model, dispatch_uid=f"media_derivatives_{_model.__name__}")
+    post_delete.connect(
+        delete_photo_derivatives, sender=_model, dispatch_uid=f"media_derivatives_delete_{_model.__name__}"
+    )
@@ -1,26 +1,48 @@
+import asyncio
+import hashlib
 import json
-from datetime import timedelta
+import os
+import tempfile
+import time
+from io import BytesIO, StringIO
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.core import signing
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db import IntegrityError
 from django.db.models.deletion import ProtectedError
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.admin.sites import AdminSite
 from django.contrib.messages import get_messages
 from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
-from django.test import TestCase
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
 from django.urls import reverse
 from django.utils import timezone
+from PIL import Image
+from reportlab.pdfbase import pdfmetrics
 
 from config import settings_prod
+from .access import build_access_scope, find_area_scope_drift, get_request_principal, rebuild_user_area_scope
+from .compliance import daily_compliance, rebuild_rollup
+from .events import BrokerFull, DatabaseEventBroker, InProcessEventBroker
+from . import catalog, events, report_fonts, report_images, report_jobs, report_renderer, report_templates, views
 from .admin import DispenserAdmin, ProductAdmin
 from .fcm_manager import send_push_notification_to_devices
-from .models import Area, Audit, AuditForm, Branch, Client, Dispenser, DispenserModel, DispenserProductAssignment, FCMDevice, Incident, Product, User, Visit
+from .models import Area, Audit, AuditForm, AuditMedia, Branch, CacheVersion, Client, DailyAreaCompliance, Dispenser, DispenserModel, DispenserProductAssignment, FCMDevice, Incident, Notification, Nozzle, Product, ReportArtifact, ReportRenderJob, StreamEvent, User, UserAreaScope, Visit, VisitMedia
 from .report_templates import build_visit_report_html
-from .views import _fallback_audit_ai_analysis
+from .views import _fallback_audit_ai_analysis, _serialize_visit
 
 
 class ClientApiTests(TestCase):
@@ -498,6 +520,10 @@ class VisitMobileFlowTests(TestCase):
         send_email_async_mock.assert_called_once()
         args = send_email_async_mock.call_args.args
         self.assertEqual(args[1][0], self.visit.id)
+        self.assertEqual(response.json()["report_status"], ReportRenderJob.Status.PENDING)
+        self.assertTrue(
+            ReportRenderJob.objects.filter(kind=ReportArtifact.Kind.VISIT, object_id=self.visit.id).exists()
+        )
 
 
 class DispenserApiTests(TestCase):
@@ -549,6 +575,90 @@ class DispenserApiTests(TestCase):
         self.assertEqual(payload["results"][0]["id"], dispenser.id)
         self.assertEqual(payload["results"][0]["identifier"], dispenser.identifier)
 
+    def test_list_dispensers_sends_nozzle_catalog_once(self):
+        nozzle = Nozzle.objects.create(name="Boquilla azul")
+        product = Product.objects.create(name="Desengrasante")
+        for index in range(3):
+            dispenser = Dispenser.objects.create(model=self.model, identifier=f"DISP-C{index}", area=self.area)
+            DispenserProductAssignment.objects.create(dispenser=dispenser, product=product, nozzle=nozzle)
+        self.client.get("/api/dispensers/", HTTP_X_CURRENT_USER_EMAIL=self.general_admin.email)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/dispensers/", HTTP_X_CURRENT_USER_EMAIL=self.general_admin.email)
+
+        payload = response.json()
+        self.assertIn(nozzle.id, [item["id"] for item in payload["catalog"]["nozzles"]])
+        self.assertNotIn("available_nozzles", payload["results"][0])
+        self.assertEqual(
+            payload["results"][0]["products"],
+            [{"id": product.id, "name": product.name, "photo": None, "nozzle": {"id": nozzle.id, "name": nozzle.name}}],
+        )
+        self.assertFalse(any('FROM "core_nozzle"' in query["sql"] for query in context.captured_queries))
+        self.assertFalse(any('FROM "core_product"' in query["sql"] for query in context.captured_queries))
+
+    def test_list_dispensers_query_count_does_not_grow_with_rows(self):
+        nozzle = Nozzle.objects.create(name="Boquilla verde")
+        product = Product.objects.create(name="Limpiador")
+
+        def add_dispensers(start, count):
+            for index in range(start, start + count):
+                dispenser = Dispenser.objects.create(model=self.model, identifier=f"DISP-Q{index}", area=self.area)
+                DispenserProductAssignment.objects.create(dispenser=dispenser, product=product, nozzle=nozzle)
+
+        def count_queries(path):
+            self.client.get(path, HTTP_X_CURRENT_USER_EMAIL=self.general_admin.email)
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(path, HTTP_X_CURRENT_USER_EMAIL=self.general_admin.email)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            return len(context.captured_queries)
+
+        add_dispensers(0, 1)
+        single = count_queries("/api/dispensers/")
+        single_streamed = count_queries("/api/dispensers/?stream=1")
+        add_dispensers(1, 39)
+
+        with self.assertNumQueries(single):
+            self.client.get("/api/dispensers/", HTTP_X_CURRENT_USER_EMAIL=self.general_admin.email)
+        self.assertEqual(count_queries("/api/dispensers/?stream=1"), single_streamed)
+
+    def test_nozzle_catalog_is_invalidated_on_save(self):
+        first = self.client.get("/api/nozzles/").json()["results"]
+        Nozzle.objects.create(name="Boquilla nueva")
+
+        second = self.client.get("/api/nozzles/").json()["results"]
+
+        self.assertEqual(len(second), len(first) + 1)
+        self.assertIn("Boquilla nueva", [nozzle["name"] for nozzle in second])
+
+    def test_update_dispenser_rejects_unavailable_and_missing_nozzles(self):
+        dispenser = Dispenser.objects.create(model=self.model, identifier="DISP-004", area=self.area)
+        product = Product.objects.create(name="Jabón")
+        nozzle = Nozzle.objects.create(name="Boquilla retirada")
+
+        def update(nozzle_id):
+            return self.client.put(
+                f"/api/dispensers/{dispenser.id}/",
+                data=json.dumps(
+                    {
+                        "identifier": "DISP-004",
+                        "model_id": self.model.id,
+                        "area_id": self.area.id,
+                        "product_assignments": [{"product_id": product.id, "nozzle_id": nozzle_id}],
+                    }
+                ),
+                content_type="application/json",
+                HTTP_X_CURRENT_USER_EMAIL=self.general_admin.email,
+            )
+
+        with patch("core.views._get_nozzle_catalog", return_value=[]):
+            unavailable = update(nozzle.id)
+        missing = update(nozzle.id + 1000)
+
+        self.assertEqual(unavailable.status_code, 400)
+        self.assertEqual(missing.status_code, 404)
+        self.assertFalse(DispenserProductAssignment.objects.filter(dispenser=dispenser).exists())
+
     def test_update_dispenser_accepts_multipart_product_assignments_without_nozzle(self):
         dispenser = Dispenser.objects.create(model=self.model, identifier="DISP-003", area=self.area)
         product = Product.objects.create(name="Jabón")
@@ -611,6 +721,7 @@ class DispenserApiTests(TestCase):
         self.assertTrue(Dispenser.objects.filter(id=dispenser.id).exists())
 
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class VisitReportRouteTests(TestCase):
     def setUp(self):
         self.client_entity = Client.objects.create(name="Cliente", code="CL-1")
@@ -694,6 +805,7 @@ class VisitPuppeteerTemplateTests(TestCase):
         self.assertIn("data:image/png;base64,abc123", html)
 
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class VisitPublicReportRouteTests(TestCase):
     def setUp(self):
         self.client_entity = Client.objects.create(name="Cliente", code="CL-2")
@@ -990,6 +1102,1910 @@ class HierarchicalAccessScopeTests(TestCase):
         self.assertEqual(payload["daily_audit_score_history"][0]["completed"], 2)
 
 
+class RequestPrincipalTests(TestCase):
+    def setUp(self):
+        self.client_a = Client.objects.create(name="Cliente A", code="CA")
+        self.branch_a1 = Branch.objects.create(client=self.client_a, name="Sucursal A1")
+        self.area_a1 = Area.objects.create(branch=self.branch_a1, name="Área A1")
+        self.account_admin = User.objects.create_user(
+            username="principal-admin",
+            email="principal-admin@test.com",
+            password="secret",
+            role=User.Role.ACCOUNT_ADMIN,
+        )
+        self.account_admin.clients.add(self.client_a)
+
+    def test_current_user_and_scope_are_resolved_once_per_request(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                "/api/visits/",
+                HTTP_X_CURRENT_USER_EMAIL=self.account_admin.email,
+            )
+
+        self.assertEqual(response.status_code, 200)
+        user_lookups = [
+            query["sql"] for query in context.captured_queries
+            if 'FROM "core_user" WHERE' in query["sql"]
+        ]
+        self.assertEqual(len(user_lookups), 1)
+
+    def test_principal_scope_is_memoized_on_request(self):
+        request = RequestFactory().get("/api/visits/", HTTP_X_CURRENT_USER_EMAIL="PRINCIPAL-ADMIN@test.com")
+        principal = get_request_principal(request)
+
+        self.assertEqual(principal.user, self.account_admin)
+        first_scope = principal.scope
+        with self.assertNumQueries(0):
+            self.assertIs(get_request_principal(request).scope, first_scope)
+        self.assertEqual(first_scope["area_ids"], [self.area_a1.id])
+
+
+class UserAreaScopeTests(TestCase):
+    def setUp(self):
+        self.client_a = Client.objects.create(name="Cliente A", code="CA")
+        self.client_b = Client.objects.create(name="Cliente B", code="CB")
+        self.branch_a1 = Branch.objects.create(client=self.client_a, name="Sucursal A1")
+        self.branch_b1 = Branch.objects.create(client=self.client_b, name="Sucursal B1")
+        self.area_a1 = Area.objects.create(branch=self.branch_a1, name="Área A1")
+        self.account_admin = User.objects.create_user(
+            username="scope-admin",
+            email="scope-admin@test.com",
+            password="secret",
+            role=User.Role.ACCOUNT_ADMIN,
+        )
+        self.account_admin.clients.add(self.client_a)
+
+    def _area_ids(self, user):
+        return set(
+            UserAreaScope.objects.filter(user=user, area__isnull=False).values_list("area_id", flat=True)
+        )
+
+    def test_scope_follows_assignments_and_hierarchy_changes(self):
+        self.assertEqual(self._area_ids(self.account_admin), {self.area_a1.id})
+
+        area_a2 = Area.objects.create(branch=self.branch_a1, name="Área A2")
+        self.assertEqual(self._area_ids(self.account_admin), {self.area_a1.id, area_a2.id})
+
+        area_a2.branch = self.branch_b1
+        area_a2.save()
+        self.assertEqual(self._area_ids(self.account_admin), {self.area_a1.id})
+
+        self.branch_b1.client = self.client_a
+        self.branch_b1.save()
+        self.assertEqual(self._area_ids(self.account_admin), {self.area_a1.id, area_a2.id})
+
+        self.account_admin.clients.remove(self.client_a)
+        self.assertEqual(self._area_ids(self.account_admin), set())
+        self.assertEqual(find_area_scope_drift(), [])
+
+    def test_deleting_last_area_keeps_branch_visible(self):
+        self.area_a1.delete()
+
+        response = self.client.get("/api/branches/", HTTP_X_CURRENT_USER_EMAIL=self.account_admin.email)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["id"] for item in response.json()["results"]], [self.branch_a1.id])
+        self.assertEqual(find_area_scope_drift(), [])
+
+    def test_check_command_reports_and_fixes_drift(self):
+        UserAreaScope.objects.filter(user=self.account_admin).delete()
+
+        with self.assertRaises(CommandError):
+            call_command("check_area_scopes", stdout=StringIO())
+
+        call_command("check_area_scopes", "--fix", stdout=StringIO())
+        self.assertEqual(self._area_ids(self.account_admin), {self.area_a1.id})
+
+
+class ListPaginationTests(TestCase):
+    def setUp(self):
+        client = Client.objects.create(name="Cliente Paginación", code="CP")
+        branch = Branch.objects.create(client=client, name="Sucursal Paginación")
+        self.area = Area.objects.create(branch=branch, name="Área Paginación")
+        self.admin = User.objects.create_user(
+            username="pagination-admin",
+            email="pagination-admin@test.com",
+            password="secret",
+            role=User.Role.GENERAL_ADMIN,
+        )
+        base = timezone.now().replace(microsecond=0)
+        # Dos visitas comparten fecha para ejercitar el desempate por id.
+        self.visits = [
+            Visit.objects.create(area=self.area, visited_at=base - timedelta(days=offset))
+            for offset in (0, 1, 1, 2, 3)
+        ]
+
+    def _get(self, path, **params):
+        return self.client.get(path, params, HTTP_X_CURRENT_USER_EMAIL=self.admin.email)
+
+    def test_visits_are_paginated_by_cursor_without_gaps_or_duplicates(self):
+        seen = []
+        params = {"page_size": 2}
+        while True:
+            response = self._get("/api/visits/", **params)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            self.assertLessEqual(len(body["results"]), 2)
+            seen.extend(item["id"] for item in body["results"])
+            if body["next"] is None:
+                break
+            params = {"page_size": 2, "cursor": body["next"]}
+
+        expected = list(
+            Visit.objects.order_by("-visited_at", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_unpaginated_shape_is_kept_without_pagination_params(self):
+        response = self._get("/api/visits/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("next", response.json())
+        self.assertEqual(len(response.json()["results"]), len(self.visits))
+
+    @override_settings(API_LEGACY_UNPAGINATED_LISTS=False, API_LIST_DEFAULT_PAGE_SIZE=3)
+    def test_default_page_size_applies_when_legacy_lists_are_disabled(self):
+        response = self._get("/api/visits/")
+
+        self.assertEqual(len(response.json()["results"]), 3)
+        self.assertIsNotNone(response.json()["next"])
+
+    @override_settings(API_LIST_MAX_PAGE_SIZE=2)
+    def test_page_size_is_capped(self):
+        response = self._get("/api/users/", page_size=500)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(response.json()["results"]), 2)
+
+    def test_invalid_cursor_and_page_size_are_rejected(self):
+        response = self._get("/api/incidents/", cursor="no-es-un-cursor")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "Cursor inválido.")
+
+        response = self._get("/api/audits/", page_size="abc")
+        self.assertEqual(response.status_code, 400)
+
+
+class ListFieldSelectionTests(TestCase):
+    def setUp(self):
+        client = Client.objects.create(name="Cliente Campos", code="CF")
+        branch = Branch.objects.create(client=client, name="Sucursal Campos")
+        self.area = Area.objects.create(branch=branch, name="Área Campos")
+        self.admin = User.objects.create_user(
+            username="fields-admin",
+            email="fields-admin@test.com",
+            password="secret",
+            role=User.Role.GENERAL_ADMIN,
+        )
+        self.visit = Visit.objects.create(area=self.area, visit_report={"signature": "data:image/png;base64,AAAA"})
+
+    def _get(self, path, **params):
+        return self.client.get(path, params, HTTP_X_CURRENT_USER_EMAIL=self.admin.email)
+
+    def test_summary_profile_skips_report_blobs_and_media(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self._get("/api/visits/", fields="summary")
+
+        self.assertEqual(response.status_code, 200)
+        item = response.json()["results"][0]
+        self.assertEqual(item["area"], self.area.name)
+        self.assertEqual(item["status"], "overdue")
+        self.assertNotIn("visit_report", item)
+        self.assertNotIn("media", item)
+        visit_queries = [query["sql"] for query in context.captured_queries if 'FROM "core_visit"' in query["sql"]]
+        self.assertEqual(len(visit_queries), 1)
+        self.assertNotIn("visit_report", visit_queries[0])
+        self.assertFalse(any("core_visitmedia" in query["sql"] for query in context.captured_queries))
+
+    def test_explicit_fields_always_include_id(self):
+        response = self._get("/api/visits/", fields="visited_at,status")
+
+        self.assertEqual(set(response.json()["results"][0]), {"id", "visited_at", "status"})
+
+    def test_unknown_field_is_rejected(self):
+        response = self._get("/api/audits/", fields="id,secret")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "Campo no válido en fields: secret.")
+
+
+class BatchListSerializationTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="batch-admin",
+            email="batch-admin@test.com",
+            password="secret",
+            role=User.Role.GENERAL_ADMIN,
+        )
+        self.inspector = User.objects.create_user(
+            username="batch-inspector",
+            email="batch-inspector@test.com",
+            password="secret",
+            role=User.Role.INSPECTOR,
+        )
+        self.dispenser_model = DispenserModel.objects.create(name="Modelo Lote")
+        self.form = AuditForm.objects.create(name="Checklist Lote", schema={"questions": []})
+        self._create_rows(1)
+
+    def _create_rows(self, count):
+        for index in range(count):
+            client = Client.objects.create(name=f"Cliente Lote {Client.objects.count()}", code=f"CL{Client.objects.count()}")
+            branch = Branch.objects.create(client=client, name=f"Sucursal {index}")
+            area = Area.objects.create(branch=branch, name=f"Área {index}")
+            dispenser = Dispenser.objects.create(model=self.dispenser_model, identifier=f"D-{area.id}", area=area)
+            visit = Visit.objects.create(area=area, dispenser=dispenser, inspector=self.inspector)
+            VisitMedia.objects.create(visit=visit, file=f"visits/media/{visit.id}.jpg")
+            audit = Audit.objects.create(area=area, form=self.form, inspector=self.inspector)
+            AuditMedia.objects.create(audit=audit, file=f"audits/media/{audit.id}.jpg")
+
+    def _count_queries(self, path):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(path, HTTP_X_CURRENT_USER_EMAIL=self.admin.email)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()["results"]
+
+    def test_visit_and_audit_lists_use_constant_queries(self):
+        visit_queries, _ = self._count_queries("/api/visits/")
+        audit_queries, _ = self._count_queries("/api/audits/")
+
+        self._create_rows(4)
+
+        self.assertEqual(self._count_queries("/api/visits/")[0], visit_queries)
+        self.assertEqual(self._count_queries("/api/audits/")[0], audit_queries)
+
+    def test_batch_payload_matches_single_serializer(self):
+        _, results = self._count_queries("/api/visits/")
+        visit = Visit.objects.get(pk=results[0]["id"])
+
+        self.assertEqual(results[0], json.loads(json.dumps(_serialize_visit(visit))))
+        self.assertEqual(results[0]["area_dispensers_count"], 1)
+        self.assertEqual(len(results[0]["media"]), 1)
+
+
+class StreamingListResponseTests(TestCase):
+    def setUp(self):
+        client = Client.objects.create(name="Cliente Streaming", code="CS")
+        branch = Branch.objects.create(client=client, name="Sucursal Streaming")
+        area = Area.objects.create(branch=branch, name="Área Ñandú")
+        model = DispenserModel.objects.create(name="Modelo Streaming")
+        dispenser = Dispenser.objects.create(model=model, identifier="DOS900", area=area)
+        product = Product.objects.create(name="Producto Streaming")
+        DispenserProductAssignment.objects.create(dispenser=dispenser, product=product)
+        form = AuditForm.objects.create(name="Checklist Streaming", schema={"questions": []})
+        for _ in range(3):
+            Visit.objects.create(area=area, dispenser=dispenser, visit_report={"summary": "Revisión"})
+            Audit.objects.create(area=area, form=form)
+            Incident.objects.create(client=client, branch=branch, area=area, dispenser=dispenser, description="Fuga")
+        self.admin = User.objects.create_user(
+            username="stream-admin",
+            email="stream-admin@test.com",
+            password="secret",
+            role=User.Role.GENERAL_ADMIN,
+        )
+
+    def test_streamed_lists_are_byte_compatible(self):
+        for path in ("/api/visits/", "/api/audits/", "/api/incidents/", "/api/dispensers/", "/api/products/"):
+            with self.subTest(path=path):
+                regular = self.client.get(path, HTTP_X_CURRENT_USER_EMAIL=self.admin.email)
+                streamed = self.client.get(path, {"stream": "1"}, HTTP_X_CURRENT_USER_EMAIL=self.admin.email)
+
+                self.assertTrue(streamed.streaming)
+                self.assertEqual(streamed["Content-Type"], "application/json")
+                self.assertEqual(b"".join(streamed.streaming_content), regular.content)
+
+    def test_streamed_page_keeps_next_cursor(self):
+        regular = self.client.get("/api/visits/", {"page_size": 2}, HTTP_X_CURRENT_USER_EMAIL=self.admin.email)
+        streamed = self.client.get(
+            "/api/visits/",
+            {"page_size": 2, "stream": "1"},
+            HTTP_X_CURRENT_USER_EMAIL=self.admin.email,
+        )
+
+        body = json.loads(b"".join(streamed.streaming_content))
+        self.assertEqual(len(body["results"]), 2)
+        self.assertEqual(body["results"], regular.json()["results"])
+        self.assertIsNotNone(body["next"])
+
+
+class ConditionalListTests(TestCase):
+    def setUp(self):
+        self.client_a = Client.objects.create(name="Cliente A", code="CA")
+        self.client_b = Client.objects.create(name="Cliente B", code="CB")
+        self.account_admin = User.objects.create_user(
+            username="etag-admin",
+            email="etag-admin@test.com",
+            password="secret",
+            role=User.Role.ACCOUNT_ADMIN,
+        )
+        self.account_admin.clients.add(self.client_a)
+
+    def _get(self, path, **headers):
+        return self.client.get(path, HTTP_X_CURRENT_USER_EMAIL=self.account_admin.email, **headers)
+
+    def test_unchanged_list_returns_not_modified(self):
+        first = self._get("/api/clients/")
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("X-Current-User-Email", first["Vary"])
+
+        with patch("core.views._serialize_client") as serialize_client:
+            second = self._get("/api/clients/", HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(second.status_code, 304)
+        serialize_client.assert_not_called()
+
+    def test_table_change_invalidates_etag(self):
+        etag = self._get("/api/branches/")["ETag"]
+        Branch.objects.create(client=self.client_a, name="Sucursal nueva")
+
+        response = self._get("/api/branches/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_scope_change_invalidates_etag(self):
+        etag = self._get("/api/clients/")["ETag"]
+        self.account_admin.clients.add(self.client_b)
+
+        response = self._get("/api/clients/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 2)
+
+
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.client_a = Client.objects.create(name="Cliente A", code="CA")
+        self.branch_a = Branch.objects.create(client=self.client_a, name="Sucursal A")
+        self.area_a = Area.objects.create(branch=self.branch_a, name="Área A")
+        client_b = Client.objects.create(name="Cliente B", code="CB")
+        branch_b = Branch.objects.create(client=client_b, name="Sucursal B")
+        self.area_b = Area.objects.create(branch=branch_b, name="Área B")
+        self.branch_admin = User.objects.create_user(
+            username="sync-branch-admin",
+            email="sync-branch-admin@test.com",
+            password="secret",
+            role=User.Role.BRANCH_ADMIN,
+        )
+        self.branch_admin.branches.add(self.branch_a)
+        self._age_scope_version()
+
+    def _age_scope_version(self):
+        # El alcance se asignó "ayer": si no, cae dentro del margen de la marca y fuerza sync completa.
+        CacheVersion.objects.filter(key=catalog.scope_key(self.branch_admin.id)).update(
+            updated_at=timezone.now() - timedelta(days=1)
+        )
+
+    def _sync(self, **params):
+        response = self.client.get("/api/sync/", params, HTTP_X_CURRENT_USER_EMAIL=self.branch_admin.email)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_initial_sync_returns_scoped_rows(self):
+        Visit.objects.create(area=self.area_a)
+        Visit.objects.create(area=self.area_b)
+
+        payload = self._sync()
+
+        self.assertTrue(payload["full"])
+        self.assertEqual([area["id"] for area in payload["changes"]["areas"]], [self.area_a.id])
+        self.assertEqual(len(payload["changes"]["visits"]), 1)
+
+    def test_incremental_sync_returns_only_changes_and_tombstones(self):
+        old_visit = Visit.objects.create(area=self.area_a)
+        removed_visit = Visit.objects.create(area=self.area_a)
+        Visit.objects.filter(pk__in=[old_visit.pk, removed_visit.pk]).update(
+            updated_at=timezone.now() - timedelta(days=1)
+        )
+        watermark = self._sync()["watermark"]
+
+        new_visit = Visit.objects.create(area=self.area_a)
+        Visit.objects.create(area=self.area_b)
+        removed_visit_id = removed_visit.id
+        removed_visit.delete()
+        Visit.objects.create(area=self.area_b).delete()
+
+        payload = self._sync(updated_since=watermark)
+
+        self.assertFalse(payload["full"])
+        self.assertEqual([visit["id"] for visit in payload["changes"]["visits"]], [new_visit.id])
+        self.assertEqual(payload["deleted"]["visits"], [removed_visit_id])
+
+    def test_deleted_area_tombstone_reaches_branch_scope(self):
+        watermark = self._sync()["watermark"]
+        area_id = self.area_a.id
+        self.area_a.delete()
+
+        payload = self._sync(updated_since=watermark)
+
+        self.assertEqual(payload["deleted"]["areas"], [area_id])
+
+    def test_scope_change_after_watermark_forces_full_sync(self):
+        Visit.objects.create(area=self.area_b)
+        watermark = self._sync()["watermark"]
+        self.assertFalse(self._sync(updated_since=watermark)["full"])
+
+        self.branch_admin.branches.set([self.area_b.branch])
+        payload = self._sync(updated_since=watermark)
+
+        self.assertTrue(payload["full"])
+        self.assertEqual([area["id"] for area in payload["changes"]["areas"]], [self.area_b.id])
+        self.assertEqual(len(payload["changes"]["visits"]), 1)
+
+    def test_moved_rows_leave_tombstone_for_previous_scope(self):
+        dispenser = Dispenser.objects.create(
+            model=DispenserModel.objects.create(name="Modelo sync"), identifier="SYNC-1", area=self.area_a
+        )
+        visit = Visit.objects.create(area=self.area_a)
+        sibling = Area.objects.create(branch=self.branch_a, name="Área A2")
+        self._age_scope_version()
+        watermark = self._sync()["watermark"]
+
+        dispenser.area = self.area_b
+        dispenser.save()
+        visit.area = sibling
+        visit.save()
+        payload = self._sync(updated_since=watermark)
+
+        self.assertEqual(payload["deleted"]["dispensers"], [dispenser.id])
+        self.assertEqual(payload["changes"]["dispensers"], [])
+        self.assertEqual(payload["deleted"]["visits"], [])
+        self.assertEqual([item["id"] for item in payload["changes"]["visits"]], [visit.id])
+
+    def test_parent_rename_resends_children(self):
+        visit = Visit.objects.create(area=self.area_a)
+        for model in (Area, Visit):
+            model.objects.update(updated_at=timezone.now() - timedelta(days=1))
+        watermark = self._sync()["watermark"]
+
+        self.client_a.name = "Cliente A renombrado"
+        self.client_a.save()
+        payload = self._sync(updated_since=watermark)
+
+        self.assertEqual([area["id"] for area in payload["changes"]["areas"]], [self.area_a.id])
+        self.assertEqual(payload["changes"]["areas"][0]["branch"]["client"], "Cliente A renombrado")
+        self.assertEqual([item["id"] for item in payload["changes"]["visits"]], [visit.id])
+
+    def test_invalid_watermark_is_rejected(self):
+        response = self.client.get("/api/sync/", {"updated_since": "ayer"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(DASHBOARD_CACHE_TIMEOUT=0)
+class DashboardRegressionTests(TestCase):
+    """Fija la respuesta exacta del dashboard con datos que cruzan la medianoche local.
+
+    Sin caché, para que cada petición mida el cálculo completo.
+    """
+
+    frozen_now = datetime(2026, 3, 15, 15, 30, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        def at(day, hour, minute=0, month=3):
+            return datetime(2026, month, day, hour, minute, tzinfo=dt_timezone.utc)
+
+        client_a = Client.objects.create(name="Cliente Tablero A", code="TA")
+        client_b = Client.objects.create(name="Cliente Tablero B", code="TB")
+        branch_a = Branch.objects.create(client=client_a, name="Sucursal Norte")
+        branch_b = Branch.objects.create(client=client_b, name="Sucursal Sur")
+        area_a = Area.objects.create(branch=branch_a, name="Cocina")
+        area_a2 = Area.objects.create(branch=branch_a, name="Baños")
+        area_b = Area.objects.create(branch=branch_b, name="Bodega")
+        model = DispenserModel.objects.create(name="Modelo Tablero")
+        dispensers = [
+            Dispenser.objects.create(model=model, identifier=f"TAB-{index}", area=area)
+            for index, area in enumerate((area_a, area_a, area_a2, area_b))
+        ]
+        shared_product = Product.objects.create(name="Producto compartido")
+        for dispenser in dispensers[:3]:
+            DispenserProductAssignment.objects.create(dispenser=dispenser, product=shared_product)
+        DispenserProductAssignment.objects.create(
+            dispenser=dispensers[3], product=Product.objects.create(name="Producto B")
+        )
+        inspector = User.objects.create_user(
+            username="tablero-inspector",
+            email="tablero-inspector@test.com",
+            password="secret",
+            first_name="Ana",
+            last_name="Pérez",
+            role=User.Role.INSPECTOR,
+        )
+        form = AuditForm.objects.create(name="Checklist Tablero", schema={"questions": []})
+
+        completed = Visit.Status.COMPLETED
+        self.visits = []
+        for area, visited_at, status, completed_at in (
+            (area_a, at(2, 10), completed, at(3, 4, 30)),
+            (area_a, at(3, 23, 45), completed, None),
+            (area_a2, at(5, 2, 15), completed, at(5, 3)),
+            (area_a, at(9, 14), Visit.Status.SCHEDULED, None),
+            (area_a2, at(14, 3, 10), Visit.Status.SCHEDULED, None),
+            (area_a, at(16, 1, 5), Visit.Status.SCHEDULED, None),
+            (area_a, at(16, 18, 40), Visit.Status.SCHEDULED, None),
+            (area_a2, at(17, 9), Visit.Status.SCHEDULED, None),
+            (area_a, at(20, 12), Visit.Status.SCHEDULED, None),
+            (area_a, at(22, 8), Visit.Status.SCHEDULED, None),
+            (area_a, at(25, 8), Visit.Status.SCHEDULED, None),
+            (area_b, at(18, 10), Visit.Status.SCHEDULED, None),
+            (area_b, at(4, 10), completed, at(4, 11)),
+            (area_a, at(27, 10, month=2), completed, at(27, 11, month=2)),
+            (area_a, at(2, 10, month=4), Visit.Status.SCHEDULED, None),
+        ):
+            self.visits.append(
+                Visit.objects.create(
+                    area=area,
+                    visited_at=visited_at,
+                    status=status,
+                    completed_at=completed_at,
+                    inspector=inspector if area != area_b else None,
+                )
+            )
+
+        for area, audited_at, status, completed_at in (
+            (area_a, at(3, 12), Audit.Status.COMPLETED, at(4, 1)),
+            (area_a2, at(6, 5), Audit.Status.COMPLETED, None),
+            (area_a, at(10, 4, 20), Audit.Status.SCHEDULED, None),
+            (area_a, at(16, 2), Audit.Status.SCHEDULED, None),
+            (area_a2, at(16, 20), Audit.Status.SCHEDULED, None),
+            (area_b, at(19, 9), Audit.Status.SCHEDULED, None),
+            (area_b, at(7, 9), Audit.Status.COMPLETED, at(7, 10)),
+        ):
+            Audit.objects.create(
+                area=area, form=form, audited_at=audited_at, status=status, completed_at=completed_at
+            )
+
+        for area, created_at in (
+            (area_a, at(3, 5, 30)),
+            (area_a2, at(12, 22)),
+            (area_b, at(12, 10)),
+            (area_a, at(20, 10, month=2)),
+        ):
+            incident = Incident.objects.create(
+                client=area.branch.client,
+                branch=area.branch,
+                area=area,
+                dispenser=area.dispensers.first(),
+                description="Incidencia tablero",
+            )
+            Incident.objects.filter(pk=incident.pk).update(created_at=created_at)
+
+        self.account_admin = User.objects.create_user(
+            username="tablero-admin",
+            email="tablero-admin@test.com",
+            password="secret",
+            role=User.Role.ACCOUNT_ADMIN,
+        )
+        self.account_admin.clients.add(client_a)
+
+    def _dashboard(self, email=None):
+        headers = {"HTTP_X_CURRENT_USER_EMAIL": email} if email else {}
+        with patch("django.utils.timezone.now", return_value=self.frozen_now):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get("/api/dashboard/", **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(context.captured_queries), 16)
+        return response.json()
+
+    def _activity(self, index, client, branch, inspector, visited_at):
+        return {
+            "id": self.visits[index].id,
+            "client": client,
+            "branch": branch,
+            "type": "Visita",
+            "inspector": inspector,
+            "status": "Registrado",
+            "visited_at": visited_at,
+        }
+
+    def test_global_dashboard_payload_is_stable(self):
+        self.assertEqual(
+            self._dashboard(),
+            {
+                "stats": {
+                    "clients": 2,
+                    "branches": 2,
+                    "areas": 3,
+                    "dispensers": 4,
+                    "products": 2,
+                    "visits": 13,
+                    "completed_visits": 4,
+                    "pending_visits": 7,
+                    "overdue_visits": 2,
+                    "incidents": 3,
+                    "audits": 7,
+                    "completed_audits": 3,
+                    "scheduled_audits": 4,
+                    "overdue_audits": 1,
+                    "compliance_score": 53.85,
+                    "audit_score": 53.85,
+                },
+                "activity": [
+                    self._activity(10, "Cliente Tablero A", "Sucursal Norte", "Ana Pérez", "2026-03-25T08:00:00+00:00"),
+                    self._activity(9, "Cliente Tablero A", "Sucursal Norte", "Ana Pérez", "2026-03-22T08:00:00+00:00"),
+                    self._activity(8, "Cliente Tablero A", "Sucursal Norte", "Ana Pérez", "2026-03-20T12:00:00+00:00"),
+                    self._activity(11, "Cliente Tablero B", "Sucursal Sur", "Sin asignar", "2026-03-18T10:00:00+00:00"),
+                    self._activity(7, "Cliente Tablero A", "Sucursal Norte", "Ana Pérez", "2026-03-17T09:00:00+00:00"),
+                    self._activity(6, "Cliente Tablero A", "Sucursal Norte", "Ana Pérez", "2026-03-16T18:40:00+00:00"),
+                ],
+                "daily_audit_score_history": [
+                    {"date": "2026-03-03", "score": 66.67, "completed": 2, "non_compliant": 1},
+                    {"date": "2026-03-04", "score": 100.0, "completed": 2, "non_compliant": 0},
+                    {"date": "2026-03-05", "score": 100.0, "completed": 1, "non_compliant": 0},
+                    {"date": "2026-03-06", "score": 100.0, "completed": 1, "non_compliant": 0},
+                    {"date": "2026-03-07", "score": 100.0, "completed": 1, "non_compliant": 0},
+                    {"date": "2026-03-09", "score": 0.0, "completed": 0, "non_compliant": 1},
+                    {"date": "2026-03-10", "score": 0.0, "completed": 0, "non_compliant": 1},
+                    {"date": "2026-03-12", "score": 0.0, "completed": 0, "non_compliant": 2},
+                    {"date": "2026-03-14", "score": 0.0, "completed": 0, "non_compliant": 1},
+                ],
+                "pending_visit_details": [
+                    {"date": "2026-03-16", "total": 2, "first_time": "01:05", "last_time": "18:40"},
+                    {"date": "2026-03-17", "total": 1, "first_time": "09:00", "last_time": "09:00"},
+                    {"date": "2026-03-18", "total": 1, "first_time": "10:00", "last_time": "10:00"},
+                    {"date": "2026-03-20", "total": 1, "first_time": "12:00", "last_time": "12:00"},
+                ],
+                "scheduled_audit_details": [
+                    {"date": "2026-03-16", "total": 2, "first_time": "02:00", "last_time": "20:00"},
+                    {"date": "2026-03-19", "total": 1, "first_time": "09:00", "last_time": "09:00"},
+                ],
+            },
+        )
+
+    @override_settings(TIME_ZONE="America/Santiago")
+    def test_scoped_dashboard_payload_uses_local_day_buckets(self):
+        self.assertEqual(
+            self._dashboard(self.account_admin.email),
+            {
+                "stats": {
+                    "clients": 1,
+                    "branches": 1,
+                    "areas": 2,
+                    "dispensers": 3,
+                    "products": 3,
+                    "visits": 11,
+                    "completed_visits": 3,
+                    "pending_visits": 6,
+                    "overdue_visits": 2,
+                    "incidents": 2,
+                    "audits": 5,
+                    "completed_audits": 2,
+                    "scheduled_audits": 3,
+                    "overdue_audits": 1,
+                    "compliance_score": 50.0,
+                    "audit_score": 50.0,
+                },
+                "activity": [
+                    self._activity(10, "Cliente Tablero A", "Sucursal Norte", "Ana Pérez", "2026-03-25T08:00:00+00:00"),
+                    self._activity(9, "Cliente Tablero A", "Sucursal Norte", "Ana Pérez", "2026-03-22T08:00:00+00:00"),
+                    self._activity(8, "Cliente Tablero A", "Sucursal Norte", "Ana Pérez", "2026-03-20T12:00:00+00:00"),
+                    self._activity(7, "Cliente Tablero A", "Sucursal Norte", "Ana Pérez", "2026-03-17T09:00:00+00:00"),
+                    self._activity(6, "Cliente Tablero A", "Sucursal Norte", "Ana Pérez", "2026-03-16T18:40:00+00:00"),
+                    self._activity(5, "Cliente Tablero A", "Sucursal Norte", "Ana Pérez", "2026-03-16T01:05:00+00:00"),
+                ],
+                "daily_audit_score_history": [
+                    {"date": "2026-03-03", "score": 75.0, "completed": 3, "non_compliant": 1},
+                    {"date": "2026-03-05", "score": 100.0, "completed": 1, "non_compliant": 0},
+                    {"date": "2026-03-06", "score": 100.0, "completed": 1, "non_compliant": 0},
+                    {"date": "2026-03-09", "score": 0.0, "completed": 0, "non_compliant": 1},
+                    {"date": "2026-03-10", "score": 0.0, "completed": 0, "non_compliant": 1},
+                    {"date": "2026-03-12", "score": 0.0, "completed": 0, "non_compliant": 1},
+                    {"date": "2026-03-14", "score": 0.0, "completed": 0, "non_compliant": 1},
+                ],
+                "pending_visit_details": [
+                    {"date": "2026-03-15", "total": 1, "first_time": "22:05", "last_time": "22:05"},
+                    {"date": "2026-03-16", "total": 1, "first_time": "15:40", "last_time": "15:40"},
+                    {"date": "2026-03-17", "total": 1, "first_time": "06:00", "last_time": "06:00"},
+                    {"date": "2026-03-20", "total": 1, "first_time": "09:00", "last_time": "09:00"},
+                ],
+                "scheduled_audit_details": [
+                    {"date": "2026-03-15", "total": 1, "first_time": "23:00", "last_time": "23:00"},
+                    {"date": "2026-03-16", "total": 1, "first_time": "17:00", "last_time": "17:00"},
+                ],
+            },
+        )
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        client_a = Client.objects.create(name="Cliente Caché A", code="CCA")
+        client_b = Client.objects.create(name="Cliente Caché B", code="CCB")
+        self.area_a = Area.objects.create(branch=Branch.objects.create(client=client_a, name="Norte"), name="Cocina")
+        self.area_b = Area.objects.create(branch=Branch.objects.create(client=client_b, name="Sur"), name="Bodega")
+        self.admin_a = User.objects.create_user(
+            username="cache-admin-a", email="cache-admin-a@test.com", password="secret", role=User.Role.ACCOUNT_ADMIN
+        )
+        self.admin_a.clients.add(client_a)
+        self.admin_a_twin = User.objects.create_user(
+            username="cache-admin-twin",
+            email="cache-admin-twin@test.com",
+            password="secret",
+            role=User.Role.ACCOUNT_ADMIN,
+        )
+        self.admin_a_twin.clients.add(client_a)
+
+    def _dashboard(self, email=None):
+        headers = {"HTTP_X_CURRENT_USER_EMAIL": email} if email else {}
+        response = self.client.get("/api/dashboard/", **headers)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_dashboard_is_cached_per_scope_and_invalidated_by_scope_activity(self):
+        first = self._dashboard(self.admin_a.email)
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertIn("dashboard;dur=", first["Server-Timing"])
+
+        with CaptureQueriesContext(connection) as context:
+            twin = self._dashboard(self.admin_a_twin.email)
+        self.assertEqual(twin["X-Cache"], "HIT")
+        self.assertEqual(twin.json(), first.json())
+        self.assertLessEqual(len(context.captured_queries), 3)
+
+        self._dashboard()
+        Visit.objects.create(area=self.area_b, visited_at=timezone.now() + timedelta(hours=1))
+        self.assertEqual(self._dashboard(self.admin_a.email)["X-Cache"], "HIT")
+        self.assertEqual(self._dashboard()["X-Cache"], "MISS")
+
+        Visit.objects.create(area=self.area_a, visited_at=timezone.now() + timedelta(hours=1))
+        refreshed = self._dashboard(self.admin_a.email)
+        self.assertEqual(refreshed["X-Cache"], "MISS")
+        self.assertEqual(refreshed.json()["stats"]["visits"], first.json()["stats"]["visits"] + 1)
+
+    def test_dashboard_cache_key_does_not_grow_with_scope_areas(self):
+        branch = self.area_a.branch
+        Area.objects.bulk_create([Area(branch=branch, name=f"Área {index}") for index in range(60)])
+        rebuild_user_area_scope(self.admin_a)
+        rebuild_user_area_scope(self.admin_a_twin)
+        self._dashboard(self.admin_a.email)
+
+        with CaptureQueriesContext(connection) as context:
+            twin = self._dashboard(self.admin_a_twin.email)
+
+        self.assertEqual(twin["X-Cache"], "HIT")
+        self.assertLessEqual(len(context.captured_queries), 3)
+        # Una versión de actividad por cliente del alcance, no una por área.
+        self.assertEqual(
+            list(CacheVersion.objects.filter(key__startswith="activity:").values_list("key", flat=True)),
+            [f"activity:client:{branch.client_id}"],
+        )
+
+    @override_settings(DASHBOARD_CACHE_TIMEOUT=0)
+    def test_dashboard_cache_can_be_disabled(self):
+        self._dashboard()
+        self.assertNotIn("X-Cache", self._dashboard())
+
+    def test_dashboard_cache_stats_command_reports_hit_ratio(self):
+        self._dashboard()
+        self._dashboard()
+        self._dashboard()
+
+        output = StringIO()
+        call_command("dashboard_cache_stats", "--reset", stdout=output)
+
+        self.assertIn("Aciertos: 2  Fallos: 1  Tasa de aciertos: 66.67%", output.getvalue())
+        output = StringIO()
+        call_command("dashboard_cache_stats", stdout=output)
+        self.assertIn("Aciertos: 0  Fallos: 0", output.getvalue())
+
+    def test_dashboard_cache_and_stats_are_shared_between_processes(self):
+        self._dashboard()
+
+        # Otro worker o ``manage.py dashboard_cache_stats`` abren su propia instancia sobre el mismo directorio.
+        other_process = FileBasedCache(settings.CACHES["default"]["LOCATION"], {})
+        self.assertEqual(other_process.get(views.DASHBOARD_STATS_KEYS["misses"]), 1)
+        other_process.clear()
+        self.assertEqual(views.get_dashboard_cache_stats()["misses"], 0)
+        self.assertEqual(self._dashboard()["X-Cache"], "MISS")
+
+
+class DailyAreaComplianceTests(TestCase):
+    def setUp(self):
+        client = Client.objects.create(name="Cliente Rollup", code="RLP")
+        self.branch = Branch.objects.create(client=client, name="Sucursal Rollup")
+        self.area = Area.objects.create(branch=self.branch, name="Cocina")
+        self.other_area = Area.objects.create(branch=self.branch, name="Bodega")
+        self.form = AuditForm.objects.create(name="Checklist Rollup", schema={"questions": []})
+
+    def _at(self, day, hour=10):
+        return datetime(2026, 3, day, hour, tzinfo=dt_timezone.utc)
+
+    def _rows(self):
+        return {
+            (row.area_id, row.date.day): (
+                row.completed_visits,
+                row.completed_audits,
+                row.scheduled_visits,
+                row.scheduled_audits,
+                row.incidents,
+            )
+            for row in DailyAreaCompliance.objects.all()
+        }
+
+    def _create_incident(self, area, created_at):
+        with patch("django.utils.timezone.now", return_value=created_at):
+            return Incident.objects.create(
+                client=self.branch.client, branch=self.branch, area=area, description="Fuga"
+            )
+
+    def test_rollup_follows_visit_lifecycle_and_incidents(self):
+        visit = Visit.objects.create(area=self.area, visited_at=self._at(5))
+        Audit.objects.create(area=self.area, form=self.form, audited_at=self._at(5))
+        self.assertEqual(self._rows(), {(self.area.id, 5): (0, 0, 1, 1, 0)})
+
+        visit.status = Visit.Status.COMPLETED
+        visit.completed_at = self._at(7)
+        visit.save()
+        self._create_incident(self.other_area, self._at(7))
+        self.assertEqual(
+            self._rows(),
+            {
+                (self.area.id, 5): (0, 0, 0, 1, 0),
+                (self.area.id, 7): (1, 0, 0, 0, 0),
+                (self.other_area.id, 7): (0, 0, 0, 0, 1),
+            },
+        )
+
+        visit.area = self.other_area
+        visit.save()
+        self.assertEqual(self._rows()[(self.other_area.id, 7)], (1, 0, 0, 0, 1))
+        self.assertNotIn((self.area.id, 7), self._rows())
+
+        visit.delete()
+        self.assertEqual(
+            self._rows(),
+            {(self.area.id, 5): (0, 0, 0, 1, 0), (self.other_area.id, 7): (0, 0, 0, 0, 1)},
+        )
+
+    def test_reconcile_command_repairs_drift(self):
+        Visit.objects.create(area=self.area, visited_at=self._at(3))
+        Visit.objects.create(
+            area=self.area, visited_at=self._at(2), status=Visit.Status.COMPLETED, completed_at=self._at(4)
+        )
+        expected = self._rows()
+        # Las escrituras masivas no emiten señales y dejan el rollup desfasado.
+        Visit.objects.filter(visited_at=self._at(3)).update(visited_at=self._at(6))
+        DailyAreaCompliance.objects.create(area=self.other_area, date=self._at(8).date(), incidents=3)
+
+        output = StringIO()
+        call_command("reconcile_compliance_rollup", "--all", stdout=output)
+
+        self.assertIn("3 corregidas", output.getvalue())
+        del expected[(self.area.id, 3)]
+        expected[(self.area.id, 6)] = (0, 0, 1, 0, 0)
+        self.assertEqual(self._rows(), expected)
+        self.assertEqual(rebuild_rollup(self._at(1).date(), self._at(31).date()), (0, 2))
+
+    def test_daily_compliance_derives_overdue_and_respects_scope(self):
+        Visit.objects.create(area=self.area, visited_at=self._at(5))
+        Visit.objects.create(
+            area=self.area, visited_at=self._at(5), status=Visit.Status.COMPLETED, completed_at=self._at(5)
+        )
+        Visit.objects.create(area=self.area, visited_at=self._at(10, hour=8))
+        Audit.objects.create(area=self.area, form=self.form, audited_at=self._at(10, hour=20))
+        Visit.objects.create(area=self.area, visited_at=self._at(12))
+        self._create_incident(self.other_area, self._at(5))
+
+        now = self._at(10, hour=12)
+        series = daily_compliance(None, self._at(1).date(), self._at(31).date(), now=now)
+        self.assertEqual(
+            [(row["date"].day, row["completed"], row["overdue"], row["incidents"], row["score"]) for row in series],
+            [(5, 1, 1, 1, 33.33), (10, 0, 1, 0, 0.0)],
+        )
+
+        branch_admin = User.objects.create_user(
+            username="rollup-branch",
+            email="rollup-branch@test.com",
+            password="secret",
+            role=User.Role.BRANCH_ADMIN,
+        )
+        other_branch = Branch.objects.create(client=self.branch.client, name="Sucursal Ajena")
+        branch_admin.branches.add(other_branch)
+        scope = build_access_scope(branch_admin)
+        self.assertEqual(daily_compliance(scope, self._at(1).date(), self._at(31).date(), now=now), [])
+
+    def test_deleting_area_drops_its_rollup(self):
+        Visit.objects.create(area=self.other_area, visited_at=self._at(5))
+        Audit.objects.create(area=self.other_area, form=self.form, audited_at=self._at(5))
+
+        self.other_area.delete()
+
+        self.assertFalse(DailyAreaCompliance.objects.exists())
+
+
+class ComplianceTrendTests(TestCase):
+    def setUp(self):
+        self.client_a = Client.objects.create(name="Cliente Tendencia A", code="TNA")
+        self.client_b = Client.objects.create(name="Cliente Tendencia B", code="TNB")
+        branch_a = Branch.objects.create(client=self.client_a, name="Norte")
+        branch_b = Branch.objects.create(client=self.client_b, name="Sur")
+        self.area_a = Area.objects.create(branch=branch_a, name="Cocina")
+        self.area_b = Area.objects.create(branch=branch_b, name="Bodega")
+        form = AuditForm.objects.create(name="Checklist Tendencia", schema={"questions": []})
+
+        def at(month, day, hour=10):
+            return datetime(2026, month, day, hour, tzinfo=dt_timezone.utc)
+
+        completed = Visit.Status.COMPLETED
+        for area, visited_at, status, completed_at in (
+            (self.area_a, at(1, 10), completed, at(1, 12)),
+            (self.area_a, at(1, 20), Visit.Status.SCHEDULED, None),
+            (self.area_b, at(2, 3), completed, at(2, 3)),
+            (self.area_a, at(3, 2), completed, at(3, 2)),
+            (self.area_a, at(3, 10, hour=8), Visit.Status.SCHEDULED, None),
+            (self.area_b, at(3, 10, hour=20), Visit.Status.SCHEDULED, None),
+        ):
+            Visit.objects.create(area=area, visited_at=visited_at, status=status, completed_at=completed_at)
+        Audit.objects.create(
+            area=self.area_b, form=form, audited_at=at(2, 5), status=Audit.Status.COMPLETED, completed_at=at(2, 6)
+        )
+        with patch("django.utils.timezone.now", return_value=at(2, 8)):
+            Incident.objects.create(client=self.client_b, branch=branch_b, area=self.area_b, description="Fuga")
+
+        self.account_admin = User.objects.create_user(
+            username="tendencia-admin",
+            email="tendencia-admin@test.com",
+            password="secret",
+            role=User.Role.ACCOUNT_ADMIN,
+        )
+        self.account_admin.clients.add(self.client_a)
+        self.general_admin = User.objects.create_user(
+            username="tendencia-general",
+            email="tendencia-general@test.com",
+            password="secret",
+            role=User.Role.GENERAL_ADMIN,
+        )
+        self.now = at(3, 10, hour=12)
+
+    def _trend(self, query, email=""):
+        email = self.general_admin.email if email == "" else email
+        headers = {"HTTP_X_CURRENT_USER_EMAIL": email} if email else {}
+        with patch("django.utils.timezone.now", return_value=self.now):
+            return self.client.get(f"/api/analytics/compliance-trend/?{query}", **headers)
+
+    def test_monthly_trend_grouped_by_client(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self._trend("from=2026-01-01&to=2026-03-31&granularity=month&group_by=client")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(context.captured_queries), 4)
+        payload = response.json()
+        rows = [
+            (row["period"], row["group"]["name"], row["completed"], row["overdue"], row["incidents"], row["score"])
+            for row in payload["series"]
+        ]
+        self.assertEqual(
+            rows,
+            [
+                ("2026-01-01", "Cliente Tendencia A", 1, 1, 0, 50.0),
+                ("2026-02-01", "Cliente Tendencia B", 2, 0, 1, 66.67),
+                ("2026-03-01", "Cliente Tendencia A", 1, 1, 0, 50.0),
+            ],
+        )
+        self.assertEqual(
+            payload["totals"],
+            {"completed": 4, "overdue": 2, "incidents": 1, "non_compliant": 3, "score": 57.14},
+        )
+
+    def test_weekly_trend_is_limited_to_scope(self):
+        response = self._trend("from=2026-01-01&to=2026-03-31&granularity=week", self.account_admin.email)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["period"], row["completed"], row["overdue"]) for row in response.json()["series"]],
+            [("2026-01-12", 1, 0), ("2026-01-19", 0, 1), ("2026-03-02", 1, 0), ("2026-03-09", 0, 1)],
+        )
+
+    def test_anonymous_request_returns_401(self):
+        response = self._trend("from=2026-01-01&to=2026-03-31", email=None)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertNotIn("series", response.json())
+
+    def test_invalid_parameters_return_400(self):
+        for query in (
+            "from=2026-13-01",
+            "from=2026-03-01&to=2026-01-01",
+            "from=2020-01-01&to=2026-01-01",
+            "granularity=year",
+            "group_by=inspector",
+        ):
+            with self.subTest(query=query):
+                self.assertEqual(self._trend(query).status_code, 400)
+
+
+class NotificationInboxTests(TestCase):
+    def setUp(self):
+        client_entity = Client.objects.create(name="Cliente Avisos", code="AVI")
+        self.branch = Branch.objects.create(client=client_entity, name="Sucursal Avisos")
+        self.area = Area.objects.create(branch=self.branch, name="Cocina")
+        self.dispenser = Dispenser.objects.create(
+            model=DispenserModel.objects.create(name="Modelo Avisos"), identifier="AVI-1", area=self.area
+        )
+        self.branch_admin = User.objects.create_user(
+            username="avisos-branch",
+            email="avisos-branch@test.com",
+            password="secret",
+            role=User.Role.BRANCH_ADMIN,
+        )
+        self.branch_admin.branches.add(self.branch)
+        self.general_admin = User.objects.create_user(
+            username="avisos-general",
+            email="avisos-general@test.com",
+            password="secret",
+            role=User.Role.GENERAL_ADMIN,
+        )
+        self.outsider = User.objects.create_user(
+            username="avisos-ajeno",
+            email="avisos-ajeno@test.com",
+            password="secret",
+            role=User.Role.BRANCH_ADMIN,
+        )
+        self.outsider.branches.add(
+            Branch.objects.create(client=Client.objects.create(name="Otro", code="OTR"), name="Ajena")
+        )
+
+    @patch("core.views._send_email_async")
+    def _create_incident(self, description, send_email_async_mock):
+        response = self.client.post(
+            "/api/incidents/",
+            data=json.dumps(
+                {
+                    "client_id": self.branch.client_id,
+                    "branch_id": self.branch.id,
+                    "area_id": self.area.id,
+                    "dispenser_id": self.dispenser.id,
+                    "description": description,
+                }
+            ),
+            content_type="application/json",
+            HTTP_X_CURRENT_USER_EMAIL=self.branch_admin.email,
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()["id"]
+
+    def _get(self, path, user):
+        return self.client.get(path, HTTP_X_CURRENT_USER_EMAIL=user.email)
+
+    def test_incident_fans_out_to_area_users_and_general_admins(self):
+        incident_id = self._create_incident("Fuga detectada")
+
+        for user in (self.branch_admin, self.general_admin):
+            with self.subTest(user=user.username):
+                results = self._get("/api/notifications/", user).json()["results"]
+                self.assertEqual(len(results), 1)
+                self.assertEqual(results[0]["type"], "incident")
+                self.assertEqual(results[0]["title"], "Nueva incidencia")
+                self.assertEqual(results[0]["message"], "Sucursal Avisos · Cocina: Fuga detectada")
+                self.assertTrue(results[0]["unread"])
+        self.assertEqual(self._get("/api/notifications/", self.outsider).json()["results"], [])
+        self.assertEqual(
+            Notification.objects.filter(object_id=incident_id, event="incident_created").count(), 2
+        )
+
+    @patch("core.views._send_email_async")
+    def test_assigned_inspector_receives_completion_without_area_membership(self, send_email_async_mock):
+        inspector = User.objects.create_user(
+            username="avisos-inspector",
+            email="avisos-inspector@test.com",
+            password="secret",
+            role=User.Role.INSPECTOR,
+        )
+        audit = Audit.objects.create(
+            area=self.area,
+            form=AuditForm.objects.create(name="Checklist Avisos", schema={"questions": []}),
+            inspector=inspector,
+            status=Audit.Status.SCHEDULED,
+            started_at=timezone.now(),
+            start_latitude=-12.05,
+            start_longitude=-77.04,
+        )
+
+        response = self.client.patch(
+            f"/api/audits/{audit.id}/mobile-flow/",
+            data=json.dumps(
+                {
+                    "action": "complete",
+                    "end_latitude": -12.06,
+                    "end_longitude": -77.05,
+                    "audit_report": {"location_verified": True, "answers": []},
+                }
+            ),
+            content_type="application/json",
+            HTTP_X_CURRENT_USER_EMAIL=inspector.email,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        [item] = self._get("/api/notifications/", inspector).json()["results"]
+        self.assertEqual(item["type"], "audit")
+        self.assertEqual(item["title"], "Auditoría finalizada")
+        self.assertEqual(self._get("/api/notifications/", self.outsider).json()["results"], [])
+
+    def test_unread_count_and_mark_read_are_per_user(self):
+        for index in range(3):
+            self._create_incident(f"Fuga {index}")
+        latest_id = self._get("/api/notifications/", self.branch_admin).json()["results"][0]["id"]
+
+        response = self.client.post(
+            "/api/notifications/read/",
+            data=json.dumps({"ids": [latest_id]}),
+            content_type="application/json",
+            HTTP_X_CURRENT_USER_EMAIL=self.branch_admin.email,
+        )
+        self.assertEqual(response.json(), {"updated": 1, "unread": 2})
+        self.assertEqual(self._get("/api/notifications/unread-count/", self.branch_admin).json(), {"unread": 2})
+        self.assertEqual(self._get("/api/notifications/unread-count/", self.general_admin).json(), {"unread": 3})
+        unread = self._get("/api/notifications/?unread=1", self.branch_admin).json()["results"]
+        self.assertNotIn(latest_id, [item["id"] for item in unread])
+
+        response = self.client.post(
+            "/api/notifications/read/",
+            data=json.dumps({"all": True}),
+            content_type="application/json",
+            HTTP_X_CURRENT_USER_EMAIL=self.branch_admin.email,
+        )
+        self.assertEqual(response.json(), {"updated": 2, "unread": 0})
+
+    def test_feed_is_paginated_by_cursor(self):
+        for index in range(3):
+            self._create_incident(f"Fuga {index}")
+
+        first = self._get("/api/notifications/?page_size=2", self.branch_admin).json()
+        second = self._get(f"/api/notifications/?page_size=2&cursor={first['next']}", self.branch_admin).json()
+
+        self.assertEqual(
+            [item["message"] for item in first["results"] + second["results"]],
+            [f"Sucursal Avisos · Cocina: Fuga {index}" for index in (2, 1, 0)],
+        )
+        self.assertIsNone(second["next"])
+
+    def test_notification_endpoints_require_user(self):
+        self.assertEqual(self.client.get("/api/notifications/").status_code, 401)
+        self.assertEqual(self.client.get("/api/notifications/unread-count/").status_code, 401)
+        self.assertEqual(self.client.post("/api/notifications/read/").status_code, 401)
+
+
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="stream-admin", email="stream-admin@test.com", password="secret", role=User.Role.GENERAL_ADMIN
+        )
+
+    async def test_broker_delivers_from_other_threads_and_replays_missed_events(self):
+        broker = InProcessEventBroker(replay_size=3)
+        subscription, backlog = broker.subscribe(user_id=1)
+        self.assertEqual(backlog, [])
+
+        await asyncio.to_thread(broker.publish, "incident_created", {"object_id": 7}, {1, 2})
+        broker.publish("incident_created", {"object_id": 8}, {2})
+        message = await asyncio.wait_for(subscription.get(), timeout=1)
+        self.assertEqual(message["data"], {"object_id": 7})
+        self.assertTrue(subscription.queue.empty())
+        broker.unsubscribe(subscription)
+
+        for object_id in (9, 10):
+            broker.publish("visit_completed", {"object_id": object_id}, {1})
+        _, backlog = broker.subscribe(user_id=1, last_event_id=message["id"])
+        self.assertEqual([item["data"]["object_id"] for item in backlog], [9, 10])
+
+        broker.publish("visit_completed", {"object_id": 11}, {1})
+        self.assertIsNone(broker.subscribe(user_id=1, last_event_id=message["id"])[1])
+        self.assertIsNone(broker.subscribe(user_id=1, last_event_id="otro-arranque-1")[1])
+
+    async def test_slow_subscriber_is_disconnected_and_capacity_is_bounded(self):
+        broker = InProcessEventBroker(max_pending=2, max_subscribers=1)
+        subscription, _ = broker.subscribe(user_id=1)
+        with self.assertRaises(BrokerFull):
+            broker.subscribe(user_id=2)
+
+        for object_id in range(4):
+            broker.publish("visit_completed", {"object_id": object_id}, {1})
+        await asyncio.sleep(0)
+
+        received = [await subscription.get() for _ in range(3)]
+        self.assertEqual([item["data"]["object_id"] for item in received[:2]], [0, 1])
+        self.assertIsNone(received[2])
+
+    async def test_database_broker_shares_events_between_instances(self):
+        # Cada instancia hace de un proceso distinto: solo comparten la base de datos.
+        publisher = DatabaseEventBroker(replay_size=3)
+        broker = DatabaseEventBroker(replay_size=3, poll_interval=0.01)
+        subscription, backlog = await broker.asubscribe(user_id=1)
+        self.assertEqual(backlog, [])
+
+        await sync_to_async(publisher.publish)("incident_created", {"object_id": 7}, {1, 2})
+        await sync_to_async(publisher.publish)("incident_created", {"object_id": 8}, {2})
+        message = await asyncio.wait_for(subscription.get(), timeout=1)
+        self.assertEqual(message["data"], {"object_id": 7})
+        await asyncio.sleep(0.05)
+        self.assertTrue(subscription.queue.empty())
+        broker.unsubscribe(subscription)
+        await asyncio.sleep(0.05)
+
+        for object_id in (9, 10):
+            await sync_to_async(publisher.publish)("visit_completed", {"object_id": object_id}, {1})
+        _, backlog = await broker.asubscribe(user_id=1, last_event_id=message["id"])
+        self.assertEqual([item["data"]["object_id"] for item in backlog], [9, 10])
+
+        await sync_to_async(publisher.publish)("visit_completed", {"object_id": 11}, {1})
+        self.assertIsNone((await broker.asubscribe(user_id=1, last_event_id=message["id"]))[1])
+        self.assertIsNone((await broker.asubscribe(user_id=1, last_event_id="otro-arranque-1"))[1])
+        self.assertEqual(await StreamEvent.objects.acount(), 3)
+
+    @override_settings(DEBUG=False, EVENTS_BROKER_BACKEND="core.events.InProcessEventBroker")
+    def test_process_local_broker_is_rejected_outside_debug(self):
+        with self.assertRaises(ImproperlyConfigured):
+            events.ensure_shared_broker()
+
+        with override_settings(EVENTS_BROKER_BACKEND="core.events.DatabaseEventBroker"):
+            events.ensure_shared_broker()
+
+    async def test_stream_endpoint_sends_scoped_events(self):
+        broker = InProcessEventBroker()
+        token_response = await self.async_client.post(
+            "/api/notifications/stream/token/", headers={"X-Current-User-Email": self.user.email}
+        )
+        self.assertEqual(token_response.status_code, 200)
+        token = token_response.json()["token"]
+        with patch("core.events.get_broker", return_value=broker):
+            response = await self.async_client.get(f"/api/notifications/stream/?token={token}")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            chunks = aiter(response.streaming_content)
+            self.assertEqual(await anext(chunks), b"retry: 5000\n\n")
+
+            broker.publish("incident_created", {"object_id": 1}, {self.user.id + 1})
+            message = broker.publish("incident_created", {"object_id": 2}, {self.user.id})
+            chunk = await asyncio.wait_for(anext(chunks), timeout=1)
+            await chunks.aclose()
+
+        self.assertEqual(
+            chunk.decode(),
+            f'id: {message["id"]}\nevent: incident_created\ndata: {{"object_id": 2}}\n\n',
+        )
+
+    async def test_stream_does_not_accept_email_or_forged_tokens(self):
+        forged = signing.dumps({"user_id": self.user.id}, salt="otra-sal")
+        for query in (f"email={self.user.email}", f"token={forged}", "token=basura"):
+            response = await self.async_client.get(f"/api/notifications/stream/?{query}")
+            self.assertEqual(response.status_code, 401, query)
+
+    def test_stream_requires_asgi_server(self):
+        self.assertEqual(self.client.get("/api/notifications/stream/").status_code, 501)
+
+    @patch("core.views._send_email_async")
+    def test_incident_creation_publishes_stream_event(self, send_email_async_mock):
+        client_entity = Client.objects.create(name="Cliente Stream", code="STR")
+        branch = Branch.objects.create(client=client_entity, name="Sucursal Stream")
+        area = Area.objects.create(branch=branch, name="Cocina")
+        dispenser = Dispenser.objects.create(
+            model=DispenserModel.objects.create(name="Modelo Stream"), identifier="STR-1", area=area
+        )
+        broker = InProcessEventBroker()
+        with patch("core.events.get_broker", return_value=broker), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/incidents/",
+                data=json.dumps(
+                    {
+                        "client_id": client_entity.id,
+                        "branch_id": branch.id,
+                        "area_id": area.id,
+                        "dispenser_id": dispenser.id,
+                        "description": "Fuga",
+                    }
+                ),
+                content_type="application/json",
+                HTTP_X_CURRENT_USER_EMAIL=self.user.email,
+            )
+
+        self.assertEqual(response.status_code, 201)
+        [message] = broker._history
+        self.assertEqual(message["event"], "incident_created")
+        self.assertEqual(message["data"]["object_id"], response.json()["id"])
+        self.assertEqual(message["user_ids"], frozenset({self.user.id}))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ReportArtifactTests(TestCase):
+    def setUp(self):
+        self.client_entity = Client.objects.create(name="Cliente", code="CL-ART")
+        self.branch = Branch.objects.create(client=self.client_entity, name="Sucursal")
+        self.area = Area.objects.create(branch=self.branch, name="Área")
+        self.inspector = User.objects.create_user(
+            username="inspector-art",
+            email="inspector-art@test.com",
+            password="secret",
+            role=User.Role.INSPECTOR,
+        )
+        self.inspector.areas.add(self.area)
+        self.visit = Visit.objects.create(
+            area=self.area,
+            inspector=self.inspector,
+            status=Visit.Status.COMPLETED,
+            started_at=timezone.now(),
+            completed_at=timezone.now(),
+        )
+        self.public_token = signing.dumps({"visit_id": self.visit.id}, salt="visit-report-public-link")
+
+    @patch("core.views._build_visit_pdf", return_value=b"%PDF-1.4 test")
+    def test_repeated_download_reuses_stored_pdf(self, build_pdf_mock):
+        first = self.client.get(f"/api/visits/report/public/{self.public_token}.pdf")
+        second = self.client.get(f"/api/visits/report/public/{self.public_token}.pdf")
+
+        self.assertEqual(b"".join(first.streaming_content), b"%PDF-1.4 test")
+        self.assertEqual(b"".join(second.streaming_content), b"%PDF-1.4 test")
+        self.assertEqual(first["ETag"], second["ETag"])
+        self.assertIn("private", second["Cache-Control"])
+        build_pdf_mock.assert_called_once_with(self.visit, public_report_url=None)
+        self.assertEqual(ReportArtifact.objects.filter(object_id=self.visit.id).count(), 1)
+
+    @patch("core.views._build_visit_pdf", return_value=b"%PDF-1.4 test")
+    def test_matching_etag_returns_not_modified(self, build_pdf_mock):
+        first = self.client.get(f"/api/visits/report/public/{self.public_token}.pdf")
+
+        response = self.client.get(
+            f"/api/visits/report/public/{self.public_token}.pdf",
+            HTTP_IF_NONE_MATCH=first["ETag"],
+        )
+
+        self.assertEqual(response.status_code, 304)
+        build_pdf_mock.assert_called_once()
+
+    @patch("core.views._build_visit_pdf", side_effect=[b"%PDF-1.4 v1", b"%PDF-1.4 v2"])
+    def test_editing_visit_renders_new_pdf_and_discards_previous(self, build_pdf_mock):
+        self.client.get(f"/api/visits/report/public/{self.public_token}.pdf")
+        previous = ReportArtifact.objects.get(object_id=self.visit.id)
+
+        self.visit.notes = "Se repuso el dosificador"
+        self.visit.save(update_fields=["notes"])
+        response = self.client.get(f"/api/visits/report/public/{self.public_token}.pdf")
+
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1.4 v2")
+        self.assertEqual(build_pdf_mock.call_count, 2)
+        current = ReportArtifact.objects.get(object_id=self.visit.id)
+        self.assertNotEqual(current.content_hash, previous.content_hash)
+        self.assertFalse(previous.file.storage.exists(previous.file.name))
+
+    @patch("core.views._build_visit_pdf", return_value=b"%PDF-1.4 test")
+    def test_template_version_change_renders_again(self, build_pdf_mock):
+        self.client.get(f"/api/visits/report/public/{self.public_token}.pdf")
+
+        with patch("core.report_artifacts.REPORT_TEMPLATE_VERSION", "test-next"):
+            self.client.get(f"/api/visits/report/public/{self.public_token}.pdf")
+
+        self.assertEqual(build_pdf_mock.call_count, 2)
+        self.assertEqual(
+            list(ReportArtifact.objects.filter(object_id=self.visit.id).values_list("template_version", flat=True)),
+            ["test-next"],
+        )
+
+    @patch("core.views._build_visit_pdf", return_value=b"%PDF-1.4 test")
+    def test_authenticated_report_keeps_separate_qr_variant(self, build_pdf_mock):
+        self.client.get(f"/api/visits/report/public/{self.public_token}.pdf")
+        self.client.get(f"/api/visits/{self.visit.id}/report", HTTP_X_CURRENT_USER_EMAIL=self.inspector.email)
+        self.client.get(f"/api/visits/{self.visit.id}/report", HTTP_X_CURRENT_USER_EMAIL=self.inspector.email)
+
+        self.assertEqual(build_pdf_mock.call_count, 2)
+        self.assertEqual(
+            sorted(ReportArtifact.objects.filter(object_id=self.visit.id).values_list("variant", flat=True)),
+            ["plain", "qr:testserver"],
+        )
+
+    @patch("core.views._build_visit_pdf", return_value=b"%PDF-1.4 test")
+    def test_deleting_visit_removes_stored_pdf(self, build_pdf_mock):
+        self.client.get(f"/api/visits/report/public/{self.public_token}.pdf")
+        artifact = ReportArtifact.objects.get(object_id=self.visit.id)
+
+        self.visit.delete()
+
+        self.assertFalse(ReportArtifact.objects.exists())
+        self.assertFalse(artifact.file.storage.exists(artifact.file.name))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ReportRenderJobTests(TestCase):
+    def setUp(self):
+        self.client_entity = Client.objects.create(name="Cliente", code="CL-JOB")
+        self.branch = Branch.objects.create(client=self.client_entity, name="Sucursal")
+        self.area = Area.objects.create(branch=self.branch, name="Área")
+        self.admin = User.objects.create_user(
+            username="admin-job",
+            email="admin-job@test.com",
+            password="secret",
+            role=User.Role.GENERAL_ADMIN,
+        )
+        self.visit = Visit.objects.create(
+            area=self.area,
+            status=Visit.Status.COMPLETED,
+            started_at=timezone.now(),
+            completed_at=timezone.now(),
+        )
+
+    @patch("core.views._build_visit_pdf", return_value=b"%PDF-1.4 test")
+    def test_worker_prerenders_report_before_download(self, build_pdf_mock):
+        report_jobs.enqueue(ReportArtifact.Kind.VISIT, [self.visit.id])
+
+        out = StringIO()
+        call_command("process_report_jobs", "--once", stdout=out)
+        token = signing.dumps({"visit_id": self.visit.id}, salt="visit-report-public-link")
+        response = self.client.get(f"/api/visits/report/public/{token}.pdf")
+
+        self.assertIn("Informes generados: 1", out.getvalue())
+        self.assertEqual(response.status_code, 200)
+        build_pdf_mock.assert_called_once_with(self.visit, public_report_url=None)
+        listing = self.client.get("/api/visits/", {"fields": "report_status"}, HTTP_X_CURRENT_USER_EMAIL=self.admin.email)
+        self.assertEqual(listing.json()["results"][0]["report_status"], ReportRenderJob.Status.DONE)
+
+    @override_settings(REPORT_PUBLIC_BASE_URL="https://trust.example")
+    @patch("core.views._build_visit_pdf", return_value=b"%PDF-1.4 test")
+    def test_worker_prerenders_the_authenticated_download_with_qr(self, build_pdf_mock):
+        report_jobs.enqueue(ReportArtifact.Kind.VISIT, [self.visit.id])
+        self.assertEqual(report_jobs.process_pending(), (1, 0))
+        self.assertEqual(build_pdf_mock.call_count, 2)
+        qr_url = build_pdf_mock.call_args.kwargs["public_report_url"]
+        self.assertTrue(qr_url.startswith("https://trust.example/visits/report/public/"))
+
+        response = self.client.get(
+            f"/api/visits/{self.visit.id}/report.pdf", HTTP_X_CURRENT_USER_EMAIL=self.admin.email
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1.4 test")
+        self.assertEqual(build_pdf_mock.call_count, 2)
+        self.assertEqual(
+            set(ReportArtifact.objects.filter(object_id=self.visit.id).values_list("variant", flat=True)),
+            {"plain", "qr:trust.example"},
+        )
+
+    @patch("core.views._build_visit_pdf", side_effect=RuntimeError("sin fuentes"))
+    def test_failing_job_is_retried_then_marked_failed(self, build_pdf_mock):
+        report_jobs.enqueue(ReportArtifact.Kind.VISIT, [self.visit.id])
+
+        with self.assertLogs("core.report_jobs", level="ERROR"):
+            self.assertEqual(report_jobs.process_pending(), (0, report_jobs.MAX_ATTEMPTS))
+
+        job = ReportRenderJob.objects.get(object_id=self.visit.id)
+        self.assertEqual(job.status, ReportRenderJob.Status.FAILED)
+        self.assertEqual(job.attempts, report_jobs.MAX_ATTEMPTS)
+        self.assertIn("sin fuentes", job.last_error)
+        self.assertIsNone(report_jobs.claim_next())
+
+    def test_stale_running_job_is_claimed_again(self):
+        report_jobs.enqueue(ReportArtifact.Kind.VISIT, [self.visit.id])
+        first = report_jobs.claim_next()
+        self.assertIsNone(report_jobs.claim_next())
+
+        ReportRenderJob.objects.filter(pk=first.pk).update(
+            started_at=timezone.now() - report_jobs.RUNNING_LEASE - timedelta(minutes=1)
+        )
+
+        self.assertEqual(report_jobs.claim_next().pk, first.pk)
+
+    def test_list_exposes_report_status_without_extra_queries(self):
+        other = Visit.objects.create(area=self.area, status=Visit.Status.COMPLETED, completed_at=timezone.now())
+        report_jobs.enqueue(ReportArtifact.Kind.VISIT, [self.visit.id])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/api/visits/", {"fields": "report_status"}, HTTP_X_CURRENT_USER_EMAIL=self.admin.email
+            )
+
+        statuses = {item["id"]: item["report_status"] for item in response.json()["results"]}
+        self.assertEqual(statuses, {self.visit.id: ReportRenderJob.Status.PENDING, other.id: None})
+        self.assertFalse(
+            [
+                query
+                for query in queries.captured_queries
+                if "core_reportrenderjob" in query["sql"] and "core_visit" not in query["sql"]
+            ]
+        )
+
+    def test_backfill_enqueues_completed_records_without_job(self):
+        Visit.objects.create(area=self.area, status=Visit.Status.SCHEDULED)
+        old_visit = Visit.objects.create(
+            area=self.area,
+            status=Visit.Status.COMPLETED,
+            completed_at=timezone.now() - timedelta(days=90),
+        )
+
+        call_command("backfill_report_jobs", stdout=StringIO())
+        self.assertEqual(
+            set(ReportRenderJob.objects.values_list("object_id", flat=True)), {self.visit.id}
+        )
+
+        call_command("backfill_report_jobs", "--all", "--kind", "visit", stdout=StringIO())
+        self.assertEqual(
+            set(ReportRenderJob.objects.values_list("object_id", flat=True)), {self.visit.id, old_visit.id}
+        )
+
+
+class ReportFontTests(TestCase):
+    def setUp(self):
+        override = override_settings(REPORT_CACHE_DIR=tempfile.mkdtemp())
+        override.enable()
+        self.addCleanup(override.disable)
+        report_fonts.register_report_fonts.cache_clear()
+        self.addCleanup(report_fonts.register_report_fonts.cache_clear)
+
+    def _font_response(self, request, timeout):
+        name = request.full_url.rsplit("/", 1)[-1]
+        source = {
+            "Poppins-Regular.ttf": "Vera.ttf",
+            "Poppins-Bold.ttf": "VeraBd.ttf",
+            "Poppins-Italic.ttf": "VeraIt.ttf",
+        }.get(name)
+        response = MagicMock()
+        response.__enter__.return_value.read.return_value = (
+            (report_fonts._REPORTLAB_FONT_DIR / source).read_bytes() if source else b"SIL Open Font License"
+        )
+        return response
+
+    def test_fonts_are_registered_without_network(self):
+        with patch("core.report_fonts.urlopen", side_effect=AssertionError("sin red")) as urlopen_mock:
+            fonts = report_fonts.register_report_fonts()
+
+        urlopen_mock.assert_not_called()
+        self.assertNotEqual(fonts, report_fonts.FALLBACK_FONTS)
+        for name in fonts:
+            self.assertIsNotNone(pdfmetrics.getFont(name))
+
+    @patch("core.report_fonts.POPPINS_DIRS", [])
+    def test_missing_poppins_falls_back_with_warning(self):
+        with patch("core.report_fonts.urlopen", side_effect=OSError("sin red")):
+            with self.assertLogs("core.report_fonts", level="WARNING") as logs:
+                fonts = report_fonts.register_report_fonts()
+
+        self.assertEqual(fonts.regular, "TrustSans")
+        self.assertTrue(any("Poppins is not available" in line for line in logs.output))
+
+    @override_settings(REPORT_FONTS_REMOTE_ENABLED=True)
+    @patch("core.report_fonts.POPPINS_DIRS", [])
+    def test_poppins_is_downloaded_once_into_report_cache(self):
+        with patch("core.report_fonts.urlopen", side_effect=self._font_response) as urlopen_mock:
+            fonts = report_fonts.register_report_fonts()
+            report_fonts.register_report_fonts.cache_clear()
+            again = report_fonts.register_report_fonts()
+
+        self.assertEqual(fonts, again)
+        self.assertEqual(fonts.regular, "Poppins")
+        self.assertEqual(urlopen_mock.call_count, len(report_fonts.POPPINS_FILES) + 1)
+        self.assertTrue((report_fonts._cache_dir() / report_fonts.POPPINS_LICENSE).exists())
+
+    def test_visit_and_audit_builders_share_registered_family(self):
+        views._initialize_report_fonts()
+
+        self.assertEqual(
+            (views.REPORT_FONT, views.REPORT_FONT_BOLD, views.REPORT_FONT_ITALIC),
+            tuple(report_fonts.register_report_fonts()),
+        )
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class MediaDerivativeTests(TestCase):
+    def setUp(self):
+        client = Client.objects.create(name="Cliente", code="CL-MED")
+        branch = Branch.objects.create(client=client, name="Sucursal")
+        self.area = Area.objects.create(branch=branch, name="Área")
+        self.visit = Visit.objects.create(area=self.area)
+
+    def _photo(self, size=(4000, 3000), orientation=None):
+        image = Image.new("RGB", size, "navy")
+        exif = Image.Exif()
+        if orientation:
+            exif[0x0112] = orientation
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", exif=exif)
+        return SimpleUploadedFile("foto.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+    def test_upload_creates_oriented_thumbnail_and_report_image(self):
+        # Orientación 6: la cámara guardó la foto girada 90°.
+        medium = VisitMedia.objects.create(visit=self.visit, file=self._photo(orientation=6))
+        medium.refresh_from_db()
+
+        with Image.open(medium.report_image.path) as report_image:
+            self.assertEqual(report_image.size, (1200, 1600))
+        with Image.open(medium.thumbnail.path) as thumbnail:
+            self.assertEqual(thumbnail.size, (240, 320))
+        item = views._serialize_media_list([medium])[0]
+        self.assertRegex(item["thumbnail"], r"/visits/media/derivatives/foto\w*\.jpg\.thumb\.jpg$")
+        self.assertRegex(item["report_image"], r"/visits/media/derivatives/foto\w*\.jpg\.report\.jpg$")
+
+    def test_same_stem_uploads_keep_their_own_derivatives(self):
+        first = VisitMedia.objects.create(visit=self.visit, file=self._photo())
+        png = BytesIO()
+        Image.new("RGB", (800, 600), "red").save(png, format="PNG")
+        second = VisitMedia.objects.create(
+            visit=self.visit, file=SimpleUploadedFile("foto.png", png.getvalue(), content_type="image/png")
+        )
+        first.refresh_from_db()
+        second.refresh_from_db()
+
+        self.assertNotEqual(first.report_image.name, second.report_image.name)
+        with Image.open(first.report_image.path) as report_image:
+            self.assertEqual(report_image.size, (1600, 1200))
+        self.assertEqual(views._load_report_image(second.file.url).getSize(), (800, 600))
+
+    def test_deleting_media_removes_its_derivatives(self):
+        medium = VisitMedia.objects.create(visit=self.visit, file=self._photo(size=(800, 600)))
+        medium.refresh_from_db()
+        paths = [Path(medium.thumbnail.path), Path(medium.report_image.path)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            medium.delete()
+
+        self.assertFalse(any(path.exists() for path in paths))
+
+    def test_report_loader_prefers_report_image_for_original_reference(self):
+        medium = VisitMedia.objects.create(visit=self.visit, file=self._photo())
+
+        image = views._load_report_image(medium.file.url)
+
+        self.assertEqual(image.getSize(), (1600, 1200))
+
+    def test_unreadable_or_video_media_keeps_original_only(self):
+        video = VisitMedia.objects.create(
+            visit=self.visit,
+            media_type=VisitMedia.MediaType.VIDEO,
+            file=SimpleUploadedFile("clip.mp4", b"video", content_type="video/mp4"),
+        )
+        broken = VisitMedia.objects.create(
+            visit=self.visit, file=SimpleUploadedFile("rota.jpg", b"no-image", content_type="image/jpeg")
+        )
+
+        for medium in (video, broken):
+            medium.refresh_from_db()
+            self.assertFalse(medium.thumbnail)
+            self.assertFalse(medium.report_image)
+
+    def test_oversized_photo_is_stored_without_derivatives(self):
+        # Más del doble de MAX_IMAGE_PIXELS: Pillow se niega a descomprimirla.
+        with patch.object(Image, "MAX_IMAGE_PIXELS", 1000):
+            medium = VisitMedia.objects.create(visit=self.visit, file=self._photo(size=(800, 600)))
+        medium.refresh_from_db()
+
+        self.assertTrue(Path(medium.file.path).exists())
+        self.assertFalse(medium.thumbnail)
+        self.assertFalse(medium.report_image)
+
+    def test_backfill_command_generates_missing_derivatives(self):
+        medium = VisitMedia.objects.create(visit=self.visit, file=self._photo(size=(800, 600)))
+        VisitMedia.objects.filter(pk=medium.pk).update(thumbnail="", report_image="")
+
+        call_command("generate_media_derivatives", stdout=StringIO())
+
+        medium.refresh_from_db()
+        self.assertTrue(medium.report_image.name.endswith(".report.jpg"))
+
+
+class ReportPhotoLoadingTests(TestCase):
+    def test_photos_load_concurrently(self):
+        def slow_load(reference):
+            time.sleep(0.2)
+            return reference
+
+        started = time.monotonic()
+        with patch("core.views._preload_report_image", side_effect=slow_load):
+            loaded = views._load_report_images([f"foto-{index}.jpg" for index in range(6)])
+
+        self.assertEqual(len(loaded), 6)
+        self.assertLess(time.monotonic() - started, 0.6)
+
+    @patch("core.views.REPORT_PHOTO_BUDGET_SECONDS", 0.1)
+    def test_slow_photos_become_placeholders_and_broken_ones_are_skipped(self):
+        def load(reference):
+            if reference == "lenta.jpg":
+                time.sleep(0.5)
+            return None if reference == "rota.jpg" else reference
+
+        with patch("core.views._preload_report_image", side_effect=load), self.assertLogs("core.views", level="WARNING"):
+            references = ["ok.jpg", "lenta.jpg", "rota.jpg"]
+            slots = views._report_photo_slots(references, views._load_report_images(references))
+
+        self.assertEqual(slots, ["ok.jpg", None])
+
+
+class ReportImageCacheTests(TestCase):
+    def setUp(self):
+        self.cache_dir = Path(tempfile.mkdtemp())
+        override = override_settings(REPORT_CACHE_DIR=self.cache_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _response(self, payload):
+        response = MagicMock()
+        response.__enter__.return_value.read.side_effect = lambda size=-1: payload
+        return response
+
+    @patch("core.report_images.urlopen")
+    def test_remote_images_are_downloaded_once_and_stored_by_content(self, urlopen_mock):
+        urlopen_mock.side_effect = lambda request, timeout: self._response(b"mismo-contenido")
+
+        first = report_images.fetch_remote_image("https://cdn.example.com/a.jpg", timeout=2)
+        again = report_images.fetch_remote_image("https://cdn.example.com/a.jpg", timeout=2)
+        alias = report_images.fetch_remote_image("https://otro.example.com/a.jpg", timeout=2)
+
+        self.assertEqual({first, again, alias}, {b"mismo-contenido"})
+        self.assertEqual(urlopen_mock.call_count, 2)
+        self.assertEqual(len(list((self.cache_dir / "images").glob("*.img"))), 1)
+
+    @override_settings(REPORT_IMAGE_CACHE_MAX_BYTES=25)
+    @patch("core.report_images.urlopen")
+    def test_least_recently_used_images_are_evicted(self, urlopen_mock):
+        urlopen_mock.side_effect = lambda request, timeout: self._response(request.full_url[-1].encode() * 10)
+        report_images.fetch_remote_image("https://cdn.example.com/a", timeout=2)
+        report_images.fetch_remote_image("https://cdn.example.com/b", timeout=2)
+        oldest = self.cache_dir / "images" / f"{hashlib.sha256(b'a' * 10).hexdigest()}.img"
+        os.utime(oldest, (0, 0))
+
+        report_images.fetch_remote_image("https://cdn.example.com/c", timeout=2)
+        report_images.fetch_remote_image("https://cdn.example.com/a", timeout=2)
+
+        self.assertEqual(urlopen_mock.call_count, 4)
+
+    @override_settings(REPORT_IMAGE_MAX_BYTES=4)
+    @patch("core.report_images.urlopen")
+    def test_oversized_images_are_rejected(self, urlopen_mock):
+        urlopen_mock.side_effect = lambda request, timeout: self._response(b"demasiado-grande")
+
+        self.assertIsNone(report_images.fetch_remote_image("https://cdn.example.com/big.jpg", timeout=2))
+
+    def test_logo_is_resolved_once_for_pdf_and_html(self):
+        logo_path = self.cache_dir / "logo.png"
+        Image.new("RGB", (40, 20), "white").save(logo_path)
+        report_images.get_report_logo.cache_clear()
+        self.addCleanup(report_images.get_report_logo.cache_clear)
+
+        with patch("core.report_images.LOGO_PATHS", [logo_path]), patch("core.report_images.urlopen") as urlopen_mock:
+            drawable = views._get_audit_logo()
+            logo_path.unlink()
+            data_uri = report_templates._logo_data_uri()
+
+        self.assertIs(drawable, report_images.get_report_logo().drawable)
+        self.assertTrue(data_uri.startswith("data:image/png;base64,"))
+        urlopen_mock.assert_not_called()
+
+
+def _never_finishing_render(kind, snapshot, public_report_url, overrides):
+    # Se importa por nombre en el proceso de renderizado; deja su pid para el test.
+    (Path(overrides["MEDIA_ROOT"]) / "render.pid").write_text(str(os.getpid()))
+    time.sleep(3600)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ReportRendererTests(TestCase):
+    def setUp(self):
+        client = Client.objects.create(name="Cliente", code="CL-RND")
+        branch = Branch.objects.create(client=client, name="Sucursal")
+        self.area = Area.objects.create(branch=branch, name="Área")
+        self.visit = Visit.objects.create(
+            area=self.area,
+            status=Visit.Status.COMPLETED,
+            started_at=timezone.now(),
+            completed_at=timezone.now(),
+            visit_report={"comments": "Todo en orden", "responsible_name": "Ana"},
+        )
+        self.public_token = signing.dumps({"visit_id": self.visit.id}, salt="visit-report-public-link")
+
+    def test_pdf_is_rendered_from_snapshot_without_database_access(self):
+        snapshot = views._build_visit_report_snapshot(self.visit)
+
+        with self.assertNumQueries(0):
+            pdf_bytes = views._render_visit_pdf(snapshot)
+
+        self.assertTrue(pdf_bytes.startswith(b"%PDF"))
+
+    def test_page_chrome_is_defined_once_per_document(self):
+        snapshot = views._build_visit_report_snapshot(self.visit)
+        snapshot["dispensers"] = [
+            {
+                "id": index,
+                "identifier": f"D-{index:03}",
+                "model": "Modelo",
+                "products": [{"product": "Producto", "nozzle": "Boquilla"}] * 3,
+                "comment": "Comentario de prueba " * 20,
+                "photos": [],
+            }
+            for index in range(80)
+        ]
+
+        pdf_bytes = views._render_visit_pdf(snapshot)
+
+        self.assertGreaterEqual(pdf_bytes.count(b"/Type /Page\n"), 20)
+        self.assertIn(b"/FormXob.trustPageBackground", pdf_bytes)
+        # Fondo, pie y logo: un XObject cada uno, no uno por página.
+        self.assertLessEqual(pdf_bytes.count(b"/Subtype /Form"), 3)
+
+    def test_process_pool_renders_snapshot(self):
+        renderer = report_renderer.ReportRenderer(workers=1, timeout=120)
+        self.addCleanup(renderer.close)
+
+        pdf_bytes = renderer.render("visit", views._build_visit_report_snapshot(self.visit))
+
+        self.assertTrue(pdf_bytes.startswith(b"%PDF"))
+
+    def test_timed_out_render_kills_worker_and_frees_its_slot(self):
+        renderer = report_renderer.ReportRenderer(workers=1, max_pending=0, timeout=3)
+        renderer.target = _never_finishing_render
+        self.addCleanup(renderer.close)
+        snapshot = views._build_visit_report_snapshot(self.visit)
+
+        with self.assertRaises(report_renderer.RendererBusy):
+            renderer.render("visit", snapshot)
+
+        self.assertIsNone(renderer._pool)
+        pid = int((Path(settings.MEDIA_ROOT) / "render.pid").read_text())
+        with self.assertRaises(ProcessLookupError):
+            os.kill(pid, 0)
+        self.assertTrue(renderer._slots.acquire(blocking=False))
+        renderer._slots.release()
+        with self.assertRaises(report_renderer.RendererBusy):
+            renderer.render("visit", snapshot)
+        self.assertTrue(renderer._slots.acquire(blocking=False))
+
+    def test_saturated_renderer_returns_503_with_retry_after(self):
+        renderer = report_renderer.ReportRenderer(workers=0, max_pending=0, timeout=20)
+        renderer._slots.acquire()
+
+        with patch("core.views.report_renderer.get_renderer", return_value=renderer):
+            response = self.client.get(f"/api/visits/report/public/{self.public_token}.pdf")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+        self.assertFalse(ReportArtifact.objects.exists())
+
+    def test_background_callers_wait_for_a_free_slot(self):
+        renderer = report_renderer.ReportRenderer(workers=0, max_pending=0, timeout=0.1)
+        renderer._slots.acquire()
+
+        started = time.monotonic()
+        with self.assertRaises(report_renderer.RendererBusy):
+            renderer.render("visit", views._build_visit_report_snapshot(self.visit))
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+
+
+class ReportBenchmarkCommandTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output = Path(directory.name) / "baseline.json"
+
+    def _run(self, **options):
+        stdout = StringIO()
+        call_command(
+            "benchmark_reports",
+            dispensers=2,
+            photos=0,
+            questions=3,
+            text_length=60,
+            repeat=1,
+            stdout=stdout,
+            **options,
+        )
+        return stdout.getvalue()
+
+    def test_writes_baseline_for_every_builder_without_leaving_data(self):
+        self._run(output=str(self.output))
+
+        baseline = json.loads(self.output.read_text())
+        self.assertEqual(baseline["scenario"], {"dispensers": 2, "photos": 0, "questions": 3, "text_length": 60})
+        self.assertEqual(set(baseline["results"]), {"visit_pdf", "audit_pdf", "visit_html", "audit_html"})
+        for metrics in baseline["results"].values():
+            self.assertGreater(metrics["bytes"], 0)
+            self.assertGreater(metrics["peak_kib"], 0)
+        self.assertFalse(Visit.objects.exists())
+        self.assertFalse(Audit.objects.exists())
+
+    def test_compare_fails_when_a_metric_regresses_past_the_limit(self):
+        baseline = {
+            "scenario": {"dispensers": 2, "photos": 0, "questions": 3, "text_length": 60},
+            "results": {"visit_pdf": {"wall_ms": 0.01, "peak_kib": 1, "bytes": 1}},
+        }
+        self.output.write_text(json.dumps(baseline))
+
+        with self.assertRaisesMessage(CommandError, "visit_pdf.bytes"):
+            self._run(compare=str(self.output), max_regression=10)
+
+
 class BranchApiTests(TestCase):
     def setUp(self):
         self.client_entity = Client.objects.create(name="Cliente Uno", code="CLI-01")
@@ -1164,6 +3180,7 @@ class IncidentPermissionsTests(TestCase):
         self.assertIsNone(response.json()["inspector_id"])
 
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class AuditApiTests(TestCase):
     def setUp(self):
         self.client_entity = Client.objects.create(name="Cliente Audit", code="CL-AUD")
@@ -13,6 +13,7 @@ from .views import (
     branch_detail,
     client_detail,
     clients,
+    compliance_trend,
     dashboard,
     dispensers,
     dispenser_detail,
@@ -24,10 +25,15 @@ from .views import (
     csrf_token,
     login,
     notifications,
+    notifications_mark_read,
+    notifications_stream,
+    notifications_stream_token,
+    notifications_unread_count,
     nozzles,
     products,
     product_detail,
     register_fcm_token,
+    sync,
     user_detail,
     users,
     visits,
@@ -47,6 +53,7 @@ urlpatterns = [
     path("csrf/", csrf_token, name="csrf_token"),
     path("login/", login, name="login"),
     path("dashboard/", dashboard, name="dashboard"),
+    path("analytics/compliance-trend/", compliance_trend, name="compliance_trend"),
     path("clients/", clients, name="clients"),
     path("clients/<int:client_id>/", client_detail, name="client_detail"),
     path("branches/", branches, name="branches"),
@@ -79,9 +86,14 @@ urlpatterns = [
     path("visits/report/public/<str:token>.pdf", visit_report_public_pdf, name="visit_report_public_pdf"),
     path("incidents/", incidents, name="incidents"),
     path("notifications/", notifications, name="notifications"),
+    path("notifications/unread-count/", notifications_unread_count, name="notifications_unread_count"),
+    path("notifications/read/", notifications_mark_read, name="notifications_mark_read"),
+    path("notifications/stream/", notifications_stream, name="notifications_stream"),
+    path("notifications/stream/token/", notifications_stream_token, name="notifications_stream_token"),
     path("register-fcm/", register_fcm_token, name="register_fcm_token"),
     path("incidents/<int:incident_id>/", incident_detail, name="incident_detail"),
     path("incidents/<int:incident_id>/schedule-visit/", incident_schedule_visit, name="incident_schedule_visit"),
+    path("sync/", sync, name="sync"),
     path("users/", users, name="users"),
     path("users/<int:user_id>/", user_detail, name="user_detail"),
 ]
@@ -1,31 +1,44 @@
+import asyncio
 import base64
+import hashlib
 import json
 import logging
 import re
 import textwrap
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from functools import lru_cache
 from django.db import IntegrityError, transaction
 from django.db.models.deletion import ProtectedError
-from django.db.models import Q
-from datetime import datetime, timedelta
+from django.db.models import Case, Count, F, IntegerField, Max, Min, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, TruncDate
+from datetime import date, datetime, timedelta
 from io import BytesIO
 from pathlib import Path
-from typing import Any
-from urllib.parse import urlencode
+from typing import Any, Callable, Iterable, Iterator
+from urllib.parse import urlencode, urlsplit
 from urllib.error import URLError
 from urllib.request import Request, urlopen
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core import signing
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
 from django.core.signing import BadSignature, SignatureExpired
 from django.core.files.storage import default_storage
 from django.middleware.csrf import get_token
-from django.http import HttpResponse, JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.query import QuerySet
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.http.multipartparser import MultiPartParser, MultiPartParserError
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.csrf import ensure_csrf_cookie
-from django.views.decorators.http import require_GET, require_http_methods
+from django.views.decorators.http import condition, require_GET, require_http_methods
+from django.views.decorators.vary import vary_on_headers
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import LETTER
@@ -34,113 +47,34 @@ from reportlab.graphics import renderPDF
 from reportlab.graphics.barcode import qr
 from reportlab.graphics.shapes import Drawing
 from reportlab.pdfgen import canvas
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 
+from . import catalog, compliance, events, media_derivatives, report_artifacts, report_fonts, report_images, report_jobs, report_renderer
+from .access import CURRENT_USER_EMAIL_HEADER, get_request_principal, scope_lookup_values
 from .fcm_manager import send_push_notification_to_devices
-from .models import Area, Audit, AuditForm, AuditMedia, Branch, Client, DeepSeekAPISettings, Dispenser, DispenserModel, DispenserProductAssignment, FCMDevice, Incident, IncidentMedia, Nozzle, Product, User, Visit, VisitMedia
+from .models import Area, Audit, AuditForm, AuditMedia, Branch, Client, DeepSeekAPISettings, DeletedRecord, Dispenser, DispenserModel, DispenserProductAssignment, FCMDevice, Incident, IncidentMedia, Notification, Nozzle, Product, ReportArtifact, ReportRenderJob, User, Visit, VisitMedia
 from .report_templates import build_audit_report_html, build_visit_report_html
 
 
-try:
-    from svglib.svglib import svg2rlg
-except Exception:  # pragma: no cover - optional dependency
-    svg2rlg = None
-
-
 REPORT_FONT = "Helvetica"
 REPORT_FONT_BOLD = "Helvetica-Bold"
 REPORT_FONT_ITALIC = "Helvetica-Oblique"
 REPORT_PUBLIC_LINK_SALT = "visit-report-public-link"
 REPORT_PUBLIC_LINK_MAX_AGE_SECONDS = 60 * 60 * 24 * 30
 REPORT_PAGE_PADDING = 36
+# Las fotos de un informe se cargan en paralelo; las que no llegan a tiempo salen como recuadro.
+REPORT_PHOTO_WORKERS = 6
+REPORT_PHOTO_BUDGET_SECONDS = 8.0
 REPORT_CARD_RADIUS = 14
-REPORT_AUDIT_LOGO_URLS = [
-    "https://trust.supplymax.net/trust_logo_s.png",
-    "https://trust.supplymax.net/trust_logo_s.svg",
-]
-REPORT_LOGO_PATHS = [
-    Path(__file__).resolve().parents[2] / "frontend/public/trust_logo_s.png",
-    Path(__file__).resolve().parents[2] / "frontend/public/trust_logo_s.svg",
-    Path(__file__).resolve().parents[2] / "frontend/public/trust_logo.svg",
-]
 N8N_VISIT_WEBHOOK_URL = "https://n8n.circlesuite.net/webhook/4fb6a143-135c-4577-81f0-088464808c30"
 N8N_INCIDENT_WEBHOOK_URL = "https://n8n.circlesuite.net/webhook/8af08811-33a1-45fd-b335-b21e1c42ba16"
 N8N_AUDIT_WEBHOOK_URL = "https://n8n.circlesuite.net/webhook/014ddff5-f214-4387-a85c-ab9de445b0f4"
 logger = logging.getLogger(__name__)
 
 
-@lru_cache(maxsize=1)
 def _initialize_report_fonts():
     global REPORT_FONT, REPORT_FONT_BOLD, REPORT_FONT_ITALIC
-    font_candidates = [
-        (
-            "Poppins",
-            "Poppins-Bold",
-            "Poppins-Italic",
-            Path("/usr/share/fonts/truetype/poppins/Poppins-Regular.ttf"),
-            Path("/usr/share/fonts/truetype/poppins/Poppins-Bold.ttf"),
-            Path("/usr/share/fonts/truetype/poppins/Poppins-Italic.ttf"),
-        ),
-        (
-            "Poppins",
-            "Poppins-Bold",
-            "Poppins-Italic",
-            Path("/usr/share/fonts/poppins/Poppins-Regular.ttf"),
-            Path("/usr/share/fonts/poppins/Poppins-Bold.ttf"),
-            Path("/usr/share/fonts/poppins/Poppins-Italic.ttf"),
-        ),
-        ("TrustSans", "TrustSans-Bold", "TrustSans-Italic", Path("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"), Path("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"), Path("/usr/share/fonts/truetype/dejavu/DejaVuSans-Oblique.ttf")),
-        ("TrustSans", "TrustSans-Bold", "TrustSans-Italic", Path("/usr/share/fonts/dejavu/DejaVuSans.ttf"), Path("/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf"), Path("/usr/share/fonts/dejavu/DejaVuSans-Oblique.ttf")),
-    ]
+    REPORT_FONT, REPORT_FONT_BOLD, REPORT_FONT_ITALIC = report_fonts.register_report_fonts()
 
-    remote_font_dir = Path("/tmp/trust-report-fonts")
-    remote_font_dir.mkdir(parents=True, exist_ok=True)
-    remote_font_urls = {
-        "Poppins-Regular": "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Regular.ttf",
-        "Poppins-Bold": "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Bold.ttf",
-        "Poppins-Italic": "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Italic.ttf",
-    }
-    remote_font_paths: dict[str, Path] = {}
-    for font_name, font_url in remote_font_urls.items():
-        font_path = remote_font_dir / f"{font_name}.ttf"
-        if not font_path.exists():
-            try:
-                request = Request(font_url, headers={"User-Agent": "trust-report-generator/1.0"})
-                with urlopen(request, timeout=10) as response:
-                    payload = response.read()
-                    if payload:
-                        font_path.write_bytes(payload)
-            except Exception:
-                continue
-        if font_path.exists():
-            remote_font_paths[font_name] = font_path
-
-    if all(name in remote_font_paths for name in ("Poppins-Regular", "Poppins-Bold", "Poppins-Italic")):
-        font_candidates.insert(
-            0,
-            (
-                "Poppins",
-                "Poppins-Bold",
-                "Poppins-Italic",
-                remote_font_paths["Poppins-Regular"],
-                remote_font_paths["Poppins-Bold"],
-                remote_font_paths["Poppins-Italic"],
-            ),
-        )
-    for regular_name, bold_name, italic_name, regular_path, bold_path, italic_path in font_candidates:
-        if not (regular_path.exists() and bold_path.exists() and italic_path.exists()):
-            continue
-        try:
-            pdfmetrics.registerFont(TTFont(regular_name, str(regular_path)))
-            pdfmetrics.registerFont(TTFont(bold_name, str(bold_path)))
-            pdfmetrics.registerFont(TTFont(italic_name, str(italic_path)))
-            REPORT_FONT = regular_name
-            REPORT_FONT_BOLD = bold_name
-            REPORT_FONT_ITALIC = italic_name
-            return
-        except Exception:
-            continue
 
 def _serialize_user(user: User) -> dict:
     full_name = user.get_full_name().strip()
@@ -159,18 +93,12 @@ def _serialize_user(user: User) -> dict:
     }
 
 
-def _is_general_admin(request) -> bool:
-    current_email = str(request.headers.get("X-Current-User-Email") or "").strip().lower()
-    if not current_email:
-        return False
-    return User.objects.filter(email__iexact=current_email, role=User.Role.GENERAL_ADMIN).exists()
+def _get_current_user(request):
+    return get_request_principal(request).user
 
 
-def _get_current_user(request):
-    current_email = str(request.headers.get("X-Current-User-Email") or "").strip().lower()
-    if not current_email:
-        return None
-    return User.objects.filter(email__iexact=current_email, is_active=True).first()
+def _is_general_admin(request) -> bool:
+    return _is_general_admin_user(_get_current_user(request))
 
 
 def _is_general_admin_user(user: User | None) -> bool:
@@ -191,50 +119,8 @@ def _can_schedule_visit_from_incident(user: User | None, _incident: Incident) ->
     return user.role in {User.Role.GENERAL_ADMIN, User.Role.INSPECTOR}
 
 
-def _build_access_scope(current_user: User | None) -> dict[str, list[int]] | None:
-    if not current_user or current_user.role == User.Role.GENERAL_ADMIN:
-        return None
-
-    if current_user.role == User.Role.INSPECTOR:
-        return None
-
-    role_assignments = {
-        User.Role.ACCOUNT_ADMIN: {
-            "clients": set(current_user.clients.values_list("id", flat=True)),
-            "branches": set(),
-            "areas": set(),
-        },
-        User.Role.BRANCH_ADMIN: {
-            "clients": set(),
-            "branches": set(current_user.branches.values_list("id", flat=True)),
-            "areas": set(),
-        },
-    }
-    assignments = role_assignments.get(current_user.role, {"clients": set(), "branches": set(), "areas": set()})
-
-    clients = set(assignments["clients"])
-    branches = set(assignments["branches"])
-    areas = set(assignments["areas"])
-
-    if clients:
-        branches.update(Branch.objects.filter(client_id__in=clients).values_list("id", flat=True))
-    if branches:
-        areas.update(Area.objects.filter(branch_id__in=branches).values_list("id", flat=True))
-
-    if areas:
-        branches.update(Area.objects.filter(id__in=areas).values_list("branch_id", flat=True))
-    if branches:
-        clients.update(Branch.objects.filter(id__in=branches).values_list("client_id", flat=True))
-
-    return {
-        "client_ids": sorted(clients),
-        "branch_ids": sorted(branches),
-        "area_ids": sorted(areas),
-    }
-
-
 def _get_access_scope(request):
-    return _build_access_scope(_get_current_user(request))
+    return get_request_principal(request).scope
 
 
 def _filter_queryset_by_scope(queryset, scope, *, client_lookup=None, branch_lookup=None, area_lookup=None):
@@ -242,14 +128,171 @@ def _filter_queryset_by_scope(queryset, scope, *, client_lookup=None, branch_loo
         return queryset
 
     if area_lookup is not None:
-        return queryset.filter(**{f"{area_lookup}__in": scope["area_ids"]})
+        return queryset.filter(**{f"{area_lookup}__in": scope_lookup_values(scope, "area_ids")})
     if branch_lookup is not None:
-        return queryset.filter(**{f"{branch_lookup}__in": scope["branch_ids"]})
+        return queryset.filter(**{f"{branch_lookup}__in": scope_lookup_values(scope, "branch_ids")})
     if client_lookup is not None:
-        return queryset.filter(**{f"{client_lookup}__in": scope["client_ids"]})
+        return queryset.filter(**{f"{client_lookup}__in": scope_lookup_values(scope, "client_ids")})
     return queryset.none()
 
 
+LIST_CURSOR_SALT = "core.list-cursor"
+
+
+def _get_list_page_params(request):
+    """Devuelve ``(page, error)``; ``page`` es None cuando se sirve la lista completa."""
+    cursor_token = (request.GET.get("cursor") or "").strip()
+    page_size_input = (request.GET.get("page_size") or "").strip()
+    legacy_enabled = getattr(settings, "API_LEGACY_UNPAGINATED_LISTS", True)
+    if legacy_enabled and not cursor_token and not page_size_input:
+        return None, None
+
+    max_page_size = int(getattr(settings, "API_LIST_MAX_PAGE_SIZE", 200))
+    page_size = int(getattr(settings, "API_LIST_DEFAULT_PAGE_SIZE", 50))
+    if page_size_input:
+        try:
+            page_size = int(page_size_input)
+        except ValueError:
+            return None, "El parámetro page_size debe ser un número entero."
+        if page_size < 1:
+            return None, "El parámetro page_size debe ser mayor que cero."
+    page_size = min(page_size, max_page_size)
+
+    cursor = None
+    if cursor_token:
+        try:
+            cursor = signing.loads(cursor_token, salt=LIST_CURSOR_SALT)
+            cursor["id"] = int(cursor["id"])
+            if cursor.get("value") is not None:
+                cursor["value"] = datetime.fromisoformat(cursor["value"])
+        except (BadSignature, KeyError, TypeError, ValueError):
+            return None, "Cursor inválido."
+
+    return {"page_size": page_size, "cursor": cursor}, None
+
+
+def _paginate_queryset(queryset, page, *, order_field=None):
+    """Paginación por clave (``order_field`` descendente con ``id`` como desempate).
+
+    Sin ``order_field`` se recorre por ``id`` ascendente. Devuelve la página de
+    objetos y el cursor opaco de la siguiente, o None si no hay más resultados.
+    """
+    cursor = page["cursor"]
+    if order_field is None:
+        queryset = queryset.order_by("id")
+        if cursor:
+            queryset = queryset.filter(id__gt=cursor["id"])
+    else:
+        queryset = queryset.order_by(f"-{order_field}", "-id")
+        if cursor:
+            value = cursor.get("value")
+            if value is None:
+                return [], None
+            queryset = queryset.filter(
+                Q(**{f"{order_field}__lt": value})
+                | Q(**{order_field: value, "id__lt": cursor["id"]})
+            )
+
+    page_size = page["page_size"]
+    items = list(queryset[: page_size + 1])
+    if len(items) <= page_size:
+        return items, None
+
+    items = items[:page_size]
+    last = items[-1]
+    payload = {"id": last.id}
+    if order_field is not None:
+        payload["value"] = getattr(last, order_field).isoformat()
+    return items, signing.dumps(payload, salt=LIST_CURSOR_SALT)
+
+
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+def _should_stream_list(request) -> bool:
+    stream = (request.GET.get("stream") or "").strip().lower()
+    if stream:
+        return stream in {"1", "true", "yes"}
+    return bool(getattr(settings, "API_STREAM_LIST_RESPONSES", False))
+
+
+def _iter_json_list(payloads: Iterable[dict], extra: dict[str, Any]) -> Iterator[bytes]:
+    """Escribe ``{"results": [...], **extra}`` con los mismos bytes que ``JsonResponse``."""
+    buffer = ['{"results": [']
+    size = 0
+    for index, payload in enumerate(payloads):
+        chunk = json.dumps(payload, cls=DjangoJSONEncoder)
+        buffer.append(f", {chunk}" if index else chunk)
+        size += len(chunk)
+        if size >= STREAM_BUFFER_SIZE:
+            yield "".join(buffer).encode()
+            buffer = []
+            size = 0
+    buffer.append("]")
+    for key, value in extra.items():
+        buffer.append(f", {json.dumps(key)}: {json.dumps(value, cls=DjangoJSONEncoder)}")
+    buffer.append("}")
+    yield "".join(buffer).encode()
+
+
+def _list_response(request, rows, serialize_rows, extra: dict[str, Any] | None = None):
+    """Respuesta ``{"results": [...]}`` de un listado, en streaming si el cliente lo pide.
+
+    ``serialize_rows`` recibe las filas y devuelve un iterable de dicts. En streaming
+    los querysets se recorren con ``iterator()`` para no retener todas las instancias.
+    """
+    extra = extra or {}
+    if not _should_stream_list(request):
+        return JsonResponse({"results": list(serialize_rows(rows)), **extra})
+
+    if isinstance(rows, QuerySet):
+        rows = rows.iterator(chunk_size=int(getattr(settings, "API_STREAM_CHUNK_SIZE", 500)))
+    return StreamingHttpResponse(
+        _iter_json_list(serialize_rows(rows), extra),
+        content_type="application/json",
+    )
+
+
+def _get_list_versions(request, table_keys: tuple[str, ...]):
+    versions = getattr(request, "_list_versions", None)
+    if versions is None:
+        keys = list(table_keys)
+        scope = _get_access_scope(request)
+        if scope is not None:
+            keys.append(catalog.scope_key(scope["user_id"]))
+        versions = catalog.get_versions(keys)
+        request._list_versions = versions
+    return versions
+
+
+def _conditional_list(*models):
+    """ETag y Last-Modified para listados GET que solo cambian cuando cambian ``models``.
+
+    Las versiones por tabla y por alcance de usuario se actualizan desde señales, así
+    que una petición condicional sin cambios responde 304 sin serializar nada.
+    """
+    table_keys = tuple(catalog.table_key(model) for model in models)
+
+    def etag(request, *args, **kwargs):
+        if request.method != "GET":
+            return None
+        versions = _get_list_versions(request, table_keys)
+        digest = hashlib.sha256(request.get_full_path().encode())
+        for key in sorted(versions):
+            digest.update(f"|{key}={versions[key][0]}".encode())
+        return digest.hexdigest()[:40]
+
+    def last_modified(request, *args, **kwargs):
+        if request.method != "GET":
+            return None
+        return max(updated_at for _, updated_at in _get_list_versions(request, table_keys).values())
+
+    def decorator(view):
+        view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+        return vary_on_headers(CURRENT_USER_EMAIL_HEADER)(view)
+
+    return decorator
+
 
 def _extract_user_data(request):
     if request.content_type and request.content_type.startswith("multipart/form-data"):
@@ -328,23 +371,74 @@ def _collect_related_area_users(area: Area) -> list[dict[str, Any]]:
     return payload
 
 
+def _fan_out_notifications(
+    user_ids: list[int],
+    *,
+    area: Area,
+    title: str,
+    body: str,
+    data: dict[str, str] | None,
+) -> int:
+    """Guarda el aviso en la bandeja de cada destinatario del push y de los administradores generales."""
+    event = str((data or {}).get("event") or "")
+    kind = event.split("_", 1)[0]
+    if kind not in Notification.Kind.values:
+        return 0
+
+    recipient_ids = set(user_ids)
+    recipient_ids.update(
+        User.objects.filter(role=User.Role.GENERAL_ADMIN, is_active=True).values_list("id", flat=True)
+    )
+    now = timezone.now()
+    Notification.objects.bulk_create(
+        Notification(
+            user_id=user_id,
+            kind=kind,
+            event=event,
+            object_id=int(data[f"{kind}_id"]),
+            area=area,
+            title=title,
+            message=body,
+            created_at=now,
+        )
+        for user_id in sorted(recipient_ids)
+    )
+    if event in events.STREAM_EVENTS:
+        stream_data = {
+            "type": kind,
+            "object_id": int(data[f"{kind}_id"]),
+            "area_id": area.id,
+            "branch_id": area.branch_id,
+            "client_id": area.branch.client_id,
+            "title": title,
+            "message": body,
+            "created_at": now.isoformat(),
+        }
+        transaction.on_commit(lambda: events.get_broker().publish(event, stream_data, recipient_ids))
+    return len(recipient_ids)
+
+
 def _send_area_push_notification(
     *,
     area: Area,
     title: str,
     body: str,
     data: dict[str, str] | None = None,
+    inspector_id: int | None = None,
 ) -> int:
+    # El inspector asignado recibe el aviso aunque no tenga el área entre las suyas.
     related_user_ids = list(
         User.objects.filter(
             Q(areas=area)
             | Q(branches=area.branch)
             | Q(clients=area.branch.client)
+            | Q(id=inspector_id)
         )
         .filter(is_active=True)
         .values_list("id", flat=True)
         .distinct()
     )
+    _fan_out_notifications(related_user_ids, area=area, title=title, body=body, data=data)
     if not related_user_ids:
         return 0
 
@@ -515,7 +609,7 @@ def _process_visit_completed_email(visit_id):
             logger.warning("Gmail API is not configured or disabled.")
             return
 
-        pdf_bytes = _build_visit_pdf(visit)
+        pdf_bytes = _read_report_artifact(_get_visit_report_artifact(visit))
         branch_name_safe = visit.area.branch.name.replace(" ", "_")
         area_name_safe = visit.area.name.replace(" ", "_")
         pdf_filename = f"Visita_{branch_name_safe}_{area_name_safe}_{timezone.localtime(visit.completed_at):%Y%m%d}.pdf"
@@ -557,7 +651,7 @@ def _process_audit_completed_email(audit_id):
             logger.warning("Gmail API is not configured or disabled.")
             return
 
-        pdf_bytes = _build_audit_pdf(audit)
+        pdf_bytes = _read_report_artifact(_get_audit_report_artifact(audit))
         branch_name_safe = audit.area.branch.name.replace(" ", "_")
         area_name_safe = audit.area.name.replace(" ", "_")
         pdf_filename = f"Auditoria_{branch_name_safe}_{area_name_safe}_{timezone.localtime(audit.completed_at):%Y%m%d}.pdf"
@@ -699,8 +793,42 @@ def _serialize_area(area: Area) -> dict:
     }
 
 
-def _get_available_nozzles():
-    return Nozzle.objects.all()
+def _get_nozzle_catalog() -> list[dict]:
+    return catalog.get_cached_catalog(
+        catalog.NOZZLES,
+        lambda: [_serialize_nozzle(nozzle) for nozzle in Nozzle.objects.all()],
+    )
+
+
+def _get_dispenser_model_catalog() -> list[dict]:
+    return catalog.get_cached_catalog(
+        catalog.DISPENSER_MODELS,
+        lambda: [_serialize_dispenser_model(model) for model in DispenserModel.objects.all()],
+    )
+
+
+def _get_product_catalog() -> dict[int, dict]:
+    return catalog.get_cached_catalog(
+        catalog.PRODUCTS,
+        lambda: {
+            product.id: {
+                "id": product.id,
+                "name": product.name,
+                "photo": product.photo.url if product.photo else None,
+            }
+            for product in Product.objects.all()
+        },
+    )
+
+
+def _get_audit_form_catalog() -> list[dict]:
+    return catalog.get_cached_catalog(
+        catalog.AUDIT_FORMS,
+        lambda: [
+            _serialize_audit_form(form)
+            for form in AuditForm.objects.annotate(annotated_areas_count=Count("areas_using_template"))
+        ],
+    )
 
 
 def _serialize_nozzle(nozzle: Nozzle) -> dict:
@@ -715,12 +843,42 @@ def _serialize_nozzle(nozzle: Nozzle) -> dict:
     }
 
 
-def _serialize_dispenser(dispenser: Dispenser) -> dict:
-    assignment_by_product_id = {
-        assignment.product_id: assignment
-        for assignment in dispenser.product_assignments.select_related("nozzle").all()
-    }
-    return {
+def _get_dispenser_catalogs() -> tuple[dict[int, dict], list[dict], dict[int, dict]]:
+    """Productos por id, boquillas y boquillas por id; una lectura por respuesta, no por fila."""
+    nozzles = _get_nozzle_catalog()
+    return _get_product_catalog(), nozzles, {nozzle["id"]: nozzle for nozzle in nozzles}
+
+
+def _serialize_dispenser(
+    dispenser: Dispenser,
+    *,
+    include_available_nozzles: bool = True,
+    catalogs: tuple[dict[int, dict], list[dict], dict[int, dict]] | None = None,
+) -> dict:
+    """Los productos y boquillas se resuelven contra los catálogos en caché.
+
+    En listados se omite ``available_nozzles``: la vista lo envía una sola vez en el
+    bloque ``catalog`` de la respuesta. Los productos, en cambio, siguen dentro de cada
+    fila: son propios de cada dispensador y la web y las versiones publicadas de la app
+    leen su nombre y foto de ahí. Los listados pasan ``catalogs`` ya resueltos (ver
+    ``_serialize_dispensers``) para no consultar las versiones en cada fila.
+    """
+    products_by_id, nozzles, nozzles_by_id = catalogs or _get_dispenser_catalogs()
+    products = []
+    for assignment in dispenser.product_assignments.all():
+        product = products_by_id.get(assignment.product_id)
+        if product is None:
+            continue
+        nozzle = nozzles_by_id.get(assignment.nozzle_id)
+        products.append(
+            {
+                **product,
+                "nozzle": {"id": nozzle["id"], "name": nozzle["name"]} if nozzle else None,
+            }
+        )
+    products.sort(key=lambda item: (item["name"], item["id"]))
+
+    payload = {
         "id": dispenser.id,
         "identifier": dispenser.identifier,
         "installed_at": dispenser.installed_at.isoformat()
@@ -738,26 +896,18 @@ def _serialize_dispenser(dispenser: Dispenser) -> dict:
         }
         if dispenser.area
         else None,
-        "products": [
-            {
-                "id": product.id,
-                "name": product.name,
-                "photo": product.photo.url if product.photo else None,
-                "nozzle": {
-                    "id": assignment_by_product_id[product.id].nozzle_id,
-                    "name": assignment_by_product_id[product.id].nozzle.name,
-                }
-                if product.id in assignment_by_product_id and assignment_by_product_id[product.id].nozzle
-                else None,
-            }
-            for product in dispenser.products.all()
-        ],
-        "available_nozzles": [
-            _serialize_nozzle(nozzle)
-            for nozzle in _get_available_nozzles()
-        ],
+        "products": products,
         "is_active": dispenser.is_active,
     }
+    if include_available_nozzles:
+        payload["available_nozzles"] = nozzles
+    return payload
+
+
+def _serialize_dispensers(rows) -> Iterator[dict]:
+    catalogs = _get_dispenser_catalogs()
+    for dispenser in rows:
+        yield _serialize_dispenser(dispenser, include_available_nozzles=False, catalogs=catalogs)
 
 
 def _serialize_dispenser_model(model: DispenserModel) -> dict:
@@ -851,22 +1001,21 @@ def _extract_dispenser_product_assignments(data):
 
 def _apply_dispenser_product_assignments(dispenser: Dispenser, assignments_data):
     product_ids = [item["product_id"] for item in assignments_data]
-    products = Product.objects.filter(id__in=product_ids)
-    products_by_id = {product.id: product for product in products}
-    if len(products_by_id) != len(product_ids):
+    products_by_id = _get_product_catalog()
+    if any(product_id not in products_by_id for product_id in product_ids):
         return JsonResponse({"error": "Uno o más productos seleccionados no existen."}, status=404)
 
-    nozzle_ids = [item["nozzle_id"] for item in assignments_data if item["nozzle_id"] is not None]
-    nozzles = Nozzle.objects.filter(id__in=nozzle_ids)
-    nozzles_by_id = {nozzle.id: nozzle for nozzle in nozzles}
-    if len(nozzles_by_id) != len(set(nozzle_ids)):
-        return JsonResponse({"error": "Una o más boquillas seleccionadas no existen."}, status=404)
-
-    allowed_nozzles = set(_get_available_nozzles().values_list("id", flat=True))
-    for item in assignments_data:
-        nozzle_id = item["nozzle_id"]
-        if nozzle_id is not None and nozzle_id not in allowed_nozzles:
-            return JsonResponse({"error": "La boquilla seleccionada no está disponible."}, status=400)
+    available_nozzle_ids = {nozzle["id"] for nozzle in _get_nozzle_catalog()}
+    unavailable_nozzle_ids = {
+        item["nozzle_id"]
+        for item in assignments_data
+        if item["nozzle_id"] is not None and item["nozzle_id"] not in available_nozzle_ids
+    }
+    if unavailable_nozzle_ids:
+        # Solo en el caso de error se consulta la tabla para distinguir inexistente de no disponible.
+        if Nozzle.objects.filter(id__in=unavailable_nozzle_ids).count() != len(unavailable_nozzle_ids):
+            return JsonResponse({"error": "Una o más boquillas seleccionadas no existen."}, status=404)
+        return JsonResponse({"error": "La boquilla seleccionada no está disponible."}, status=400)
 
     DispenserProductAssignment.objects.filter(dispenser=dispenser).exclude(
         product_id__in=product_ids
@@ -874,8 +1023,8 @@ def _apply_dispenser_product_assignments(dispenser: Dispenser, assignments_data)
     for item in assignments_data:
         DispenserProductAssignment.objects.update_or_create(
             dispenser=dispenser,
-            product=products_by_id[item["product_id"]],
-            defaults={"nozzle": nozzles_by_id.get(item["nozzle_id"])},
+            product_id=item["product_id"],
+            defaults={"nozzle_id": item["nozzle_id"]},
         )
     return None
 
@@ -926,119 +1075,297 @@ def _normalize_visit_type(raw_visit_type: Any) -> str:
     return Visit.VisitType.TECHNICAL
 
 
-def _serialize_visit(visit: Visit) -> dict:
-    inspector = "Sin asignar"
-    inspector_id = None
-    if visit.inspector:
-        inspector = visit.inspector.get_full_name() or visit.inspector.username
-        inspector_id = visit.inspector_id
-    dispenser_reports = _normalize_dispenser_report_entries(visit)
-    status = visit.status
-    status_label = visit.get_status_display()
-    if status == Visit.Status.SCHEDULED and visit.visited_at < timezone.now():
-        status = "overdue"
-        status_label = "Vencida"
+def _list_field(getter, *, only=(), select_related=(), prefetch=(), annotate=None) -> dict[str, Any]:
+    """Describe un campo de listado y lo que hay que cargar de la base de datos para emitirlo."""
+    return {
+        "getter": getter,
+        "only": only,
+        "select_related": select_related,
+        "prefetch": prefetch,
+        "annotate": annotate or {},
+    }
+
+
+def _serialize_inspector_name(inspector: User | None) -> str:
+    if not inspector:
+        return "Sin asignar"
+    return inspector.get_full_name() or inspector.username
+
+
+def _serialize_media_list(media) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": medium.id,
+            "type": medium.media_type,
+            "file": medium.file.url if medium.file else None,
+            "thumbnail": medium.thumbnail.url if medium.thumbnail else None,
+            "report_image": medium.report_image.url if medium.report_image else None,
+        }
+        for medium in media
+    ]
+
+
+def _report_photo_reference(medium) -> str:
+    """Ruta de la foto para informes: el derivado reducido si existe, si no el original."""
+    return str(medium.report_image or medium.file).strip()
+
 
+def _scheduled_status(instance, scheduled_at, now) -> tuple[str, str]:
+    if instance.status == instance.Status.SCHEDULED and scheduled_at < now:
+        return "overdue", "Vencida"
+    return instance.status, instance.get_status_display()
+
+
+def _area_dispensers_count_subquery():
+    totals = (
+        Dispenser.objects.filter(area=OuterRef("area_id"))
+        .order_by()
+        .values("area")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(totals, output_field=IntegerField()), Value(0))
+
+
+def _report_job_status_subquery(kind: str):
+    jobs = ReportRenderJob.objects.filter(kind=kind, object_id=OuterRef("pk")).values("status")[:1]
+    return Subquery(jobs)
+
+
+def _report_status_field(kind: str) -> dict[str, Any]:
+    """Estado del prerenderizado del PDF; None si nunca se encoló."""
+
+    def getter(obj, now):
+        if hasattr(obj, "report_job_status"):
+            return obj.report_job_status
+        return ReportRenderJob.objects.filter(kind=kind, object_id=obj.pk).values_list("status", flat=True).first()
+
+    return _list_field(getter, only=("id",), annotate=lambda: {"report_job_status": _report_job_status_subquery(kind)})
+
+
+def _get_area_dispensers_count(visit: Visit) -> int:
+    total = getattr(visit, "area_dispensers_total", None)
+    if total is not None:
+        return total
+    return visit.area.dispensers.count() if visit.area_id else 0
+
+
+_AREA_FIELDS = {
+    "client": _list_field(
+        lambda obj, now: obj.area.branch.client.name,
+        only=("area__branch__client__name",),
+        select_related=("area__branch__client",),
+    ),
+    "client_id": _list_field(
+        lambda obj, now: obj.area.branch.client_id,
+        only=("area__branch__client",),
+        select_related=("area__branch",),
+    ),
+    "branch": _list_field(
+        lambda obj, now: obj.area.branch.name,
+        only=("area__branch__name",),
+        select_related=("area__branch",),
+    ),
+    "branch_id": _list_field(lambda obj, now: obj.area.branch_id, only=("area__branch",), select_related=("area",)),
+    "area": _list_field(lambda obj, now: obj.area.name, only=("area__name",), select_related=("area",)),
+    "area_id": _list_field(lambda obj, now: obj.area_id, only=("area",)),
+}
+
+_INSPECTOR_FIELDS = {
+    "inspector": _list_field(
+        lambda obj, now: _serialize_inspector_name(obj.inspector),
+        only=("inspector__username", "inspector__first_name", "inspector__last_name"),
+        select_related=("inspector",),
+    ),
+    "inspector_id": _list_field(lambda obj, now: obj.inspector_id if obj.inspector_id else None, only=("inspector",)),
+}
+
+
+def _execution_fields() -> dict[str, dict[str, Any]]:
     return {
-        "id": visit.id,
-        "client": visit.area.branch.client.name,
-        "client_id": visit.area.branch.client_id,
-        "branch": visit.area.branch.name,
-        "branch_id": visit.area.branch_id,
-        "area": visit.area.name,
-        "area_id": visit.area_id,
-        "area_dispensers_count": visit.area.dispensers.count() if visit.area_id else 0,
-        "dispenser": visit.dispenser.identifier if visit.dispenser else None,
-        "dispenser_id": visit.dispenser_id,
-        "inspector": inspector,
-        "inspector_id": inspector_id,
-        "visited_at": visit.visited_at.isoformat(),
-        "notes": visit.notes,
-        "visit_type": visit.visit_type,
-        "visit_type_label": visit.get_visit_type_display(),
-        "status": status,
-        "status_label": status_label,
-        "started_at": visit.started_at.isoformat() if visit.started_at else None,
-        "completed_at": visit.completed_at.isoformat() if visit.completed_at else None,
-        "start_latitude": visit.start_latitude,
-        "start_longitude": visit.start_longitude,
-        "end_latitude": visit.end_latitude,
-        "end_longitude": visit.end_longitude,
-        "visit_report": visit.visit_report,
-        "dispenser_reports": dispenser_reports,
-        "media": [
-            {
-                "id": medium.id,
-                "type": medium.media_type,
-                "file": medium.file.url if medium.file else None,
-            }
-            for medium in visit.media.all()
-        ],
+        "started_at": _list_field(
+            lambda obj, now: obj.started_at.isoformat() if obj.started_at else None, only=("started_at",)
+        ),
+        "completed_at": _list_field(
+            lambda obj, now: obj.completed_at.isoformat() if obj.completed_at else None, only=("completed_at",)
+        ),
+        "start_latitude": _list_field(lambda obj, now: obj.start_latitude, only=("start_latitude",)),
+        "start_longitude": _list_field(lambda obj, now: obj.start_longitude, only=("start_longitude",)),
+        "end_latitude": _list_field(lambda obj, now: obj.end_latitude, only=("end_latitude",)),
+        "end_longitude": _list_field(lambda obj, now: obj.end_longitude, only=("end_longitude",)),
     }
 
 
+VISIT_FIELDS = {
+    "id": _list_field(lambda visit, now: visit.id, only=("id",)),
+    **_AREA_FIELDS,
+    "area_dispensers_count": _list_field(
+        lambda visit, now: _get_area_dispensers_count(visit),
+        only=("area",),
+        annotate=lambda: {"area_dispensers_total": _area_dispensers_count_subquery()},
+    ),
+    "dispenser": _list_field(
+        lambda visit, now: visit.dispenser.identifier if visit.dispenser else None,
+        only=("dispenser__identifier",),
+        select_related=("dispenser",),
+    ),
+    "dispenser_id": _list_field(lambda visit, now: visit.dispenser_id, only=("dispenser",)),
+    **_INSPECTOR_FIELDS,
+    "visited_at": _list_field(lambda visit, now: visit.visited_at.isoformat(), only=("visited_at",)),
+    "notes": _list_field(lambda visit, now: visit.notes, only=("notes",)),
+    "visit_type": _list_field(lambda visit, now: visit.visit_type, only=("visit_type",)),
+    "visit_type_label": _list_field(lambda visit, now: visit.get_visit_type_display(), only=("visit_type",)),
+    "status": _list_field(
+        lambda visit, now: _scheduled_status(visit, visit.visited_at, now)[0], only=("status", "visited_at")
+    ),
+    "status_label": _list_field(
+        lambda visit, now: _scheduled_status(visit, visit.visited_at, now)[1], only=("status", "visited_at")
+    ),
+    **_execution_fields(),
+    "visit_report": _list_field(lambda visit, now: visit.visit_report, only=("visit_report",)),
+    "dispenser_reports": _list_field(
+        lambda visit, now: _normalize_dispenser_report_entries(visit), only=("visit_report",)
+    ),
+    "media": _list_field(lambda visit, now: _serialize_media_list(visit.media.all()), prefetch=("media",)),
+    "report_status": _report_status_field(ReportArtifact.Kind.VISIT),
+}
+
+VISIT_FIELD_PROFILES = {
+    "summary": (
+        "id", "client", "client_id", "branch", "branch_id", "area", "area_id",
+        "inspector", "inspector_id", "visited_at", "visit_type", "visit_type_label",
+        "status", "status_label",
+    ),
+}
+
+
+def _serialize_fields(instance, field_specs, fields=None, *, now=None) -> dict:
+    now = now or timezone.now()
+    names = field_specs if fields is None else [name for name in field_specs if name in fields]
+    return {name: field_specs[name]["getter"](instance, now) for name in names}
+
+
+def _serialize_visit(visit: Visit, fields=None) -> dict:
+    return _serialize_fields(visit, VISIT_FIELDS, fields)
+
+
+def _serialize_visits(rows, fields=None) -> Iterator[dict]:
+    """Serializa un listado con un número de consultas fijo, sin importar cuántas visitas haya.
+
+    ``rows`` debe venir de ``_apply_list_field_loading`` para que traiga los joins,
+    el conteo de dosificadores anotado y la media precargada.
+    """
+    now = timezone.now()
+    for visit in rows:
+        yield _serialize_fields(visit, VISIT_FIELDS, fields, now=now)
 
 
 def _serialize_audit_form(form: AuditForm) -> dict:
+    areas_count = getattr(form, "annotated_areas_count", None)
+    if areas_count is None:
+        areas_count = form.areas_using_template.count()
     return {
         "id": form.id,
         "name": form.name,
         "schema": form.schema or {},
         "is_active": form.is_active,
-        "areas_count": form.areas_using_template.count(),
+        "areas_count": areas_count,
     }
 
 
-def _serialize_audit(audit: Audit) -> dict:
-    inspector = "Sin asignar"
-    inspector_id = None
-    if audit.inspector:
-        inspector = audit.inspector.get_full_name() or audit.inspector.username
-        inspector_id = audit.inspector_id
+AUDIT_FIELDS = {
+    "id": _list_field(lambda audit, now: audit.id, only=("id",)),
+    **_AREA_FIELDS,
+    "form_id": _list_field(lambda audit, now: audit.form_id, only=("form",)),
+    "form": _list_field(
+        lambda audit, now: audit.form_name or audit.form.name,
+        only=("form_name", "form__name"),
+        select_related=("form",),
+    ),
+    "form_name": _list_field(
+        lambda audit, now: audit.form_name or audit.form.name,
+        only=("form_name", "form__name"),
+        select_related=("form",),
+    ),
+    "form_schema": _list_field(
+        lambda audit, now: audit.form_schema or audit.form.schema or {},
+        only=("form_schema", "form__schema"),
+        select_related=("form",),
+    ),
+    **_INSPECTOR_FIELDS,
+    "audited_at": _list_field(lambda audit, now: audit.audited_at.isoformat(), only=("audited_at",)),
+    "notes": _list_field(lambda audit, now: audit.notes, only=("notes",)),
+    "status": _list_field(
+        lambda audit, now: _scheduled_status(audit, audit.audited_at, now)[0], only=("status", "audited_at")
+    ),
+    "status_label": _list_field(
+        lambda audit, now: _scheduled_status(audit, audit.audited_at, now)[1], only=("status", "audited_at")
+    ),
+    **_execution_fields(),
+    "audit_report": _list_field(lambda audit, now: audit.audit_report, only=("audit_report",)),
+    "media": _list_field(lambda audit, now: _serialize_media_list(audit.media.all()), prefetch=("media",)),
+    "report_status": _report_status_field(ReportArtifact.Kind.AUDIT),
+}
+
+AUDIT_FIELD_PROFILES = {
+    "summary": (
+        "id", "client", "client_id", "branch", "branch_id", "area", "area_id",
+        "form_id", "form_name", "inspector", "inspector_id", "audited_at",
+        "status", "status_label",
+    ),
+}
+
+
+def _serialize_audit(audit: Audit, fields=None) -> dict:
+    return _serialize_fields(audit, AUDIT_FIELDS, fields)
+
+
+def _serialize_audits(rows, fields=None) -> Iterator[dict]:
+    now = timezone.now()
+    for audit in rows:
+        yield _serialize_fields(audit, AUDIT_FIELDS, fields, now=now)
 
-    form_name = audit.form_name or audit.form.name
-    form_schema = audit.form_schema or audit.form.schema or {}
 
-    status = audit.status
-    status_label = audit.get_status_display()
-    if status == Audit.Status.SCHEDULED and audit.audited_at < timezone.now():
-        status = "overdue"
-        status_label = "Vencida"
+def _get_list_fields(request, field_specs, profiles):
+    """Devuelve ``(fields, error)`` a partir de ``?fields=``; None significa todos los campos."""
+    raw_fields = (request.GET.get("fields") or "").strip()
+    if not raw_fields:
+        return None, None
 
-    return {
-        "id": audit.id,
-        "client": audit.area.branch.client.name,
-        "client_id": audit.area.branch.client_id,
-        "branch": audit.area.branch.name,
-        "branch_id": audit.area.branch_id,
-        "area": audit.area.name,
-        "area_id": audit.area_id,
-        "form_id": audit.form_id,
-        "form": form_name,
-        "form_name": form_name,
-        "form_schema": form_schema,
-        "inspector": inspector,
-        "inspector_id": inspector_id,
-        "audited_at": audit.audited_at.isoformat(),
-        "notes": audit.notes,
-        "status": status,
-        "status_label": status_label,
-        "started_at": audit.started_at.isoformat() if audit.started_at else None,
-        "completed_at": audit.completed_at.isoformat() if audit.completed_at else None,
-        "start_latitude": audit.start_latitude,
-        "start_longitude": audit.start_longitude,
-        "end_latitude": audit.end_latitude,
-        "end_longitude": audit.end_longitude,
-        "audit_report": audit.audit_report,
-        "media": [
-            {
-                "id": medium.id,
-                "type": medium.media_type,
-                "file": medium.file.url if medium.file else None,
-            }
-            for medium in audit.media.all()
-        ],
-    }
+    fields = {"id"}
+    for token in raw_fields.split(","):
+        name = token.strip()
+        if not name:
+            continue
+        if name in profiles:
+            fields.update(profiles[name])
+        elif name in field_specs:
+            fields.add(name)
+        else:
+            return None, f"Campo no válido en fields: {name}."
+    return fields, None
+
+
+def _apply_list_field_loading(queryset, field_specs, fields, *, extra_only=()):
+    """Ajusta joins, prefetch y columnas del queryset a los campos que se van a serializar."""
+    specs = [field_specs[name] for name in (field_specs if fields is None else fields)]
+    select_related = sorted({path for spec in specs for path in spec["select_related"]})
+    prefetch = sorted({path for spec in specs for path in spec["prefetch"]})
+    annotations = {}
+    for spec in specs:
+        if spec["annotate"]:
+            annotations.update(spec["annotate"]())
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if fields is not None:
+        columns = {column for spec in specs for column in spec["only"]}
+        columns.update(extra_only)
+        queryset = queryset.only(*sorted(columns))
+    return queryset
 
 
 
@@ -1505,18 +1832,35 @@ def _resolve_audit_score(audit: Audit) -> int | None:
         return max(0, min(100, int(round(parsed))))
     return None
 
-def _serialize_notification(item: dict[str, Any]) -> dict[str, Any]:
+def _serialize_notification(notification: Notification) -> dict[str, Any]:
     return {
-        "id": item["id"],
-        "title": item["title"],
-        "message": item["message"],
-        "created_at": item["created_at"].isoformat(),
-        "type": item["type"],
-        "unread": bool(item.get("unread", False)),
+        "id": str(notification.id),
+        "title": notification.title,
+        "message": notification.message,
+        "created_at": notification.created_at.isoformat(),
+        "type": notification.kind,
+        "unread": notification.read_at is None,
     }
 
 
+def _draw_document_form(pdf: canvas.Canvas, name: str, draw: Callable[[], None]) -> None:
+    """Dibuja ``draw`` una sola vez por documento como XObject y lo reutiliza en cada página."""
+    defined = pdf.__dict__.setdefault("_report_forms", set())
+    if name not in defined:
+        pdf.beginForm(name)
+        try:
+            draw()
+        finally:
+            pdf.endForm()
+        defined.add(name)
+    pdf.doForm(name)
+
+
 def _draw_page_background(pdf: canvas.Canvas):
+    _draw_document_form(pdf, "trustPageBackground", lambda: _paint_page_background(pdf))
+
+
+def _paint_page_background(pdf: canvas.Canvas):
     page_width, page_height = LETTER
     pdf.setFillColor(colors.HexColor("#f3f6fb"))
     pdf.rect(0, 0, page_width, page_height, fill=1, stroke=0)
@@ -1710,34 +2054,9 @@ def _draw_wrapped_text(pdf: canvas.Canvas, text: str, x: float, y: float, width:
     return current_y
 
 
-@lru_cache(maxsize=1)
 def _get_audit_logo() -> ImageReader | Drawing | None:
-    for path in REPORT_LOGO_PATHS:
-        if not path.exists():
-            continue
-        try:
-            raw = path.read_bytes()
-            if svg2rlg and b"<svg" in raw[:500].lower():
-                drawing = svg2rlg(BytesIO(raw))
-                if drawing:
-                    return drawing
-            return ImageReader(BytesIO(raw))
-        except Exception:
-            continue
-
-    for logo_url in REPORT_AUDIT_LOGO_URLS:
-        try:
-            request = Request(logo_url, headers={"User-Agent": "trust-report-generator/1.0"})
-            with urlopen(request, timeout=8) as response:
-                raw = response.read()
-                if svg2rlg and b"<svg" in raw[:500].lower():
-                    drawing = svg2rlg(BytesIO(raw))
-                    if drawing:
-                        return drawing
-                return ImageReader(BytesIO(raw))
-        except Exception:
-            continue
-    return None
+    logo = report_images.get_report_logo()
+    return logo.drawable if logo else None
 
 
 def _draw_report_logo(pdf: canvas.Canvas, x: float, y: float, width: float, height: float) -> bool:
@@ -1752,14 +2071,24 @@ def _draw_report_logo(pdf: canvas.Canvas, x: float, y: float, width: float, heig
             scale = min(width / logo_width, height / logo_height)
             draw_width = logo_width * scale
             draw_height = logo_height * scale
-            pdf.saveState()
-            pdf.translate(x + ((width - draw_width) / 2), y + ((height - draw_height) / 2))
-            pdf.scale(scale, scale)
-            renderPDF.draw(logo, pdf, 0, 0)
-            pdf.restoreState()
-            return True
 
-        pdf.drawImage(logo, x, y, width=width, height=height, preserveAspectRatio=True, mask="auto", anchor="sw")
+            def _paint():
+                pdf.translate((width - draw_width) / 2, (height - draw_height) / 2)
+                pdf.scale(scale, scale)
+                renderPDF.draw(logo, pdf, 0, 0)
+
+        else:
+
+            def _paint():
+                pdf.drawImage(logo, 0, 0, width=width, height=height, preserveAspectRatio=True, mask="auto", anchor="sw")
+
+        # Un XObject por tamaño: el SVG no se vuelve a emitir como vectores en cada página.
+        pdf.saveState()
+        pdf.translate(x, y)
+        try:
+            _draw_document_form(pdf, f"trustLogo{width:g}x{height:g}", _paint)
+        finally:
+            pdf.restoreState()
         return True
     except Exception:
         return False
@@ -1853,9 +2182,18 @@ def _build_public_report_token(visit: Visit) -> str:
     return signing.dumps({"visit_id": visit.id}, salt=REPORT_PUBLIC_LINK_SALT)
 
 
-def _build_public_report_url(request, visit: Visit) -> str:
+def _build_public_report_url(request, visit: Visit) -> str | None:
+    """Enlace web del informe para el QR; con REPORT_PUBLIC_BASE_URL no depende de la petición.
+
+    Sin petición (el worker de informes) y sin esa opción no hay enlace.
+    """
     token = _build_public_report_token(visit)
     path = f"/visits/report/public/{token}"
+    base_url = getattr(settings, "REPORT_PUBLIC_BASE_URL", "")
+    if base_url:
+        return base_url.rstrip("/") + path
+    if request is None:
+        return None
     return request.build_absolute_uri(path)
 
 
@@ -2099,10 +2437,14 @@ def _draw_signoff(pdf: canvas.Canvas, visit: Visit, y_start: float):
 def _draw_report_footer(pdf: canvas.Canvas, generated_at: datetime):
     page_width, _ = LETTER
     footer_y = 20
-    pdf.setFillColor(colors.HexColor("#64748b"))
-    pdf.setFont(REPORT_FONT, 8)
     footer_text = f"informe generado por trust by Supplymax de Panamá {generated_at.strftime('%d/%m/%Y %H:%M')}"
-    pdf.drawCentredString(page_width / 2, footer_y, footer_text)
+
+    def _paint():
+        pdf.setFillColor(colors.HexColor("#64748b"))
+        pdf.setFont(REPORT_FONT, 8)
+        pdf.drawCentredString(page_width / 2, footer_y, footer_text)
+
+    _draw_document_form(pdf, f"trustFooter{generated_at.strftime('%Y%m%d%H%M')}", _paint)
 
 
 def _collect_visit_dispensers_snapshot(visit: Visit) -> list[dict[str, Any]]:
@@ -2138,6 +2480,119 @@ def _collect_visit_dispensers_snapshot(visit: Visit) -> list[dict[str, Any]]:
     return snapshot
 
 
+def _build_visit_report_snapshot(visit: Visit) -> dict[str, Any]:
+    """Datos de la visita que aparecen en su PDF; cualquier cambio produce otro informe."""
+    inspector = visit.inspector
+    return {
+        "id": visit.id,
+        "status": visit.status,
+        "status_label": visit.get_status_display(),
+        "client": visit.area.branch.client.name,
+        "branch": visit.area.branch.name,
+        "area": visit.area.name,
+        "inspector": (inspector.get_full_name() or inspector.username) if inspector else None,
+        "visited_at": visit.visited_at,
+        "started_at": visit.started_at,
+        "completed_at": visit.completed_at,
+        "notes": visit.notes,
+        "visit_report": _get_visit_report_data(visit),
+        "dispensers": _collect_visit_dispensers_snapshot(visit),
+        "photos": [
+            _report_photo_reference(item)
+            for item in visit.media.filter(media_type=VisitMedia.MediaType.PHOTO).order_by("id")
+            if item.file
+        ],
+    }
+
+
+def _build_audit_report_snapshot(audit: Audit) -> dict[str, Any]:
+    inspector = audit.inspector
+    return {
+        "id": audit.id,
+        "status": audit.status,
+        "client": audit.area.branch.client.name,
+        "branch": audit.area.branch.name,
+        "area": audit.area.name,
+        "inspector": inspector.get_full_name() if inspector else None,
+        "inspector_username": inspector.username if inspector else None,
+        "audited_at": audit.audited_at,
+        "completed_at": audit.completed_at,
+        "audit_report": audit.audit_report or {},
+        "photos": [
+            _report_photo_reference(item)
+            for item in audit.media.filter(media_type=AuditMedia.MediaType.PHOTO).order_by("id")
+            if item.file
+        ],
+    }
+
+
+def _get_visit_report_artifact(visit: Visit, public_report_url: str | None = None) -> ReportArtifact:
+    """PDF guardado de la visita; con ``public_report_url`` la variante lleva el QR de acceso web.
+
+    El enlace del QR caduca, así que esa variante se regenera pasada la mitad de su vigencia.
+    """
+    variant = "plain"
+    max_age = None
+    if public_report_url:
+        variant = f"qr:{urlsplit(public_report_url).netloc}"
+        max_age = timedelta(seconds=REPORT_PUBLIC_LINK_MAX_AGE_SECONDS / 2)
+    return report_artifacts.get_or_render(
+        ReportArtifact.Kind.VISIT,
+        visit.id,
+        _build_visit_report_snapshot(visit),
+        lambda: _build_visit_pdf(visit, public_report_url=public_report_url),
+        variant=variant,
+        max_age=max_age,
+    )
+
+
+def _get_audit_report_artifact(audit: Audit) -> ReportArtifact:
+    return report_artifacts.get_or_render(
+        ReportArtifact.Kind.AUDIT,
+        audit.id,
+        _build_audit_report_snapshot(audit),
+        lambda: _build_audit_pdf(audit),
+    )
+
+
+def _serve_report_artifact(request, load_artifact, filename: str, *, inline: bool = False):
+    """Responde con el PDF guardado o recién generado; 503 si el pool de renderizado está lleno."""
+    try:
+        with report_renderer.fail_fast():
+            artifact = load_artifact()
+    except report_renderer.RendererBusy as exc:
+        response = JsonResponse(
+            {"error": "El generador de informes está ocupado. Intenta de nuevo en unos segundos."}, status=503
+        )
+        response["Retry-After"] = str(exc.retry_after)
+        return response
+    return _report_artifact_response(request, artifact, filename, inline=inline)
+
+
+def _read_report_artifact(artifact: ReportArtifact) -> bytes:
+    with artifact.file.open("rb") as handle:
+        return handle.read()
+
+
+def _report_artifact_response(request, artifact: ReportArtifact, filename: str, *, inline: bool = False):
+    etag = f'"{artifact.template_version}-{artifact.content_hash[:32]}"'
+    not_modified = get_conditional_response(request, etag=etag, last_modified=artifact.created_at.timestamp())
+    if not_modified is not None:
+        return not_modified
+
+    response = FileResponse(
+        artifact.file.open("rb"),
+        content_type="application/pdf",
+        as_attachment=not inline,
+        filename=filename,
+    )
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(artifact.created_at.timestamp())
+    # El contenido bajo una misma URL solo cambia si se edita el registro o la plantilla.
+    response["Cache-Control"] = "private, max-age=3600"
+    return response
+
+
 def _load_report_image(reference: str) -> ImageReader | None:
     ref = str(reference or "").strip()
     if not ref:
@@ -2161,7 +2616,7 @@ def _load_report_image(reference: str) -> ImageReader | None:
         candidate = (media_root / relative_path).resolve()
         if candidate.is_file() and str(candidate).startswith(str(media_root)):
             try:
-                return ImageReader(str(candidate))
+                return ImageReader(str(media_derivatives.report_path(candidate)))
             except Exception:
                 return None
 
@@ -2170,29 +2625,77 @@ def _load_report_image(reference: str) -> ImageReader | None:
         candidate = (media_root / ref.replace("/media/", "", 1)).resolve()
         if candidate.is_file() and str(candidate).startswith(str(media_root)):
             try:
-                return ImageReader(str(candidate))
+                return ImageReader(str(media_derivatives.report_path(candidate)))
             except Exception:
                 return None
 
     candidate = (media_root / ref).resolve()
     if candidate.is_file() and str(candidate).startswith(str(media_root)):
         try:
-            return ImageReader(str(candidate))
+            return ImageReader(str(media_derivatives.report_path(candidate)))
         except Exception:
             return None
 
     if ref.startswith("http://") or ref.startswith("https://"):
+        payload = report_images.fetch_remote_image(ref, timeout=2.0)
+        if payload is None:
+            return None
         try:
-            request = Request(ref, headers={"User-Agent": "trust-report-generator/1.0"})
-            with urlopen(request, timeout=2.0) as response:
-                return ImageReader(BytesIO(response.read()))
+            return ImageReader(BytesIO(payload))
         except Exception:
             return None
 
     return None
 
 
+def _preload_report_image(reference: str) -> ImageReader | None:
+    image = _load_report_image(reference)
+    # Los JPEG se copian tal cual al PDF; el resto se decodifica aquí y no al dibujar.
+    if image is not None and image.jpeg_fh() is None:
+        image.getRGBData()
+    return image
+
+
+def _load_report_images(references: Iterable[str]) -> dict[str, ImageReader | None]:
+    """Carga las fotos de un informe en paralelo dentro de ``REPORT_PHOTO_BUDGET_SECONDS``.
+
+    Las que no se pueden leer quedan en None; las que no terminan a tiempo no aparecen
+    en el resultado y se dibujan como recuadro.
+    """
+    unique_references = list(dict.fromkeys(ref for ref in references if ref))
+    if not unique_references:
+        return {}
+    executor = ThreadPoolExecutor(
+        max_workers=min(REPORT_PHOTO_WORKERS, len(unique_references)), thread_name_prefix="report-photos"
+    )
+    futures = {executor.submit(_preload_report_image, ref): ref for ref in unique_references}
+    done, pending = wait(futures, timeout=REPORT_PHOTO_BUDGET_SECONDS)
+    executor.shutdown(wait=False, cancel_futures=True)
+    if pending:
+        logger.warning("Report photos timed out: %s of %s", len(pending), len(unique_references))
+    return {futures[future]: (None if future.exception() else future.result()) for future in done}
+
+
+def _report_photo_slots(references: list[str], loaded: dict[str, ImageReader | None]) -> list[ImageReader | None]:
+    """Fotos a dibujar en orden; None es un recuadro de foto pendiente. Las ilegibles se omiten."""
+    return [loaded.get(ref) for ref in references if ref not in loaded or loaded[ref] is not None]
+
+
+def _draw_photo_placeholder(pdf: canvas.Canvas, x: float, y: float, width: float, height: float, radius: float = 10):
+    pdf.saveState()
+    pdf.setFillColor(colors.HexColor("#e2e8f0"))
+    pdf.roundRect(x, y, width, height, radius, fill=1, stroke=0)
+    pdf.setFillColor(colors.HexColor("#64748b"))
+    pdf.setFont(REPORT_FONT, 8)
+    pdf.drawCentredString(x + width / 2, y + height / 2 - 3, "Imagen no disponible")
+    pdf.restoreState()
+
+
 def _build_visit_pdf(visit: Visit, public_report_url: str | None = None) -> bytes:
+    return report_renderer.get_renderer().render("visit", _build_visit_report_snapshot(visit), public_report_url)
+
+
+def _render_visit_pdf(snapshot: dict[str, Any], public_report_url: str | None = None) -> bytes:
     _initialize_report_fonts()
     output = BytesIO()
     pdf = canvas.Canvas(output, pagesize=LETTER)
@@ -2206,7 +2709,7 @@ def _build_visit_pdf(visit: Visit, public_report_url: str | None = None) -> byte
     section_gap = 20
     label_color = colors.HexColor("#475569")
     text_color = colors.HexColor("#0f172a")
-    report = _get_visit_report_data(visit)
+    report = snapshot["visit_report"]
     responsible_name = str(report.get("responsible_name") or "No registrado")
     responsible_signature = str(report.get("responsible_signature") or "").strip()
 
@@ -2243,20 +2746,20 @@ def _build_visit_pdf(visit: Visit, public_report_url: str | None = None) -> byte
     y -= 20
     pdf.setFont(REPORT_FONT, 10)
     pdf.setFillColor(label_color)
-    pdf.drawString(margin_x, y, f"Visita #{visit.id} · Generado: {generated_at.strftime('%d/%m/%Y %H:%M')}")
+    pdf.drawString(margin_x, y, f"Visita #{snapshot['id']} · Generado: {generated_at.strftime('%d/%m/%Y %H:%M')}")
     y -= 24
 
     _section_title("Datos generales")
     summary_rows = [
-        ("Cliente", visit.area.branch.client.name),
-        ("Sucursal", visit.area.branch.name),
-        ("Área", visit.area.name),
-        ("Inspector", (visit.inspector.get_full_name() or visit.inspector.username) if visit.inspector else "Sin asignar"),
+        ("Cliente", snapshot["client"]),
+        ("Sucursal", snapshot["branch"]),
+        ("Área", snapshot["area"]),
+        ("Inspector", snapshot["inspector"] or "Sin asignar"),
         ("Responsable del área", responsible_name),
-        ("Estado", visit.get_status_display()),
-        ("Fecha programada", timezone.localtime(visit.visited_at).strftime("%d/%m/%Y %H:%M")),
-        ("Inicio", timezone.localtime(visit.started_at).strftime("%d/%m/%Y %H:%M") if visit.started_at else "No registrado"),
-        ("Finalización", timezone.localtime(visit.completed_at).strftime("%d/%m/%Y %H:%M") if visit.completed_at else "No registrado"),
+        ("Estado", snapshot["status_label"]),
+        ("Fecha programada", timezone.localtime(snapshot["visited_at"]).strftime("%d/%m/%Y %H:%M")),
+        ("Inicio", timezone.localtime(snapshot["started_at"]).strftime("%d/%m/%Y %H:%M") if snapshot["started_at"] else "No registrado"),
+        ("Finalización", timezone.localtime(snapshot["completed_at"]).strftime("%d/%m/%Y %H:%M") if snapshot["completed_at"] else "No registrado"),
     ]
     for label, value in summary_rows:
         _ensure_space(line_h + 2)
@@ -2270,7 +2773,7 @@ def _build_visit_pdf(visit: Visit, public_report_url: str | None = None) -> byte
 
     y -= 8
     _section_title("Observaciones generales")
-    comments = str(report.get("comments") or visit.notes or "Sin observaciones registradas.")
+    comments = str(report.get("comments") or snapshot["notes"] or "Sin observaciones registradas.")
     wrapped = _split_text_to_lines(pdf, comments, page_width - (margin_x * 2))
     for line in wrapped[:16]:
         _ensure_space(line_h)
@@ -2280,7 +2783,7 @@ def _build_visit_pdf(visit: Visit, public_report_url: str | None = None) -> byte
         y -= line_h
     y -= section_gap
 
-    dispensers = _collect_visit_dispensers_snapshot(visit)
+    dispensers = snapshot["dispensers"]
     _section_title("Detalle por dosificador")
     if not dispensers:
         _ensure_space(line_h)
@@ -2323,7 +2826,7 @@ def _build_visit_pdf(visit: Visit, public_report_url: str | None = None) -> byte
         y -= 16
 
     dispenser_annexes = [item for item in dispensers if item["photos"]]
-    general_photos = [str(item.file).strip() for item in visit.media.filter(media_type=VisitMedia.MediaType.PHOTO).order_by("id") if item.file]
+    general_photos = snapshot["photos"]
     has_annex_content = bool(dispenser_annexes or general_photos)
 
     if has_annex_content:
@@ -2341,7 +2844,7 @@ def _build_visit_pdf(visit: Visit, public_report_url: str | None = None) -> byte
         y -= 18
         pdf.setFont(REPORT_FONT, 10)
         pdf.setFillColor(label_color)
-        pdf.drawString(margin_x, y, f"Evidencia fotográfica de la visita #{visit.id}")
+        pdf.drawString(margin_x, y, f"Evidencia fotográfica de la visita #{snapshot['id']}")
         y -= 24
 
     gallery_width = page_width - (margin_x * 2)
@@ -2361,11 +2864,7 @@ def _build_visit_pdf(visit: Visit, public_report_url: str | None = None) -> byte
 
     def _draw_photo_grid(photos: list[str]) -> None:
         nonlocal y
-        valid_photos: list[ImageReader] = []
-        for photo_ref in photos:
-            photo = _load_report_image(photo_ref)
-            if photo is not None:
-                valid_photos.append(photo)
+        valid_photos = _report_photo_slots(photos, loaded_photos)
 
         if not valid_photos:
             _ensure_space(24)
@@ -2383,16 +2882,20 @@ def _build_visit_pdf(visit: Visit, public_report_url: str | None = None) -> byte
             x = margin_x + (col * (image_w + card_gap_x))
             y_image = y - image_h
             try:
+                if photo is None:
+                    raise ValueError("Foto pendiente.")
                 _draw_rounded_photo(pdf, photo, x, y_image, image_w, image_h, radius=10)
             except Exception:
-                pdf.setFillColor(colors.HexColor("#e2e8f0"))
-                pdf.roundRect(x, y_image, image_w, image_h, 10, fill=1, stroke=0)
+                _draw_photo_placeholder(pdf, x, y_image, image_w, image_h, radius=10)
             row_complete = col == columns - 1
             is_last = idx == total - 1
             if row_complete or is_last:
                 y -= image_h + card_gap_y
 
     if has_annex_content:
+        loaded_photos = _load_report_images(
+            [photo for dispenser in dispenser_annexes for photo in dispenser["photos"][:6]] + general_photos[:8]
+        )
         for dispenser in dispenser_annexes:
             _draw_annex_title(f"Dosificador {dispenser['identifier']}")
             _draw_photo_grid(dispenser["photos"][:6])
@@ -2546,17 +3049,15 @@ def _serialize_incident(incident: Incident) -> dict:
         "dispenser": incident.dispenser.identifier,
         "description": incident.description,
         "created_at": incident.created_at.isoformat(),
-        "media": [
-            {
-                "id": medium.id,
-                "type": medium.media_type,
-                "file": medium.file.url if medium.file else None,
-            }
-            for medium in incident.media.all()
-        ],
+        "media": _serialize_media_list(incident.media.all()),
     }
 
 
+def _serialize_incidents(rows) -> Iterator[dict]:
+    for incident in rows:
+        yield _serialize_incident(incident)
+
+
 @require_GET
 def health(request):
     return JsonResponse({"ok": True, "app": "trust"})
@@ -2568,12 +3069,121 @@ def csrf_token(request):
     return JsonResponse({"csrf_token": get_token(request)})
 
 
+def _build_upcoming_day_buckets(queryset, scheduled_field: str, local_tz, limit: int = 4) -> list[dict[str, Any]]:
+    """Primeros ``limit`` días con programaciones: total y primera/última hora local."""
+    rows = (
+        queryset.annotate(bucket=TruncDate(scheduled_field, tzinfo=local_tz))
+        .order_by()
+        .values("bucket")
+        .annotate(total=Count("id"), first_at=Min(scheduled_field), last_at=Max(scheduled_field))
+        .order_by("bucket")[:limit]
+    )
+    return [
+        {
+            "date": row["bucket"].isoformat(),
+            "total": row["total"],
+            "first_time": timezone.localtime(row["first_at"], local_tz).strftime("%H:%M"),
+            "last_time": timezone.localtime(row["last_at"], local_tz).strftime("%H:%M"),
+        }
+        for row in rows
+    ]
+
+
+DASHBOARD_CACHE_TABLES = (Client, Branch, Area, Dispenser, Product, DispenserProductAssignment)
+DASHBOARD_STATS_KEYS = {
+    "hits": "dashboard:stats:hits",
+    "misses": "dashboard:stats:misses",
+    "recompute_ms": "dashboard:stats:recompute_ms",
+}
+
+
+def _dashboard_cache_key(scope, now) -> str:
+    """Clave por huella del alcance, mes y versiones de los datos que alimentan el tablero.
+
+    Dos usuarios con el mismo alcance comparten la entrada. Cualquier visita, auditoría o
+    incidencia de un cliente del alcance cambia su versión y deja la entrada huérfana. Las
+    versiones son por cliente y no por área para que la clave cueste pocas filas aunque el
+    alcance tenga miles de áreas.
+    """
+    version_keys = [catalog.table_key(model) for model in DASHBOARD_CACHE_TABLES]
+    if scope is None:
+        fingerprint = "global"
+        version_keys.append(catalog.ACTIVITY)
+    else:
+        fingerprint = hashlib.sha256(
+            json.dumps([scope["client_ids"], scope["branch_ids"], scope["area_ids"]]).encode()
+        ).hexdigest()[:24]
+        version_keys.extend(catalog.client_activity_key(client_id) for client_id in scope["client_ids"])
+
+    versions = catalog.get_versions(version_keys)
+    digest = hashlib.sha256(timezone.get_current_timezone_name().encode())
+    for key in sorted(versions):
+        digest.update(f"|{key}={versions[key][0]}".encode())
+    return f"dashboard:{fingerprint}:{now:%Y-%m}:{digest.hexdigest()[:40]}"
+
+
+def _count_dashboard_cache_event(name: str, amount: int = 1) -> None:
+    key = DASHBOARD_STATS_KEYS[name]
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        # La clave expiró o fue desalojada entre ``add`` e ``incr``.
+        cache.set(key, amount, timeout=None)
+
+
+def reset_dashboard_cache_stats() -> None:
+    cache.delete_many(DASHBOARD_STATS_KEYS.values())
+
+
+def get_dashboard_cache_stats() -> dict[str, float | int]:
+    values = cache.get_many(DASHBOARD_STATS_KEYS.values())
+    hits = values.get(DASHBOARD_STATS_KEYS["hits"], 0)
+    misses = values.get(DASHBOARD_STATS_KEYS["misses"], 0)
+    recompute_ms = values.get(DASHBOARD_STATS_KEYS["recompute_ms"], 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else 0.0,
+        "avg_recompute_ms": round(recompute_ms / misses, 2) if misses else 0.0,
+    }
+
+
 @require_GET
 def dashboard(request):
     now = timezone.now()
+    scope = _get_access_scope(request)
+    timeout = getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 60)
+    if not timeout:
+        return JsonResponse(_build_dashboard_payload(scope, now))
+
+    cache_key = _dashboard_cache_key(scope, now)
+    payload = cache.get(cache_key)
+    if payload is not None:
+        _count_dashboard_cache_event("hits")
+        response = JsonResponse(payload)
+        response["X-Cache"] = "HIT"
+        return response
+
+    started = time.perf_counter()
+    payload = _build_dashboard_payload(scope, now)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    # El TTL acota cuánto tarda en verse una programación que vence sin que nada cambie.
+    cache.set(cache_key, payload, timeout=timeout)
+    _count_dashboard_cache_event("misses")
+    _count_dashboard_cache_event("recompute_ms", round(elapsed_ms))
+    logger.info("Tablero recalculado en %.1f ms (%s)", elapsed_ms, cache_key)
+
+    response = JsonResponse(payload)
+    response["X-Cache"] = "MISS"
+    response["Server-Timing"] = f"dashboard;dur={elapsed_ms:.1f}"
+    return response
+
+
+def _build_dashboard_payload(scope, now) -> dict[str, Any]:
     month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     next_month_start = (month_start + timedelta(days=32)).replace(day=1)
-    scope = _get_access_scope(request)
 
     clients = Client.objects.all()
     branches = Branch.objects.all()
@@ -2599,24 +3209,22 @@ def dashboard(request):
     )
     audits_this_month = audits.filter(audited_at__gte=month_start, audited_at__lt=next_month_start)
 
-    completed_visits = visits_this_month.filter(status=Visit.Status.COMPLETED)
-    completed_audits = audits_this_month.filter(status=Audit.Status.COMPLETED)
-    scheduled_visits_queryset = visits_this_month.filter(status=Visit.Status.SCHEDULED)
-    overdue_visits_queryset = scheduled_visits_queryset.filter(visited_at__lt=now)
-    pending_visits_queryset = scheduled_visits_queryset.filter(visited_at__gte=now).order_by(
-        "visited_at"
+    visit_stats = visits_this_month.aggregate(
+        total=Count("id"),
+        completed=Count("id", filter=Q(status=Visit.Status.COMPLETED)),
+        pending=Count("id", filter=Q(status=Visit.Status.SCHEDULED, visited_at__gte=now)),
+        overdue=Count("id", filter=Q(status=Visit.Status.SCHEDULED, visited_at__lt=now)),
+    )
+    audit_stats = audits_this_month.aggregate(
+        total=Count("id"),
+        completed=Count("id", filter=Q(status=Audit.Status.COMPLETED)),
+        scheduled=Count("id", filter=Q(status=Audit.Status.SCHEDULED)),
+        overdue=Count("id", filter=Q(status=Audit.Status.SCHEDULED, audited_at__lt=now)),
     )
-    scheduled_audits_queryset = audits_this_month.filter(status=Audit.Status.SCHEDULED)
-    overdue_audits_queryset = scheduled_audits_queryset.filter(audited_at__lt=now)
-    upcoming_scheduled_audits_queryset = scheduled_audits_queryset.filter(
-        status=Audit.Status.SCHEDULED, audited_at__gte=now
-    ).order_by("audited_at")
     incident_count = incidents_this_month.count()
 
-    compliant_events_total = completed_visits.count() + completed_audits.count()
-    non_compliant_events_total = (
-        overdue_visits_queryset.count() + overdue_audits_queryset.count() + incident_count
-    )
+    compliant_events_total = visit_stats["completed"] + audit_stats["completed"]
+    non_compliant_events_total = visit_stats["overdue"] + audit_stats["overdue"] + incident_count
     compliance_total = compliant_events_total + non_compliant_events_total
     compliance_score_average = (
         round((compliant_events_total / compliance_total) * 100, 2)
@@ -2624,37 +3232,53 @@ def dashboard(request):
         else 100.0
     )
 
+    # Lo completado cuenta en su día de cierre (o el programado si no lo hay); lo
+    # vencido, en el día programado. Los días se agrupan en la zona horaria local.
+    local_tz = timezone.get_current_timezone()
     daily_completed_counts: dict[str, int] = {}
-    for visit in completed_visits:
-        if visit.completed_at is None and visit.visited_at is None:
-            continue
-        reference_date = visit.completed_at or visit.visited_at
-        if reference_date is None:
-            continue
-        bucket_key = timezone.localtime(reference_date).date().isoformat()
-        daily_completed_counts[bucket_key] = daily_completed_counts.get(bucket_key, 0) + 1
-
-    for audit in completed_audits:
-        if audit.completed_at is None and audit.audited_at is None:
-            continue
-        reference_date = audit.completed_at or audit.audited_at
-        if reference_date is None:
-            continue
-        bucket_key = timezone.localtime(reference_date).date().isoformat()
-        daily_completed_counts[bucket_key] = daily_completed_counts.get(bucket_key, 0) + 1
-
     daily_non_compliance_counts: dict[str, int] = {}
-    for visit in overdue_visits_queryset:
-        bucket_key = timezone.localtime(visit.visited_at).date().isoformat()
-        daily_non_compliance_counts[bucket_key] = daily_non_compliance_counts.get(bucket_key, 0) + 1
-
-    for audit in overdue_audits_queryset:
-        bucket_key = timezone.localtime(audit.audited_at).date().isoformat()
-        daily_non_compliance_counts[bucket_key] = daily_non_compliance_counts.get(bucket_key, 0) + 1
+    for queryset, scheduled_field, status_choices in (
+        (visits_this_month, "visited_at", Visit.Status),
+        (audits_this_month, "audited_at", Audit.Status),
+    ):
+        completed_filter = Q(status=status_choices.COMPLETED)
+        overdue_filter = Q(status=status_choices.SCHEDULED, **{f"{scheduled_field}__lt": now})
+        daily_rows = (
+            queryset.filter(completed_filter | overdue_filter)
+            .annotate(
+                bucket=TruncDate(
+                    Case(
+                        When(completed_filter, then=Coalesce("completed_at", scheduled_field)),
+                        default=F(scheduled_field),
+                    ),
+                    tzinfo=local_tz,
+                )
+            )
+            .order_by()
+            .values("bucket")
+            .annotate(
+                completed=Count("id", filter=completed_filter),
+                overdue=Count("id", filter=overdue_filter),
+            )
+        )
+        for row in daily_rows:
+            bucket_key = row["bucket"].isoformat()
+            if row["completed"]:
+                daily_completed_counts[bucket_key] = daily_completed_counts.get(bucket_key, 0) + row["completed"]
+            if row["overdue"]:
+                daily_non_compliance_counts[bucket_key] = (
+                    daily_non_compliance_counts.get(bucket_key, 0) + row["overdue"]
+                )
 
-    for incident in incidents_this_month:
-        bucket_key = timezone.localtime(incident.created_at).date().isoformat()
-        daily_non_compliance_counts[bucket_key] = daily_non_compliance_counts.get(bucket_key, 0) + 1
+    incident_rows = (
+        incidents_this_month.annotate(bucket=TruncDate("created_at", tzinfo=local_tz))
+        .order_by()
+        .values("bucket")
+        .annotate(total=Count("id"))
+    )
+    for row in incident_rows:
+        bucket_key = row["bucket"].isoformat()
+        daily_non_compliance_counts[bucket_key] = daily_non_compliance_counts.get(bucket_key, 0) + row["total"]
 
     all_daily_keys = sorted(
         set(daily_completed_counts.keys()) | set(daily_non_compliance_counts.keys())
@@ -2674,41 +3298,16 @@ def dashboard(request):
             }
         )
 
-    pending_visit_buckets: dict[str, dict[str, Any]] = {}
-    for visit in pending_visits_queryset:
-        visit_local_dt = timezone.localtime(visit.visited_at)
-        bucket_key = visit_local_dt.date().isoformat()
-        current_bucket = pending_visit_buckets.setdefault(
-            bucket_key,
-            {"date": bucket_key, "total": 0, "first_time": None, "last_time": None},
-        )
-        current_bucket["total"] += 1
-        visit_time = visit_local_dt.strftime("%H:%M")
-        if current_bucket["first_time"] is None:
-            current_bucket["first_time"] = visit_time
-        current_bucket["last_time"] = visit_time
-
-    scheduled_audit_buckets: dict[str, dict[str, Any]] = {}
-    for audit in upcoming_scheduled_audits_queryset:
-        audit_local_dt = timezone.localtime(audit.audited_at)
-        bucket_key = audit_local_dt.date().isoformat()
-        current_bucket = scheduled_audit_buckets.setdefault(
-            bucket_key,
-            {"date": bucket_key, "total": 0, "first_time": None, "last_time": None},
-        )
-        current_bucket["total"] += 1
-        audit_time = audit_local_dt.strftime("%H:%M")
-        if current_bucket["first_time"] is None:
-            current_bucket["first_time"] = audit_time
-        current_bucket["last_time"] = audit_time
-
-    pending_visit_details = [
-        pending_visit_buckets[date_key] for date_key in sorted(pending_visit_buckets.keys())
-    ][:4]
-    scheduled_audit_details = [
-        scheduled_audit_buckets[date_key]
-        for date_key in sorted(scheduled_audit_buckets.keys())
-    ][:4]
+    pending_visit_details = _build_upcoming_day_buckets(
+        visits_this_month.filter(status=Visit.Status.SCHEDULED, visited_at__gte=now),
+        "visited_at",
+        local_tz,
+    )
+    scheduled_audit_details = _build_upcoming_day_buckets(
+        audits_this_month.filter(status=Audit.Status.SCHEDULED, audited_at__gte=now),
+        "audited_at",
+        local_tz,
+    )
 
     stats = {
         "clients": clients.count(),
@@ -2716,15 +3315,15 @@ def dashboard(request):
         "areas": areas.count(),
         "dispensers": dispensers.count(),
         "products": products.count(),
-        "visits": visits_this_month.count(),
-        "completed_visits": completed_visits.count(),
-        "pending_visits": pending_visits_queryset.count(),
-        "overdue_visits": overdue_visits_queryset.count(),
-        "incidents": incidents_this_month.count(),
-        "audits": audits_this_month.count(),
-        "completed_audits": completed_audits.count(),
-        "scheduled_audits": scheduled_audits_queryset.count(),
-        "overdue_audits": overdue_audits_queryset.count(),
+        "visits": visit_stats["total"],
+        "completed_visits": visit_stats["completed"],
+        "pending_visits": visit_stats["pending"],
+        "overdue_visits": visit_stats["overdue"],
+        "incidents": incident_count,
+        "audits": audit_stats["total"],
+        "completed_audits": audit_stats["completed"],
+        "scheduled_audits": audit_stats["scheduled"],
+        "overdue_audits": audit_stats["overdue"],
         "compliance_score": compliance_score_average,
         "audit_score": compliance_score_average,
     }
@@ -2750,19 +3349,76 @@ def dashboard(request):
                 "visited_at": visit.visited_at.isoformat(),
             }
         )
+    return {
+        "stats": stats,
+        "activity": activity,
+        "daily_audit_score_history": daily_score_history,
+        "pending_visit_details": pending_visit_details,
+        "scheduled_audit_details": scheduled_audit_details,
+    }
+
+
+COMPLIANCE_TREND_MAX_DAYS = 366 * 5
+
+
+@require_GET
+def compliance_trend(request):
+    """Tendencia de cumplimiento entre ``from`` y ``to`` (YYYY-MM-DD, ambos incluidos).
+
+    ``granularity`` agrupa por day, week o month; ``group_by`` separa la serie por
+    client, branch o area. Sin fechas devuelve los últimos 12 meses.
+    """
+    current_user = _get_current_user(request)
+    if not current_user:
+        return JsonResponse({"error": "Usuario no autenticado."}, status=401)
+
+    today = timezone.localdate()
+    try:
+        end_day = date.fromisoformat(request.GET["to"]) if request.GET.get("to") else today
+        start_day = (
+            date.fromisoformat(request.GET["from"])
+            if request.GET.get("from")
+            else (end_day.replace(day=1) - timedelta(days=335)).replace(day=1)
+        )
+    except ValueError:
+        return JsonResponse({"error": "Las fechas deben tener formato YYYY-MM-DD."}, status=400)
+    if start_day > end_day:
+        return JsonResponse({"error": "La fecha inicial no puede ser posterior a la final."}, status=400)
+    if (end_day - start_day).days >= COMPLIANCE_TREND_MAX_DAYS:
+        return JsonResponse({"error": "El rango máximo es de 5 años."}, status=400)
+
+    granularity = request.GET.get("granularity") or "month"
+    if granularity not in compliance.GRANULARITIES:
+        return JsonResponse({"error": "granularity debe ser day, week o month."}, status=400)
+    group_by = request.GET.get("group_by") or None
+    if group_by is not None and group_by not in compliance.GROUP_FIELDS:
+        return JsonResponse({"error": "group_by debe ser client, branch o area."}, status=400)
+
+    series = compliance.compliance_trend(
+        _get_access_scope(request),
+        start_day,
+        end_day,
+        granularity=granularity,
+        group_by=group_by,
+    )
+    totals = compliance.summarize_trend(series)
+    for point in series:
+        point["period"] = point["period"].isoformat()
     return JsonResponse(
         {
-            "stats": stats,
-            "activity": activity,
-            "daily_audit_score_history": daily_score_history,
-            "pending_visit_details": pending_visit_details,
-            "scheduled_audit_details": scheduled_audit_details,
+            "from": start_day.isoformat(),
+            "to": end_day.isoformat(),
+            "granularity": granularity,
+            "group_by": group_by,
+            "series": series,
+            "totals": totals,
         }
     )
 
 
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
+@_conditional_list(Client)
 def clients(request):
     if request.method == "GET":
         queryset = Client.objects.all()
@@ -2850,6 +3506,7 @@ def client_detail(request, client_id: int):
 
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
+@_conditional_list(Branch, Client)
 def branches(request):
     scope = _get_access_scope(request)
     if request.method == "GET":
@@ -2956,6 +3613,7 @@ def branch_detail(request, branch_id: int):
 
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
+@_conditional_list(Area, Branch, Client, AuditForm)
 def areas(request):
     scope = _get_access_scope(request)
     if request.method == "GET":
@@ -3180,39 +3838,34 @@ def dispensers(request):
         return JsonResponse(_serialize_dispenser(dispenser), status=201)
 
     queryset = Dispenser.objects.select_related("model", "area__branch__client").prefetch_related(
-        "products",
-        "product_assignments__nozzle",
+        "product_assignments",
     )
     queryset = _filter_queryset_by_scope(queryset, scope, area_lookup="area_id")
-    payload = [
-        _serialize_dispenser(dispenser)
-        for dispenser in queryset.all()
-    ]
-    return JsonResponse({"results": payload})
+    return _list_response(
+        request,
+        queryset,
+        _serialize_dispensers,
+        {"catalog": {"nozzles": _get_nozzle_catalog()}},
+    )
 
 
 @require_GET
+@_conditional_list(DispenserModel)
 def dispenser_models(request):
-    queryset = DispenserModel.objects.all()
-    payload = [_serialize_dispenser_model(model) for model in queryset]
-    return JsonResponse({"results": payload})
+    return JsonResponse({"results": _get_dispenser_model_catalog()})
 
 
 @require_GET
+@_conditional_list(Nozzle)
 def nozzles(request):
-    queryset = _get_available_nozzles()
-    payload = [_serialize_nozzle(nozzle) for nozzle in queryset]
-    return JsonResponse({"results": payload})
+    return JsonResponse({"results": _get_nozzle_catalog()})
 
 
 @csrf_exempt
 @require_http_methods(["GET", "PUT", "DELETE"])
 def dispenser_detail(request, dispenser_id: int):
     scope = _get_access_scope(request)
-    queryset = Dispenser.objects.select_related("model", "area__branch__client").prefetch_related(
-        "products",
-        "product_assignments__nozzle",
-    )
+    queryset = Dispenser.objects.select_related("model", "area__branch__client")
     queryset = _filter_queryset_by_scope(queryset, scope, area_lookup="area_id")
     dispenser = queryset.filter(pk=dispenser_id).first()
     if dispenser is None:
@@ -3308,6 +3961,7 @@ def dispenser_detail(request, dispenser_id: int):
 
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
+@_conditional_list(Product, Dispenser, DispenserModel, DispenserProductAssignment)
 def products(request):
     if request.method == "GET":
         queryset = Product.objects.prefetch_related("dispensers__model")
@@ -3318,11 +3972,11 @@ def products(request):
             area_lookup="dispensers__area_id",
         ).distinct()
         allowed_area_ids = set(scope["area_ids"]) if scope is not None else None
-        payload = [
-            _serialize_product(product, allowed_area_ids=allowed_area_ids)
-            for product in queryset.all()
-        ]
-        return JsonResponse({"results": payload})
+        return _list_response(
+            request,
+            queryset,
+            lambda rows: (_serialize_product(product, allowed_area_ids=allowed_area_ids) for product in rows),
+        )
 
     current_user = _get_current_user(request)
     if not _can_create_dashboard_items(current_user):
@@ -3411,8 +4065,15 @@ def visits(request):
             return JsonResponse({"error": "Solo el administrador general puede agendar visitas."}, status=403)
 
     if request.method == "GET":
-        queryset = Visit.objects.select_related(
-            "area__branch__client", "inspector", "dispenser"
+        page, page_error = _get_list_page_params(request)
+        if page_error:
+            return JsonResponse({"error": page_error}, status=400)
+        fields, fields_error = _get_list_fields(request, VISIT_FIELDS, VISIT_FIELD_PROFILES)
+        if fields_error:
+            return JsonResponse({"error": fields_error}, status=400)
+
+        queryset = _apply_list_field_loading(
+            Visit.objects.all(), VISIT_FIELDS, fields, extra_only=("visited_at",)
         )
         scope = _get_access_scope(request)
         queryset = _filter_queryset_by_scope(queryset, scope, area_lookup="area_id")
@@ -3431,8 +4092,10 @@ def visits(request):
                     status=400,
                 )
 
-        payload = [_serialize_visit(visit) for visit in queryset.all()]
-        return JsonResponse({"results": payload})
+        if page is None:
+            return _list_response(request, queryset, lambda rows: _serialize_visits(rows, fields))
+        items, next_cursor = _paginate_queryset(queryset, page, order_field="visited_at")
+        return _list_response(request, items, lambda rows: _serialize_visits(rows, fields), {"next": next_cursor})
 
     data, files = _extract_user_data(request)
     if data is None:
@@ -3447,7 +4110,7 @@ def visits(request):
     except (Area.DoesNotExist, ValueError, TypeError):
         return JsonResponse({"error": "Área no válida."}, status=400)
 
-    scope = _build_access_scope(current_user)
+    scope = _get_access_scope(request)
     if scope is not None and area.id not in scope["area_ids"]:
         return JsonResponse({"error": "No tienes permiso para agendar visitas en esta área."}, status=403)
 
@@ -3496,6 +4159,7 @@ def visits(request):
             "branch_id": str(area.branch_id),
             "client_id": str(area.branch.client_id),
         },
+        inspector_id=visit.inspector_id,
     )
 
     return JsonResponse(_serialize_visit(visit), status=201)
@@ -3508,7 +4172,7 @@ def visit_mobile_flow(request, visit_id: int):
     if not current_user or current_user.role != User.Role.INSPECTOR:
         return JsonResponse({"error": "Solo un inspector puede realizar visitas programadas."}, status=403)
 
-    scope = _build_access_scope(current_user)
+    scope = _get_access_scope(request)
 
     try:
         visit = Visit.objects.select_related("inspector").get(pk=visit_id)
@@ -3544,7 +4208,7 @@ def visit_mobile_flow(request, visit_id: int):
         visit.start_latitude = start_latitude
         visit.start_longitude = start_longitude
         visit.inspector = current_user
-        visit.save(update_fields=["started_at", "start_latitude", "start_longitude", "inspector"])
+        visit.save(update_fields=["started_at", "start_latitude", "start_longitude", "inspector", "updated_at"])
         return JsonResponse(_serialize_visit(visit))
 
     if action == "complete":
@@ -3583,7 +4247,7 @@ def visit_mobile_flow(request, visit_id: int):
             "longitude": end_longitude,
         }
         visit.visit_report = report
-        visit.save(update_fields=["status", "completed_at", "end_latitude", "end_longitude", "visit_report"])
+        visit.save(update_fields=["status", "completed_at", "end_latitude", "end_longitude", "visit_report", "updated_at"])
 
         evidence_files = []
         if files:
@@ -3600,6 +4264,7 @@ def visit_mobile_flow(request, visit_id: int):
                 media_type = VisitMedia.MediaType.OTHER
             VisitMedia.objects.create(visit=visit, media_type=media_type, file=evidence)
 
+        report_jobs.enqueue(ReportArtifact.Kind.VISIT, [visit.id])
         # Replaced N8N webhook with Gmail API notifications
         _send_email_async(_process_visit_completed_email, (visit.id,))
         _send_area_push_notification(
@@ -3613,6 +4278,7 @@ def visit_mobile_flow(request, visit_id: int):
                 "branch_id": str(visit.area.branch_id),
                 "client_id": str(visit.area.branch.client_id),
             },
+            inspector_id=visit.inspector_id,
         )
 
         return JsonResponse(_serialize_visit(visit))
@@ -3625,12 +4291,12 @@ def visit_mobile_flow(request, visit_id: int):
 
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
+@_conditional_list(AuditForm, Area)
 def audit_forms(request):
     current_user = _get_current_user(request)
 
     if request.method == "GET":
-        queryset = AuditForm.objects.all()
-        return JsonResponse({"results": [_serialize_audit_form(form) for form in queryset.all()]})
+        return JsonResponse({"results": _get_audit_form_catalog()})
 
     if not current_user or not _is_general_admin_user(current_user):
         return JsonResponse({"error": "Solo el administrador general puede crear plantillas de auditoría."}, status=403)
@@ -3707,7 +4373,16 @@ def audits(request):
             return JsonResponse({"error": "Solo el administrador general o un inspector pueden agendar auditorías."}, status=403)
 
     if request.method == "GET":
-        queryset = Audit.objects.select_related("area__branch__client", "inspector", "form")
+        page, page_error = _get_list_page_params(request)
+        if page_error:
+            return JsonResponse({"error": page_error}, status=400)
+        fields, fields_error = _get_list_fields(request, AUDIT_FIELDS, AUDIT_FIELD_PROFILES)
+        if fields_error:
+            return JsonResponse({"error": fields_error}, status=400)
+
+        queryset = _apply_list_field_loading(
+            Audit.objects.all(), AUDIT_FIELDS, fields, extra_only=("audited_at",)
+        )
         scope = _get_access_scope(request)
         queryset = _filter_queryset_by_scope(queryset, scope, area_lookup="area_id")
 
@@ -3722,7 +4397,10 @@ def audits(request):
             except ValueError:
                 return JsonResponse({"error": "El parámetro month debe tener formato YYYY-MM."}, status=400)
 
-        return JsonResponse({"results": [_serialize_audit(audit) for audit in queryset.all()]})
+        if page is None:
+            return _list_response(request, queryset, lambda rows: _serialize_audits(rows, fields))
+        items, next_cursor = _paginate_queryset(queryset, page, order_field="audited_at")
+        return _list_response(request, items, lambda rows: _serialize_audits(rows, fields), {"next": next_cursor})
 
     data, files = _extract_user_data(request)
     if data is None:
@@ -3737,7 +4415,7 @@ def audits(request):
     if area is None:
         return JsonResponse({"error": "Área no válida."}, status=400)
 
-    scope = _build_access_scope(current_user)
+    scope = _get_access_scope(request)
     if scope is not None and area.id not in scope["area_ids"]:
         return JsonResponse({"error": "No tienes permiso para agendar auditorías en esta área."}, status=403)
 
@@ -3781,6 +4459,7 @@ def audits(request):
             "branch_id": str(area.branch_id),
             "client_id": str(area.branch.client_id),
         },
+        inspector_id=audit.inspector_id,
     )
     return JsonResponse(_serialize_audit(audit), status=201)
 
@@ -3792,7 +4471,7 @@ def audit_mobile_flow(request, audit_id: int):
     if not current_user or current_user.role != User.Role.INSPECTOR:
         return JsonResponse({"error": "Solo un inspector puede realizar auditorías programadas."}, status=403)
 
-    scope = _build_access_scope(current_user)
+    scope = _get_access_scope(request)
 
     try:
         audit = Audit.objects.select_related("inspector", "form").get(pk=audit_id)
@@ -3828,7 +4507,7 @@ def audit_mobile_flow(request, audit_id: int):
         audit.start_latitude = start_latitude
         audit.start_longitude = start_longitude
         audit.inspector = current_user
-        audit.save(update_fields=["started_at", "start_latitude", "start_longitude", "inspector"])
+        audit.save(update_fields=["started_at", "start_latitude", "start_longitude", "inspector", "updated_at"])
         return JsonResponse(_serialize_audit(audit))
 
     if action == "complete":
@@ -3874,7 +4553,7 @@ def audit_mobile_flow(request, audit_id: int):
             "executive_summary": report["ai_analysis"].get("executive_summary"),
         }
         audit.audit_report = report
-        audit.save(update_fields=["status", "completed_at", "end_latitude", "end_longitude", "audit_report"])
+        audit.save(update_fields=["status", "completed_at", "end_latitude", "end_longitude", "audit_report", "updated_at"])
 
         evidence_files = []
         if files:
@@ -3891,6 +4570,7 @@ def audit_mobile_flow(request, audit_id: int):
                 media_type = AuditMedia.MediaType.OTHER
             AuditMedia.objects.create(audit=audit, media_type=media_type, file=evidence)
 
+        report_jobs.enqueue(ReportArtifact.Kind.AUDIT, [audit.id])
         # Replaced N8N webhook with Gmail API notifications
         _send_email_async(_process_audit_completed_email, (audit.id,))
         _send_area_push_notification(
@@ -3904,6 +4584,7 @@ def audit_mobile_flow(request, audit_id: int):
                 "branch_id": str(audit.area.branch_id),
                 "client_id": str(audit.area.branch.client_id),
             },
+            inspector_id=audit.inspector_id,
         )
 
         return JsonResponse(_serialize_audit(audit))
@@ -3914,13 +4595,17 @@ def audit_mobile_flow(request, audit_id: int):
 
 
 def _build_audit_pdf(audit: Audit) -> bytes:
+    return report_renderer.get_renderer().render("audit", _build_audit_report_snapshot(audit))
+
+
+def _render_audit_pdf(snapshot: dict[str, Any]) -> bytes:
     _initialize_report_fonts()
     output = BytesIO()
     pdf = canvas.Canvas(output, pagesize=LETTER)
     width, height = LETTER
     generated_at = timezone.localtime()
 
-    report = audit.audit_report or {}
+    report = snapshot["audit_report"]
     ai_analysis = report.get("ai_analysis") if isinstance(report.get("ai_analysis"), dict) else {}
     answers = report.get("answers") if isinstance(report.get("answers"), list) else []
     brand_green = colors.HexColor("#86BC25")
@@ -3942,20 +4627,20 @@ def _build_audit_pdf(audit: Audit) -> bytes:
         pdf.drawString(40, height - 113, subtitle)
         pdf.setFillColor(brand_text)
 
-    pdf.setTitle(f"informe-auditoria-{audit.id}")
+    pdf.setTitle(f"informe-auditoria-{snapshot['id']}")
     score = ai_analysis.get("score")
     answered_count = len([item for item in answers if isinstance(item, dict)])
     total_questions = len(((report.get("form") or {}).get("schema") or {}).get("questions") or [])
     completion_pct = int((answered_count / total_questions) * 100) if total_questions else 0
     _header("Informe Ejecutivo de Auditoría", "")
-    header_meta = f"AUDITORÍA #{audit.id} {generated_at.strftime('%d/%m/%Y')}"
+    header_meta = f"AUDITORÍA #{snapshot['id']} {generated_at.strftime('%d/%m/%Y')}"
     header_meta_x = width - 210
     header_meta_y = height - 98
     pdf.setFillColor(colors.HexColor("#64748b"))
     pdf.setFont(REPORT_FONT_BOLD, 10)
     pdf.drawString(header_meta_x, header_meta_y, header_meta)
     pdf.setFillColor(brand_text)
-    inspector_name = audit.inspector.get_full_name() if audit.inspector else "Sin asignar"
+    inspector_name = snapshot["inspector"] or snapshot["inspector_username"] or "Sin asignar"
     responsible_name = str(report.get("responsible_name") or "No registrado")
     signature_data = str(report.get("responsible_signature") or "")
     summary = str(ai_analysis.get("executive_summary") or "Sin resumen ejecutivo.")
@@ -3972,10 +4657,10 @@ def _build_audit_pdf(audit: Audit) -> bytes:
     # Portada simplificada sin gráficas: resumen general + trazabilidad + firma.
     info_y = height - 155
     trace_items = [
-        ("Cliente", audit.area.branch.client.name),
-        ("Sucursal", audit.area.branch.name),
-        ("Área", audit.area.name),
-        ("Inspector", inspector_name or (audit.inspector.username if audit.inspector else "Sin asignar")),
+        ("Cliente", snapshot["client"]),
+        ("Sucursal", snapshot["branch"]),
+        ("Área", snapshot["area"]),
+        ("Inspector", inspector_name),
         ("Responsable de área", responsible_name),
         ("Preguntas respondidas", f"{answered_count}/{total_questions or answered_count} ({completion_pct}%)"),
     ]
@@ -4042,7 +4727,7 @@ def _build_audit_pdf(audit: Audit) -> bytes:
     _draw_report_footer(pdf, generated_at)
     pdf.showPage()
 
-    _header("Anexo técnico de respuestas", f"Auditoría #{audit.id} · Registro completo del formulario")
+    _header("Anexo técnico de respuestas", f"Auditoría #{snapshot['id']} · Registro completo del formulario")
     _draw_card(pdf, 40, height - 192, width - 80, 60)
     pdf.setFillColor(colors.HexColor("#1e3a8a"))
     pdf.setFont(REPORT_FONT_BOLD, 10)
@@ -4058,7 +4743,7 @@ def _build_audit_pdf(audit: Audit) -> bytes:
         if current_y < 120:
             _draw_report_footer(pdf, generated_at)
             pdf.showPage()
-            _header("Anexo técnico de respuestas", f"Auditoría #{audit.id} · Continuación")
+            _header("Anexo técnico de respuestas", f"Auditoría #{snapshot['id']} · Continuación")
             current_y = height - 132
         pdf.setFont(REPORT_FONT_BOLD, 12)
         pdf.setFillColor(colors.HexColor("#0f172a"))
@@ -4071,7 +4756,7 @@ def _build_audit_pdf(audit: Audit) -> bytes:
                 if current_y < 70:
                     _draw_report_footer(pdf, generated_at)
                     pdf.showPage()
-                    _header("Anexo técnico de respuestas", f"Auditoría #{audit.id} · Continuación")
+                    _header("Anexo técnico de respuestas", f"Auditoría #{snapshot['id']} · Continuación")
                     current_y = height - 132
                     pdf.setFont(REPORT_FONT, 10)
                     pdf.setFillColor(colors.HexColor("#334155"))
@@ -4083,16 +4768,16 @@ def _build_audit_pdf(audit: Audit) -> bytes:
     y = write_block("Riesgos identificados", [f"• {str(item)}" for item in (ai_analysis.get("risks") or [])[:8]], y)
     y = write_block("Fortalezas observadas", [f"• {str(item)}" for item in (ai_analysis.get("strengths") or [])[:8]], y)
 
-    inspector_name = audit.inspector.get_full_name() if audit.inspector else "Sin asignar"
+    inspector_name = snapshot["inspector"] or snapshot["inspector_username"] or "Sin asignar"
     y = write_block(
         "Datos de trazabilidad",
         [
-            f"Cliente: {audit.area.branch.client.name}",
-            f"Sucursal: {audit.area.branch.name}",
-            f"Área: {audit.area.name}",
-            f"Inspector: {inspector_name or (audit.inspector.username if audit.inspector else 'Sin asignar')}",
-            f"Fecha programada: {timezone.localtime(audit.audited_at).strftime('%d/%m/%Y %H:%M')}",
-            f"Completada: {timezone.localtime(audit.completed_at).strftime('%d/%m/%Y %H:%M') if audit.completed_at else 'No registrada'}",
+            f"Cliente: {snapshot['client']}",
+            f"Sucursal: {snapshot['branch']}",
+            f"Área: {snapshot['area']}",
+            f"Inspector: {inspector_name}",
+            f"Fecha programada: {timezone.localtime(snapshot['audited_at']).strftime('%d/%m/%Y %H:%M')}",
+            f"Completada: {timezone.localtime(snapshot['completed_at']).strftime('%d/%m/%Y %H:%M') if snapshot['completed_at'] else 'No registrada'}",
             f"Responsable: {responsible_name}",
         ],
         y,
@@ -4102,7 +4787,7 @@ def _build_audit_pdf(audit: Audit) -> bytes:
         if y < 110:
             _draw_report_footer(pdf, generated_at)
             pdf.showPage()
-            _header("Anexo técnico de respuestas", f"Auditoría #{audit.id} · Registro detallado")
+            _header("Anexo técnico de respuestas", f"Auditoría #{snapshot['id']} · Registro detallado")
             y = height - 132
         pdf.setFont(REPORT_FONT_BOLD, 12)
         pdf.setFillColor(colors.HexColor("#0f172a"))
@@ -4119,7 +4804,7 @@ def _build_audit_pdf(audit: Audit) -> bytes:
                 if y < 70:
                     _draw_report_footer(pdf, generated_at)
                     pdf.showPage()
-                    _header("Anexo técnico de respuestas", f"Auditoría #{audit.id} · Registro detallado")
+                    _header("Anexo técnico de respuestas", f"Auditoría #{snapshot['id']} · Registro detallado")
                     y = height - 132
                     pdf.setFont(REPORT_FONT, 10)
                     pdf.setFillColor(colors.HexColor("#334155"))
@@ -4129,7 +4814,7 @@ def _build_audit_pdf(audit: Audit) -> bytes:
                 if y < 70:
                     _draw_report_footer(pdf, generated_at)
                     pdf.showPage()
-                    _header("Anexo técnico de respuestas", f"Auditoría #{audit.id} · Registro detallado")
+                    _header("Anexo técnico de respuestas", f"Auditoría #{snapshot['id']} · Registro detallado")
                     y = height - 132
                     pdf.setFont(REPORT_FONT, 10)
                     pdf.setFillColor(colors.HexColor("#334155"))
@@ -4137,17 +4822,13 @@ def _build_audit_pdf(audit: Audit) -> bytes:
                 y -= 14
             y -= 6
 
-    evidence_images: list[ImageReader] = []
-    for medium in audit.media.filter(media_type=AuditMedia.MediaType.PHOTO).order_by("id"):
-        if medium.file:
-            image = _load_report_image(str(medium.file).strip())
-            if image is not None:
-                evidence_images.append(image)
+    evidence_references = snapshot["photos"][:12]
+    evidence_images = _report_photo_slots(evidence_references, _load_report_images(evidence_references))
 
     if y < 200:
         _draw_report_footer(pdf, generated_at)
         pdf.showPage()
-        _header("Anexo técnico de respuestas", f"Auditoría #{audit.id} · Registro fotográfico")
+        _header("Anexo técnico de respuestas", f"Auditoría #{snapshot['id']} · Registro fotográfico")
         y = height - 132
 
     pdf.setFont(REPORT_FONT_BOLD, 12)
@@ -4172,7 +4853,7 @@ def _build_audit_pdf(audit: Audit) -> bytes:
             if col == 0 and y - image_h < 70:
                 _draw_report_footer(pdf, generated_at)
                 pdf.showPage()
-                _header("Anexo técnico de respuestas", f"Auditoría #{audit.id} · Registro fotográfico")
+                _header("Anexo técnico de respuestas", f"Auditoría #{snapshot['id']} · Registro fotográfico")
                 y = height - 132
                 pdf.setFont(REPORT_FONT_BOLD, 12)
                 pdf.setFillColor(colors.HexColor("#0f172a"))
@@ -4181,10 +4862,11 @@ def _build_audit_pdf(audit: Audit) -> bytes:
             x = 56 + (col * (image_w + gap_x))
             y_image = y - image_h
             try:
+                if image is None:
+                    raise ValueError("Foto pendiente.")
                 _draw_rounded_photo(pdf, image, x, y_image, image_w, image_h, radius=8)
             except Exception:
-                pdf.setFillColor(colors.HexColor("#e2e8f0"))
-                pdf.roundRect(x, y_image, image_w, image_h, 8, fill=1, stroke=0)
+                _draw_photo_placeholder(pdf, x, y_image, image_w, image_h, radius=8)
             row_complete = col == columns - 1
             is_last = idx == min(len(evidence_images), 12) - 1
             if row_complete or is_last:
@@ -4201,7 +4883,7 @@ def audit_report_pdf(request, audit_id: int):
     if not current_user:
         return JsonResponse({"error": "Usuario no autenticado."}, status=401)
 
-    scope = _build_access_scope(current_user)
+    scope = _get_access_scope(request)
 
     queryset = Audit.objects.select_related(
         "area__branch__client", "inspector", "form"
@@ -4214,10 +4896,9 @@ def audit_report_pdf(request, audit_id: int):
     if audit.status != Audit.Status.COMPLETED:
         return JsonResponse({"error": "Solo puedes descargar informe de auditorías finalizadas."}, status=400)
 
-    pdf_content = _build_audit_pdf(audit)
-    response = HttpResponse(pdf_content, content_type="application/pdf")
-    response["Content-Disposition"] = f'attachment; filename="auditoria-{audit.id}-informe.pdf"'
-    return response
+    return _serve_report_artifact(
+        request, lambda: _get_audit_report_artifact(audit), f"auditoria-{audit.id}-informe.pdf"
+    )
 
 
 @require_GET
@@ -4226,7 +4907,7 @@ def visit_report_pdf(request, visit_id: int):
     if not current_user:
         return JsonResponse({"error": "Usuario no autenticado."}, status=401)
 
-    scope = _build_access_scope(current_user)
+    scope = _get_access_scope(request)
 
     queryset = Visit.objects.select_related(
         "area__branch__client", "inspector", "dispenser"
@@ -4240,10 +4921,11 @@ def visit_report_pdf(request, visit_id: int):
         return JsonResponse({"error": "Solo puedes descargar informe de visitas finalizadas."}, status=400)
 
     public_report_url = _build_public_report_url(request, visit)
-    pdf_content = _build_visit_pdf(visit, public_report_url=public_report_url)
-    response = HttpResponse(pdf_content, content_type="application/pdf")
-    response["Content-Disposition"] = f'attachment; filename="visita-{visit.id}-informe.pdf"'
-    return response
+    return _serve_report_artifact(
+        request,
+        lambda: _get_visit_report_artifact(visit, public_report_url=public_report_url),
+        f"visita-{visit.id}-informe.pdf",
+    )
 
 
 @require_GET
@@ -4252,10 +4934,9 @@ def visit_report_public_pdf(request, token: str):
     if visit is None:
         return JsonResponse({"error": "El enlace público del informe es inválido o expiró."}, status=404)
 
-    pdf_content = _build_visit_pdf(visit, public_report_url=None)
-    response = HttpResponse(pdf_content, content_type="application/pdf")
-    response["Content-Disposition"] = f'inline; filename="visita-{visit.id}-informe.pdf"'
-    return response
+    return _serve_report_artifact(
+        request, lambda: _get_visit_report_artifact(visit), f"visita-{visit.id}-informe.pdf", inline=True
+    )
 
 
 @require_GET
@@ -4272,7 +4953,7 @@ def audit_report_puppeteer(request, audit_id: int):
     if not current_user:
         return JsonResponse({"error": "Usuario no autenticado."}, status=401)
 
-    scope = _build_access_scope(current_user)
+    scope = _get_access_scope(request)
     queryset = Audit.objects.select_related(
         "area__branch__client", "inspector", "form"
     ).prefetch_related("media")
@@ -4293,7 +4974,7 @@ def visit_report_puppeteer(request, visit_id: int):
     if not current_user:
         return JsonResponse({"error": "Usuario no autenticado."}, status=401)
 
-    scope = _build_access_scope(current_user)
+    scope = _get_access_scope(request)
     queryset = Visit.objects.select_related(
         "area__branch__client", "inspector", "dispenser"
     ).prefetch_related("media")
@@ -4310,50 +4991,165 @@ def visit_report_puppeteer(request, visit_id: int):
     return HttpResponse(html, content_type="text/html; charset=utf-8")
 
 
+NOTIFICATION_FEED_SIZE = 50
+NOTIFICATIONS_STREAM_TOKEN_SALT = "core.notifications-stream"
+NOTIFICATIONS_STREAM_TOKEN_MAX_AGE_SECONDS = 60 * 60
+
+
 @require_GET
 def notifications(request):
+    """Bandeja del usuario actual, de la más reciente a la más antigua, paginada por cursor.
+
+    Sin ``cursor`` ni ``page_size`` devuelve las últimas 50; ``unread=1`` filtra las no leídas.
+    """
     current_user = _get_current_user(request)
     if not current_user:
         return JsonResponse({"error": "Usuario no autenticado."}, status=401)
 
-    scope = _build_access_scope(current_user)
+    page, page_error = _get_list_page_params(request)
+    if page_error:
+        return JsonResponse({"error": page_error}, status=400)
+    if page is None:
+        page = {"page_size": NOTIFICATION_FEED_SIZE, "cursor": None}
 
-    visits_queryset = Visit.objects.select_related("area__branch__client", "inspector")
-    if current_user.role == User.Role.INSPECTOR:
-        visits_queryset = visits_queryset.filter(inspector_id=current_user.id)
-    else:
-        visits_queryset = _filter_queryset_by_scope(visits_queryset, scope, area_lookup="area_id")
-
-    incidents_queryset = Incident.objects.select_related("client", "branch", "area", "dispenser")
-    incidents_queryset = _filter_queryset_by_scope(incidents_queryset, scope, area_lookup="area_id")
-
-    items: list[dict[str, Any]] = []
-
-    for visit in visits_queryset.order_by("-visited_at")[:30]:
-        branch_name = visit.area.branch.name if visit.area_id else "sucursal"
-        status_label = visit.get_status_display().lower()
-        items.append({
-            "id": f"visit-{visit.id}",
-            "title": "Visita programada" if visit.status == Visit.Status.SCHEDULED else "Visita finalizada",
-            "message": f"{branch_name}: visita {status_label} para {visit.visited_at:%d/%m/%Y %H:%M}.",
-            "created_at": visit.visited_at,
-            "type": "visit",
-            "unread": False,
-        })
+    queryset = Notification.objects.filter(user=current_user)
+    if (request.GET.get("unread") or "").strip().lower() in {"1", "true", "yes"}:
+        queryset = queryset.filter(read_at__isnull=True)
+    items, next_cursor = _paginate_queryset(queryset, page, order_field="created_at")
+    return JsonResponse({"results": [_serialize_notification(item) for item in items], "next": next_cursor})
+
+
+@require_GET
+def notifications_unread_count(request):
+    current_user = _get_current_user(request)
+    if not current_user:
+        return JsonResponse({"error": "Usuario no autenticado."}, status=401)
+    unread = Notification.objects.filter(user=current_user, read_at__isnull=True).count()
+    return JsonResponse({"unread": unread})
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def notifications_mark_read(request):
+    """Marca como leídas las notificaciones ``ids`` del usuario, o todas con ``{"all": true}``."""
+    current_user = _get_current_user(request)
+    if not current_user:
+        return JsonResponse({"error": "Usuario no autenticado."}, status=401)
+
+    try:
+        data = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Formato JSON inválido."}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"error": "Formato JSON inválido."}, status=400)
+
+    queryset = Notification.objects.filter(user=current_user, read_at__isnull=True)
+    if data.get("all") is not True:
+        raw_ids = data.get("ids")
+        if not isinstance(raw_ids, list):
+            return JsonResponse({"error": "Envía ids (lista) o all=true."}, status=400)
+        try:
+            ids = [int(value) for value in raw_ids]
+        except (TypeError, ValueError):
+            return JsonResponse({"error": "IDs de notificación inválidos."}, status=400)
+        queryset = queryset.filter(id__in=ids)
+
+    updated = queryset.update(read_at=timezone.now())
+    unread = Notification.objects.filter(user=current_user, read_at__isnull=True).count()
+    return JsonResponse({"updated": updated, "unread": unread})
+
+
+def _format_sse(message: dict) -> str:
+    data = json.dumps(message["data"], cls=DjangoJSONEncoder)
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {data}\n\n"
+
+
+async def _iter_event_stream(broker, subscription, backlog):
+    heartbeat = float(getattr(settings, "EVENTS_HEARTBEAT_SECONDS", 15))
+    try:
+        yield "retry: 5000\n\n"
+        if backlog is None:
+            # No se puede reanudar: el cliente debe recargar bandeja y tablero.
+            yield "event: resync\ndata: {}\n\n"
+        else:
+            for message in backlog:
+                yield _format_sse(message)
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            if message is None:
+                return
+            yield _format_sse(message)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def _get_user_from_stream_token(token: str) -> User | None:
+    try:
+        payload = signing.loads(
+            token,
+            salt=NOTIFICATIONS_STREAM_TOKEN_SALT,
+            max_age=NOTIFICATIONS_STREAM_TOKEN_MAX_AGE_SECONDS,
+        )
+        user_id = int(payload.get("user_id"))
+    except (BadSignature, SignatureExpired, AttributeError, TypeError, ValueError):
+        return None
+    return User.objects.filter(pk=user_id, is_active=True).first()
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def notifications_stream_token(request):
+    """Token firmado para abrir el stream, que ``EventSource`` solo puede enviar en la URL.
+
+    Caduca a la hora: si el stream responde 401 al reconectar, el cliente pide otro.
+    """
+    current_user = _get_current_user(request)
+    if not current_user:
+        return JsonResponse({"error": "Usuario no autenticado."}, status=401)
+
+    token = signing.dumps({"user_id": current_user.id}, salt=NOTIFICATIONS_STREAM_TOKEN_SALT)
+    return JsonResponse({"token": token, "expires_in": NOTIFICATIONS_STREAM_TOKEN_MAX_AGE_SECONDS})
 
-    for incident in incidents_queryset.order_by("-created_at")[:30]:
-        items.append({
-            "id": f"incident-{incident.id}",
-            "title": "Nueva incidencia",
-            "message": f"{incident.branch.name} · {incident.dispenser.identifier}: {incident.description}",
-            "created_at": incident.created_at,
-            "type": "incident",
-            "unread": False,
-        })
 
-    items.sort(key=lambda item: item["created_at"], reverse=True)
-    payload = [_serialize_notification(item) for item in items[:50]]
-    return JsonResponse({"results": payload})
+@require_GET
+async def notifications_stream(request):
+    """Server-Sent Events con los avisos en vivo del usuario actual.
+
+    Requiere servir la aplicación por ``config.asgi``. ``EventSource`` no permite
+    cabeceras propias, así que el usuario se identifica con ``?token=`` obtenido en
+    ``/api/notifications/stream/token/``.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"error": "El stream de eventos requiere el servidor ASGI."}, status=501)
+
+    token = str(request.GET.get("token") or "").strip()
+    if token:
+        current_user = await sync_to_async(_get_user_from_stream_token)(token)
+    else:
+        current_user = await sync_to_async(_get_current_user)(request)
+    if not current_user:
+        return JsonResponse({"error": "Usuario no autenticado."}, status=401)
+
+    broker = events.get_broker()
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        subscription, backlog = await broker.asubscribe(current_user.id, last_event_id)
+    except events.BrokerFull:
+        response = JsonResponse({"error": "Demasiadas conexiones abiertas."}, status=503)
+        response["Retry-After"] = "30"
+        return response
+
+    response = StreamingHttpResponse(
+        _iter_event_stream(broker, subscription, backlog),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 
 @csrf_exempt
@@ -4362,14 +5158,17 @@ def incidents(request):
     current_user = _get_current_user(request)
 
     if request.method == "GET":
-        queryset = Incident.objects.select_related("client", "branch", "area", "dispenser")
+        page, page_error = _get_list_page_params(request)
+        if page_error:
+            return JsonResponse({"error": page_error}, status=400)
+
+        queryset = Incident.objects.select_related("client", "branch", "area", "dispenser").prefetch_related("media")
         scope = _get_access_scope(request)
         queryset = _filter_queryset_by_scope(queryset, scope, area_lookup="area_id")
-        payload = [
-            _serialize_incident(incident)
-            for incident in queryset.all()
-        ]
-        return JsonResponse({"results": payload})
+        if page is None:
+            return _list_response(request, queryset, _serialize_incidents)
+        items, next_cursor = _paginate_queryset(queryset, page, order_field="created_at")
+        return _list_response(request, items, _serialize_incidents, {"next": next_cursor})
 
     if not _can_create_incidents(current_user):
         return JsonResponse({"error": "Solo el administrador general y el administrador de sucursal pueden registrar incidencias."}, status=403)
@@ -4401,7 +5200,7 @@ def incidents(request):
     if branch.client_id != client.id or area.branch_id != branch.id or dispenser.area_id != area.id:
         return JsonResponse({"error": "La ubicación seleccionada no es consistente."}, status=400)
 
-    scope = _build_access_scope(current_user)
+    scope = _get_access_scope(request)
     if scope is not None and area.id not in scope["area_ids"]:
             return JsonResponse({"error": "No tienes permiso sobre la sucursal seleccionada."}, status=403)
 
@@ -4479,7 +5278,7 @@ def incident_schedule_visit(request, incident_id: int):
             status=403,
         )
 
-    scope = _build_access_scope(current_user)
+    scope = _get_access_scope(request)
     if scope is not None and incident.area_id not in scope["area_ids"]:
         return JsonResponse({"error": "No tienes permiso sobre esta incidencia."}, status=403)
 
@@ -4566,12 +5365,142 @@ def login(request):
     return JsonResponse({"user": _serialize_user(user)})
 
 
+# Margen hacia atrás sobre la marca del cliente: cubre transacciones que confirmaron
+# después de calcularse la marca anterior. El cliente puede recibir filas repetidas.
+SYNC_WATERMARK_OVERLAP = timedelta(seconds=5)
+
+
+def _sync_resources(scope):
+    """Consultas filtradas por alcance y serializadores de cada recurso sincronizable."""
+    return {
+        "clients": (
+            _filter_queryset_by_scope(Client.objects.all(), scope, client_lookup="id"),
+            lambda rows: (_serialize_client(client) for client in rows),
+        ),
+        "branches": (
+            _filter_queryset_by_scope(Branch.objects.select_related("client"), scope, branch_lookup="id"),
+            lambda rows: (_serialize_branch(branch) for branch in rows),
+        ),
+        "areas": (
+            _filter_queryset_by_scope(
+                Area.objects.select_related("branch__client", "audit_form_template"), scope, area_lookup="id"
+            ),
+            lambda rows: (_serialize_area(area) for area in rows),
+        ),
+        "dispensers": (
+            _filter_queryset_by_scope(
+                Dispenser.objects.select_related("model", "area__branch__client").prefetch_related(
+                    "product_assignments"
+                ),
+                scope,
+                area_lookup="area_id",
+            ),
+            _serialize_dispensers,
+        ),
+        "visits": (
+            _filter_queryset_by_scope(
+                _apply_list_field_loading(Visit.objects.all(), VISIT_FIELDS, None), scope, area_lookup="area_id"
+            ),
+            _serialize_visits,
+        ),
+        "audits": (
+            _filter_queryset_by_scope(
+                _apply_list_field_loading(Audit.objects.all(), AUDIT_FIELDS, None), scope, area_lookup="area_id"
+            ),
+            _serialize_audits,
+        ),
+        "incidents": (
+            _filter_queryset_by_scope(
+                Incident.objects.select_related("client", "branch", "area", "dispenser").prefetch_related("media"),
+                scope,
+                area_lookup="area_id",
+            ),
+            _serialize_incidents,
+        ),
+    }
+
+
+def _filter_deleted_records_by_scope(queryset, scope):
+    if scope is None:
+        return queryset
+    # Al borrar un área o sucursal también desaparece su fila de alcance, así que la
+    # marca se entrega a quien sigue viendo la sucursal (o el cliente, si era la sucursal).
+    return queryset.filter(
+        Q(area_id__in=scope_lookup_values(scope, "area_ids"))
+        | Q(branch_id__in=scope_lookup_values(scope, "branch_ids"))
+        | Q(resource__in=["clients", "branches"], client_id__in=scope_lookup_values(scope, "client_ids"))
+    )
+
+
+@require_GET
+def sync(request):
+    """Cambios y borrados desde ``updated_since`` para las apps móviles.
+
+    Sin ``updated_since`` devuelve todo lo visible (sincronización inicial). La
+    respuesta incluye ``watermark``, que el cliente envía en la siguiente llamada.
+    Si el alcance del usuario cambió después de la marca, la respuesta vuelve a ser
+    completa (``full``): el cliente debe reemplazar sus datos locales, porque las filas
+    que dejó de ver no generan marca de borrado.
+    """
+    watermark = timezone.now()
+    updated_since = None
+    updated_since_input = (request.GET.get("updated_since") or "").strip()
+    if updated_since_input:
+        try:
+            updated_since = datetime.fromisoformat(updated_since_input.replace("Z", "+00:00"))
+        except ValueError:
+            return JsonResponse({"error": "El parámetro updated_since debe tener formato ISO 8601."}, status=400)
+        if timezone.is_naive(updated_since):
+            updated_since = timezone.make_aware(updated_since)
+        updated_since -= SYNC_WATERMARK_OVERLAP
+
+    current_user = _get_current_user(request)
+    if updated_since is not None and current_user is not None:
+        scope_key = catalog.scope_key(current_user.id)
+        if catalog.get_versions([scope_key])[scope_key][1] >= updated_since:
+            updated_since = None
+
+    scope = _get_access_scope(request)
+    changes = {}
+    for resource, (queryset, serialize_rows) in _sync_resources(scope).items():
+        if updated_since is not None:
+            queryset = queryset.filter(updated_at__gte=updated_since)
+        changes[resource] = list(serialize_rows(queryset))
+
+    deleted = {resource: [] for resource in changes}
+    if updated_since is not None:
+        records = _filter_deleted_records_by_scope(
+            DeletedRecord.objects.filter(deleted_at__gte=updated_since),
+            scope,
+        )
+        changed_ids = {resource: {row["id"] for row in rows} for resource, rows in changes.items()}
+        for resource, object_id in records.values_list("resource", "object_id").order_by("id"):
+            # Una fila que se movió de área y se sigue viendo llega entre los cambios.
+            if object_id not in changed_ids[resource]:
+                deleted[resource].append(object_id)
+
+    return JsonResponse(
+        {
+            "watermark": watermark.isoformat().replace("+00:00", "Z"),
+            "full": updated_since is None,
+            "changes": changes,
+            "deleted": deleted,
+        }
+    )
+
+
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
 def users(request):
     if request.method == "GET":
-        payload = [_serialize_user(user) for user in User.objects.order_by("id")]
-        return JsonResponse({"results": payload})
+        page, page_error = _get_list_page_params(request)
+        if page_error:
+            return JsonResponse({"error": page_error}, status=400)
+        if page is None:
+            payload = [_serialize_user(user) for user in User.objects.order_by("id")]
+            return JsonResponse({"results": payload})
+        items, next_cursor = _paginate_queryset(User.objects.all(), page)
+        return JsonResponse({"results": [_serialize_user(user) for user in items], "next": next_cursor})
 
     data, files = _extract_user_data(request)
     if data is None:
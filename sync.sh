@@ -100,6 +100,9 @@ ssh -i "$SSH_KEY" "$REMOTE_USER@$REMOTE_HOST" bash -s << EOF
       echo "--- VPS: Recopilando archivos estáticos..."
       .venv/bin/python manage.py collectstatic --noinput
       
+      echo "--- VPS: Instalando fuentes de los informes (Poppins) en core/fonts..."
+      .venv/bin/python manage.py fetch_report_fonts || echo "--- VPS: AVISO: no se pudo descargar Poppins; los informes usarán DejaVu/Vera."
+      
       RESTART_BACKEND=1
       cd ..
   fi